@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+import os
+import subprocess
+import threading
+import time
+import wave
+from collections import deque
+
+import numpy as np
+
+try:
+    import alsaaudio
+except ImportError:  # pyalsaaudio not installed: fall back to aplay/amixer
+    alsaaudio = None
+
+# In-process playback of the deterrent sounds. The ALSA device stays open and
+# WAV files are decoded into memory once, so play()/stop() only flip state for
+# the playback thread: no fork/exec, and the ALSA buffer is kept small
+# (period_frames * periods) so a stop is heard within a few milliseconds.
+# Looping wraps around inside a period, so repeats are gapless.
+# Device selection via environment:
+#   DOG_AUDIO_DEVICE=default    ALSA PCM name; "null" is ALSA's null device
+#   DOG_AUDIO_DEVICE=sim        no ALSA at all, paced in-process sink for testing
+#   DOG_AUDIO_MIXER=Speaker     mixer control muted by mute()
+
+SAMPLE_FORMATS = {1: 'u8', 2: 's16', 4: 's32'}
+
+
+class Sound:
+    def __init__(self, name, pcm, rate, channels, sample_width):
+        self.name = name
+        self.pcm = pcm  # raw interleaved frames
+        self.rate = rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_bytes = channels * sample_width
+
+    @classmethod
+    def from_wav(cls, path):
+        with wave.open(path, 'rb') as w:
+            if w.getsampwidth() not in SAMPLE_FORMATS:
+                raise ValueError(f"{path}: unsupported sample width {w.getsampwidth()}")
+            pcm = w.readframes(w.getnframes())
+            return cls(os.path.basename(path), pcm, w.getframerate(), w.getnchannels(), w.getsampwidth())
+
+    @classmethod
+    def from_samples(cls, name, samples, rate, channels=1):
+        # float samples in [-1, 1] (shape (n,) or (n, channels)) to 16-bit PCM
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+        return cls(name, pcm, rate, channels, 2)
+
+    @property
+    def format(self):
+        return self.rate, self.channels, self.sample_width
+
+    @property
+    def duration(self):
+        return len(self.pcm) / (self.frame_bytes * self.rate)
+
+
+class AlsaOutput:
+    def __init__(self, device, rate, channels, sample_width, period_frames, periods):
+        fmt = {1: alsaaudio.PCM_FORMAT_U8, 2: alsaaudio.PCM_FORMAT_S16_LE, 4: alsaaudio.PCM_FORMAT_S32_LE}[sample_width]
+        self.pcm = alsaaudio.PCM(alsaaudio.PCM_PLAYBACK, alsaaudio.PCM_NORMAL, device=device,
+                                 rate=rate, channels=channels, format=fmt,
+                                 periodsize=period_frames, periods=periods)
+
+    def write(self, data):
+        self.pcm.write(data)
+
+    def close(self):
+        self.pcm.close()
+
+
+class SimulatedOutput:
+    # Consumes audio in real time like a sound card would, without hardware
+    def __init__(self, device, rate, channels, sample_width, period_frames, periods):
+        self.rate = rate
+        self.frame_bytes = channels * sample_width
+        self.clock = None
+        self.frames_written = 0
+
+    def write(self, data):
+        now = time.perf_counter()
+        if self.clock is None or self.clock < now:
+            self.clock = now  # underrun: start again from now
+        self.clock += len(data) / self.frame_bytes / self.rate
+        self.frames_written += len(data) // self.frame_bytes
+        time.sleep(max(0.0, self.clock - time.perf_counter()))
+
+    def close(self):
+        pass
+
+
+class Mixer:
+    # Remembers the mute state so the mixer is only touched on transitions
+    def __init__(self, control="Speaker", cardindex=-1, simulated=False):
+        self.control = control
+        self.cardindex = cardindex
+        self.simulated = simulated
+        self.muted = None
+        self.changes = 0
+
+    def set_muted(self, muted):
+        if muted == self.muted:
+            return False
+        try:
+            if self.simulated:
+                pass
+            elif alsaaudio is not None:
+                alsaaudio.Mixer(self.control, cardindex=self.cardindex).setmute(int(muted))
+            else:
+                subprocess.call(['amixer', '-q', 'set', self.control, 'mute' if muted else 'unmute'])
+        except Exception as e:
+            print(f"Could not {'mute' if muted else 'unmute'} {self.control}: {e}")
+            return False
+        self.muted = muted
+        self.changes += 1
+        return True
+
+
+class AudioEngine:
+    def __init__(self, device="default", mixer="Speaker", period_frames=256, periods=2, sound_dir="."):
+        self.device = device
+        self.period_frames = period_frames
+        self.periods = periods
+        self.sound_dir = sound_dir
+        self.mixer = Mixer(mixer, simulated=(device == "sim")) if mixer else None
+        self.output_class = SimulatedOutput if device == "sim" else AlsaOutput
+
+        self.sounds = {}
+        self.output = None
+        self.output_format = None
+        self.cond = threading.Condition()
+        self.current = None  # (sound, loop)
+        self.generation = 0
+        self.requested_at = None
+        self.playing = False
+        self.running = True
+        self.start_latencies = deque(maxlen=100)
+        self.stop_latencies = deque(maxlen=100)
+
+        self.thread = threading.Thread(target=self._run, name="audio", daemon=True)
+        self.thread.start()
+
+    def load(self, name_or_path):
+        # Decoded once and kept in memory
+        path = name_or_path if os.path.isabs(name_or_path) else os.path.join(self.sound_dir, name_or_path)
+        sound = self.sounds.get(path)
+        if sound is None:
+            sound = self.sounds[path] = Sound.from_wav(path)
+        return sound
+
+    def preload(self, *names):
+        for name in names:
+            self.load(name)
+
+    def play(self, sound, loop=True):
+        # sound: a Sound or a WAV file name; replaces whatever is playing
+        if not isinstance(sound, Sound):
+            sound = self.load(sound)
+        if self.mixer is not None:
+            self.mixer.set_muted(False)
+        with self.cond:
+            self.current = (sound, loop)
+            self.generation += 1
+            self.requested_at = time.perf_counter()
+            self.cond.notify_all()
+
+    def stop(self):
+        with self.cond:
+            if self.current is None:
+                return
+            self.current = None
+            self.generation += 1
+            self.requested_at = time.perf_counter()
+            self.cond.notify_all()
+
+    def mute(self):
+        self.stop()
+        if self.mixer is not None:
+            self.mixer.set_muted(True)
+
+    @property
+    def is_playing(self):
+        return self.current is not None
+
+    def _ensure_output(self, sound):
+        if self.output is not None and self.output_format == sound.format:
+            return
+        if self.output is not None:
+            self.output.close()
+        rate, channels, sample_width = sound.format
+        self.output = self.output_class(self.device, rate, channels, sample_width, self.period_frames, self.periods)
+        self.output_format = sound.format
+
+    def _run(self):
+        while self.running:
+            with self.cond:
+                while self.running and self.current is None:
+                    if self.playing:
+                        self.playing = False
+                        self.stop_latencies.append(time.perf_counter() - self.requested_at)
+                    self.cond.wait()
+                if not self.running:
+                    break
+                sound, loop = self.current
+                generation = self.generation
+                requested_at = self.requested_at
+            try:
+                self._ensure_output(sound)
+            except Exception as e:
+                print(f"Could not open audio device {self.device}: {e}")
+                with self.cond:
+                    if self.generation == generation:
+                        self.current = None
+                continue
+            self._play(sound, loop, generation, requested_at)
+
+    def _play(self, sound, loop, generation, requested_at):
+        period_bytes = self.period_frames * sound.frame_bytes
+        data = sound.pcm
+        position = 0
+        first = True
+        while self.running and self.generation == generation:
+            chunk = data[position:position + period_bytes]
+            position += len(chunk)
+            if len(chunk) < period_bytes and loop:
+                # wrap around inside the period so the loop is gapless
+                position = period_bytes - len(chunk)
+                chunk += data[:position]
+            if not chunk:
+                break
+            try:
+                self.output.write(chunk)
+            except Exception as e:
+                print(f"Audio write failed: {e}")
+                break
+            if first:
+                self.start_latencies.append(time.perf_counter() - requested_at)
+                self.playing = True
+                first = False
+            if position >= len(data) and not loop:
+                break
+        with self.cond:
+            if self.generation == generation:
+                self.current = None  # finished a one-shot sound
+                self.playing = False
+
+    @staticmethod
+    def _summary(values):
+        if not values:
+            return None
+        ms = np.array(values) * 1000
+        return {'count': len(ms), 'mean_ms': float(ms.mean()), 'p95_ms': float(np.percentile(ms, 95)),
+                'max_ms': float(ms.max())}
+
+    def stats(self):
+        # Start latency: play() until the first period is in the device buffer.
+        # Stop latency: stop() until the playback thread stopped writing; what
+        # is already buffered (period_frames * periods) still drains after it.
+        return {
+            'start': self._summary(list(self.start_latencies)),
+            'stop': self._summary(list(self.stop_latencies)),
+            'buffer_ms': (1000.0 * self.period_frames * self.periods / self.output_format[0]
+                          if self.output_format else None),
+            'mixer_changes': self.mixer.changes if self.mixer is not None else 0,
+        }
+
+    def close(self):
+        self.stop()
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.thread.join(timeout=1)
+        if self.output is not None:
+            self.output.close()
+            self.output = None
+
+
+class AplayEngine:
+    # Same interface on top of aplay, for systems without pyalsaaudio. Sounds
+    # always play once; callers that want a loop play again when it ends.
+    def __init__(self, mixer="Speaker", sound_dir="."):
+        self.sound_dir = sound_dir
+        self.mixer = Mixer(mixer) if mixer else None
+        self.process = None
+
+    def preload(self, *names):
+        pass
+
+    def play(self, sound, loop=True):
+        if self.mixer is not None:
+            self.mixer.set_muted(False)
+        self.stop()
+        if isinstance(sound, Sound):
+            # raw PCM through stdin, nothing written to disk
+            fmt = {1: 'U8', 2: 'S16_LE', 4: 'S32_LE'}[sound.sample_width]
+            self.process = subprocess.Popen(['aplay', '-q', '-t', 'raw', '-f', fmt, '-r', str(sound.rate),
+                                             '-c', str(sound.channels)], stdin=subprocess.PIPE)
+            threading.Thread(target=self._feed, args=(self.process, sound.pcm), daemon=True).start()
+            return
+        path = sound if os.path.isabs(sound) else os.path.join(self.sound_dir, sound)
+        self.process = subprocess.Popen(['aplay', '-q', path])
+
+    @staticmethod
+    def _feed(process, pcm):
+        try:
+            process.stdin.write(pcm)
+            process.stdin.close()
+        except OSError:
+            pass  # stopped while writing
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+        self.process = None
+
+    def mute(self):
+        self.stop()
+        if self.mixer is not None:
+            self.mixer.set_muted(True)
+
+    @property
+    def is_playing(self):
+        return self.process is not None and self.process.poll() is None
+
+    def stats(self):
+        return {'start': None, 'stop': None, 'buffer_ms': None,
+                'mixer_changes': self.mixer.changes if self.mixer is not None else 0}
+
+    def close(self):
+        self.stop()
+
+
+def make_audio_engine(device=None, mixer=None, **kwargs):
+    device = device or os.environ.get("DOG_AUDIO_DEVICE", "default")
+    mixer = mixer if mixer is not None else os.environ.get("DOG_AUDIO_MIXER", "Speaker")
+    if device != "sim" and alsaaudio is None:
+        print("⚠️ pyalsaaudio not installed, falling back to aplay.")
+        return AplayEngine(mixer=mixer, sound_dir=kwargs.get('sound_dir', "."))
+    return AudioEngine(device=device, mixer=mixer, **kwargs)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure audio engine start/stop latency")
+    parser.add_argument("wav", nargs="?", help="WAV file to play (default: generated 1 kHz tone)")
+    parser.add_argument("--device", default="null", help='ALSA PCM, or "sim" for the in-process sink')
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--period-frames", type=int, default=256)
+    parser.add_argument("--periods", type=int, default=2)
+    args = parser.parse_args()
+
+    engine = make_audio_engine(args.device, mixer="", period_frames=args.period_frames, periods=args.periods)
+    if args.wav:
+        sound = args.wav
+    else:
+        t = np.arange(48000) / 48000
+        sound = Sound.from_samples("tone", 0.5 * np.sin(2 * np.pi * 1000 * t), 48000)
+    for _ in range(args.count):
+        engine.play(sound)
+        time.sleep(0.2)
+        engine.stop()
+        time.sleep(0.05)
+    print(engine.stats())
+    engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+from detectors import make_detector
+
+# Compares per-frame latency and throughput of detector backends on recorded frames.
+# Frames come from a directory of images or a video file, e.g.
+#   python3 benchmark_detectors.py recordings/ --backends roboflow local
+# Without --backends, every configured backend runs: roboflow when --model-url
+# is given, local when the --model-path file exists. Backends that cannot be
+# constructed are reported as skipped.
+
+
+def load_frames(path, limit):
+    frames = []
+    if os.path.isdir(path):
+        for name in sorted(glob.glob(os.path.join(path, "*"))):
+            frame = cv2.imread(name)
+            if frame is not None:
+                frames.append(frame)
+            if len(frames) >= limit:
+                break
+    else:
+        cap = cv2.VideoCapture(path)
+        while len(frames) < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+    return frames
+
+
+def configured_backends(model_url, model_path):
+    backends = []
+    if model_url:
+        backends.append("roboflow")
+    if model_path and os.path.exists(model_path):
+        backends.append("local")
+    return backends
+
+
+def run_backend(detector, frames, warmup):
+    for frame in frames[:warmup]:
+        try:
+            detector.detect(frame)
+        except Exception:
+            pass
+
+    latencies = []
+    failures = 0
+    start = time.perf_counter()
+    for frame in frames:
+        t0 = time.perf_counter()
+        try:
+            detector.detect(frame)
+        except Exception as e:
+            failures += 1
+            print(f"⚠️ {detector.name}: {e}")
+        latencies.append((time.perf_counter() - t0) * 1000)
+    total = time.perf_counter() - start
+
+    lat = np.array(latencies)
+    return {
+        'frames': len(frames),
+        'failures': failures,
+        'mean_ms': lat.mean(),
+        'p50_ms': np.percentile(lat, 50),
+        'p95_ms': np.percentile(lat, 95),
+        'max_ms': lat.max(),
+        'fps': len(frames) / total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detector backends on recorded frames")
+    parser.add_argument("frames", help="directory of images or a video file")
+    parser.add_argument("--backends", nargs="+", help="default: the backends configured by --model-url / --model-path")
+    parser.add_argument("--model-url", default=None, help="Roboflow model URL, required for the roboflow backend")
+    parser.add_argument("--model-path", default="cheryldogs.onnx")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=3)
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames, args.limit)
+    if not frames:
+        print("❌ No frames loaded from", args.frames)
+        return
+
+    backends = args.backends or configured_backends(args.model_url, args.model_path)
+    if not backends:
+        print(f"❌ No detector configured: pass --model-url, or put the model at {args.model_path}")
+        return
+
+    print(f"Loaded {len(frames)} frames from {args.frames}")
+    print(f"{'backend':<12} {'frames':>6} {'fail':>5} {'mean':>8} {'p50':>8} {'p95':>8} {'max':>8} {'fps':>7}")
+    for backend in backends:
+        if backend == "roboflow" and not args.model_url:
+            print(f"{backend:<12} skipped: --model-url is required")
+            continue
+        try:
+            detector = make_detector(backend, model_url=args.model_url, model_path=args.model_path)
+        except Exception as e:
+            print(f"{backend:<12} skipped: {e}")
+            continue
+        stats = run_backend(detector, frames, args.warmup)
+        detector.close()
+        print(f"{detector.name:<12} {stats['frames']:>6} {stats['failures']:>5} "
+              f"{stats['mean_ms']:>6.1f}ms {stats['p50_ms']:>6.1f}ms {stats['p95_ms']:>6.1f}ms "
+              f"{stats['max_ms']:>6.1f}ms {stats['fps']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
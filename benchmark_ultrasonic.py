@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from gpio_sim import SimulatedGPIO
+from ultrasonic import EchoReader
+
+# Jitter and CPU cost of the legacy busy-wait HC-SR04 reader versus the
+# edge-triggered EchoReader, against a simulated echo source:
+#   python3 benchmark_ultrasonic.py --distance 120 --count 100 --load-threads 2
+# --load-threads adds CPU-bound Python threads to show the effect of preemption
+# (the simulator is Python too, so under load its own edges slip as well).
+
+TRIG = 35
+ECHO = 33
+
+
+def legacy_measure(gpio):
+    # The busy-wait implementation previously copied into every script (minus its 100 ms sleep)
+    gpio.output(TRIG, False)
+    gpio.output(TRIG, True)
+    time.sleep(0.00001)
+    gpio.output(TRIG, False)
+    timeout_start = time.time() + 1
+    while gpio.input(ECHO) == 0:
+        if time.time() > timeout_start:
+            return None
+    pulse_start = time.time()
+    timeout_end = time.time() + 1
+    while gpio.input(ECHO) == 1:
+        if time.time() > timeout_end:
+            return None
+    pulse_end = time.time()
+    distance_cm = round((pulse_end - pulse_start) * 17150, 2)
+    return distance_cm, round(distance_cm / 100, 3)
+
+
+def run(measure, count, interval):
+    values = []
+    cpu_ms = []
+    wall_ms = []
+    for _ in range(count):
+        cpu0 = time.thread_time()
+        wall0 = time.perf_counter()
+        result = measure()
+        cpu_ms.append((time.thread_time() - cpu0) * 1000)
+        wall_ms.append((time.perf_counter() - wall0) * 1000)
+        if result is not None:
+            values.append(result[0])
+        time.sleep(interval)
+    return np.array(values), np.array(cpu_ms), np.array(wall_ms)
+
+
+def burn(stop):
+    x = 0
+    while not stop.is_set():
+        x += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HC-SR04 echo timing methods on a simulated sensor")
+    parser.add_argument("--distance", type=float, default=100.0, help="simulated distance in cm")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.06, help="seconds between pings")
+    parser.add_argument("--load-threads", type=int, default=0, help="CPU-bound threads running alongside")
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    for _ in range(args.load_threads):
+        threading.Thread(target=burn, args=(stop,), daemon=True).start()
+
+    gpio = SimulatedGPIO(args.distance, trig=TRIG, echo=ECHO)
+    gpio.setmode(gpio.BOARD)
+    gpio.setup(TRIG, gpio.OUT)
+    gpio.setup(ECHO, gpio.IN)
+
+    readers = [("busy-wait", lambda: legacy_measure(gpio))]
+    for mode in ("callback", "wait"):
+        reader = EchoReader(gpio, TRIG, ECHO, mode=mode, min_interval=0, verbose=False)
+        readers.append((f"edge-{mode}", reader.measure))
+
+    print(f"Simulated distance {args.distance} cm, {args.count} pings, {args.load_threads} load threads")
+    print(f"{'method':<14} {'ok':>4} {'mean cm':>8} {'err cm':>7} {'jitter':>7} {'p95 err':>8} {'cpu ms':>7} {'wall ms':>8}")
+    for name, measure in readers:
+        values, cpu_ms, wall_ms = run(measure, args.count, args.interval)
+        if len(values) == 0:
+            print(f"{name:<14} {0:>4} (no readings)")
+            continue
+        err = np.abs(values - args.distance)
+        print(f"{name:<14} {len(values):>4} {values.mean():>8.2f} {err.mean():>7.2f} {values.std():>7.2f} "
+              f"{np.percentile(err, 95):>8.2f} {cpu_ms.mean():>7.3f} {wall_ms.mean():>8.3f}")
+
+    stop.set()
+
+
+if __name__ == "__main__":
+    main()
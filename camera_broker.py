@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# One process owns the camera and publishes every frame into a ring of slots
+# in shared memory; any number of local processes read the newest frame as a
+# NumPy view straight over that memory (no decode, no copy).
+#
+# Layout: header (uint64[8]) | slot sequence numbers (uint64[slots]) |
+#         slot capture times (float64[slots]) | frames (uint8[slots, h, w, c])
+# Each slot is guarded by a seqlock: its sequence number is odd while the
+# broker writes it and even (2 * frame count) once complete. Readers check
+# the number before and after using a view; a view stays valid until the
+# broker wraps around to that slot again, i.e. for (slots - 1) frame periods.
+# Readers stamp the header on every read; with --idle-exit the broker stops
+# (and frees the camera) once no reader has done so for that long.
+#
+#   python3 camera_broker.py                 # owns /dev/video0 until stopped
+#   python3 camera_broker.py --source clip.mp4 --loop
+# Consumers:
+#   cap = BrokerCapture()                    # cv2.VideoCapture-like read()
+
+BROKER_NAME = "dog-camera"
+BROKER_LOG = "/tmp/dog-camera-broker.log"
+MAGIC = 0x444F4743414D3031  # "DOGCAM01"
+HEADER_FIELDS = 8
+H_MAGIC, H_HEIGHT, H_WIDTH, H_CHANNELS, H_SLOTS, H_COUNT, H_UPDATED_NS, H_READ_NS = range(8)
+STALE_AFTER = 2.0  # seconds without a frame before a broker counts as dead
+IDLE_EXIT = 30.0  # seconds without a reader before a broker started by ensure_broker() exits
+
+
+def _layout(height, width, channels, slots):
+    meta = HEADER_FIELDS * 8
+    seq_offset = meta
+    time_offset = seq_offset + slots * 8
+    data_offset = (time_offset + slots * 8 + 63) // 64 * 64
+    frame_bytes = height * width * channels
+    return seq_offset, time_offset, data_offset, data_offset + slots * frame_bytes
+
+
+class Frame:
+    def __init__(self, ring, slot, seq, timestamp, image):
+        self.ring = ring
+        self.slot = slot
+        self.seq = seq
+        self.timestamp = timestamp  # capture time, time.time()
+        self.image = image  # read-only view into shared memory
+
+    @property
+    def index(self):
+        return self.seq // 2 - 1  # 0-based frame number
+
+    def valid(self):
+        # False once the broker started overwriting this slot
+        return int(self.ring.slot_seq[self.slot]) == self.seq
+
+    def copy(self, out=None):
+        # Owned copy (into out when it has the right shape), or None if the
+        # broker overwrote the slot while it was being copied
+        if out is not None and out.shape == self.image.shape:
+            out[...] = self.image
+        else:
+            out = self.image.copy()
+        return out if self.valid() else None
+
+
+class FrameRing:
+    def __init__(self, name=BROKER_NAME, shape=None, slots=8, create=False):
+        self.name = name
+        self.owner = create
+        if create:
+            height, width, channels = shape
+            size = _layout(height, width, channels, slots)[3]
+            try:
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()  # left over from a crashed broker
+            except FileNotFoundError:
+                pass
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # Attaching must not make this process unlink the segment at exit
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        self.header = np.ndarray((HEADER_FIELDS,), np.uint64, self.shm.buf, 0)
+        if create:
+            self.header[:] = 0
+            self.header[[H_HEIGHT, H_WIDTH, H_CHANNELS, H_SLOTS]] = (height, width, channels, slots)
+            self.header[H_READ_NS] = time.time_ns()  # counts as a read: grace period for the first reader
+            self.header[H_MAGIC] = MAGIC
+        elif int(self.header[H_MAGIC]) != MAGIC:
+            self.shm.close()
+            raise RuntimeError(f"shared memory {name!r} is not a camera ring")
+
+        height, width, channels, slots = (int(self.header[i]) for i in (H_HEIGHT, H_WIDTH, H_CHANNELS, H_SLOTS))
+        self.shape = (height, width, channels)
+        self.slots = slots
+        seq_offset, time_offset, data_offset, _ = _layout(height, width, channels, slots)
+        self.slot_seq = np.ndarray((slots,), np.uint64, self.shm.buf, seq_offset)
+        self.slot_time = np.ndarray((slots,), np.float64, self.shm.buf, time_offset)
+        self.frames = np.ndarray((slots, height, width, channels), np.uint8, self.shm.buf, data_offset)
+        if create:
+            self.slot_seq[:] = 0
+        else:
+            self.frames.flags.writeable = False
+
+    # --- broker side ---
+
+    def begin_write(self):
+        # Returns (count, slot view) to fill in place, e.g. cap.read(view)
+        count = int(self.header[H_COUNT])
+        slot = count % self.slots
+        self.slot_seq[slot] = 2 * count + 1
+        return count, self.frames[slot]
+
+    def end_write(self, count, timestamp=None):
+        slot = count % self.slots
+        self.slot_time[slot] = time.time() if timestamp is None else timestamp
+        self.slot_seq[slot] = 2 * count + 2
+        self.header[H_COUNT] = count + 1
+        self.header[H_UPDATED_NS] = time.time_ns()
+
+    def write(self, image, timestamp=None):
+        count, view = self.begin_write()
+        view[...] = image
+        self.end_write(count, timestamp)
+
+    # --- consumer side ---
+
+    @property
+    def count(self):
+        return int(self.header[H_COUNT])
+
+    @property
+    def alive(self):
+        return time.time_ns() - int(self.header[H_UPDATED_NS]) < STALE_AFTER * 1e9
+
+    def idle_for(self):
+        # Seconds since a reader last called touch()
+        return (time.time_ns() - int(self.header[H_READ_NS])) / 1e9
+
+    def touch(self):
+        self.header[H_READ_NS] = time.time_ns()
+
+    def latest(self):
+        # Newest complete frame as a zero-copy Frame, or None
+        count = self.count
+        for n in range(count, max(count - self.slots, 0), -1):
+            slot = (n - 1) % self.slots
+            seq = int(self.slot_seq[slot])
+            if seq != 2 * n:
+                continue  # being rewritten
+            timestamp = float(self.slot_time[slot])
+            if int(self.slot_seq[slot]) == seq:
+                return Frame(self, slot, seq, timestamp, self.frames[slot])
+        return None
+
+    def wait_next(self, after_seq=0, timeout=1.0, poll=0.002):
+        # Blocks until a frame newer than after_seq is available
+        deadline = time.monotonic() + timeout
+        while True:
+            frame = self.latest()
+            if frame is not None and frame.seq > after_seq:
+                return frame
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+
+    def close(self):
+        # Views handed out must not be used after this
+        self.header = self.slot_seq = self.slot_time = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class BrokerCapture:
+    # Drop-in for the cv2.VideoCapture calls the scripts make: read(image=None)
+    # copies the next new frame out of the ring (into image when given, so a
+    # buffer can be reused) and checks the slot was not overwritten meanwhile.
+    # Torn frames are skipped and counted in dropped.
+    def __init__(self, name=BROKER_NAME, timeout=2.0):
+        self.timeout = timeout
+        self.last_seq = 0
+        self.dropped = 0
+        self.last = None
+        self.timestamp = None
+        try:
+            self.ring = FrameRing(name)
+            self.ring.touch()
+        except FileNotFoundError:
+            self.ring = None
+
+    def isOpened(self):
+        return self.ring is not None and self.ring.alive
+
+    def read(self, image=None):
+        if self.ring is None:
+            return False, None
+        self.ring.touch()
+        while True:
+            frame = self.ring.wait_next(self.last_seq, self.timeout)
+            if frame is None:
+                return False, None
+            if self.last_seq:
+                self.dropped += max(0, (frame.seq - self.last_seq) // 2 - 1)
+            self.last_seq = frame.seq
+            copied = frame.copy(image)
+            if copied is not None:
+                break
+            self.dropped += 1
+        self.last = frame
+        self.timestamp = frame.timestamp
+        return True, copied
+
+    def release(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+
+def broker_running(name=BROKER_NAME):
+    try:
+        ring = FrameRing(name)
+    except (FileNotFoundError, RuntimeError):
+        return False
+    alive = ring.alive
+    ring.close()
+    return alive
+
+
+def ensure_broker(name=BROKER_NAME, wait=10.0, args=()):
+    # Starts camera_broker.py, detached, unless a live one already publishes
+    # name. Returns True if a broker was started. The broker outlives the
+    # caller, since other processes (testcamera.py, ...) may be reading from
+    # it, and exits by itself IDLE_EXIT seconds after the last reader is gone.
+    if broker_running(name):
+        return False
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "camera_broker.py")
+    command = [sys.executable, script, "--name", name, "--idle-exit", str(IDLE_EXIT), *args]
+    with open(BROKER_LOG, "ab") as log:
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL,
+                                   stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+    deadline = time.time() + wait
+    while time.time() < deadline and not broker_running(name):
+        if process.poll() is not None:
+            raise RuntimeError(f"camera broker exited with code {process.returncode}")
+        time.sleep(0.05)
+    return True
+
+
+def main():
+    from capture import BACKENDS, FileCapture, GStreamerCapture, make_capture
+
+    parser = argparse.ArgumentParser(description="Publish camera frames to shared memory")
+    parser.add_argument("--name", default=BROKER_NAME, help="shared memory segment name")
+    parser.add_argument("--backend", choices=BACKENDS, help="camera capture backend (default: $DOG_CAPTURE_BACKEND or gstreamer)")
+    parser.add_argument("--source", help="video file, or 'test' for videotestsrc, instead of the camera")
+    parser.add_argument("--loop", action="store_true", help="restart --source at end of file")
+    parser.add_argument("--slots", type=int, default=8)
+    parser.add_argument("--fps", type=float, default=0, help="pace file sources to this rate (0 = as captured)")
+    parser.add_argument("--idle-exit", type=float, default=0,
+                        help="exit after this many seconds without a reader (0 = run until stopped)")
+    args = parser.parse_args()
+
+    if args.source is None:
+        cap = make_capture(args.backend)
+    elif args.source == "test":
+        cap = GStreamerCapture(source="test")
+    else:
+        cap = FileCapture(args.source, loop=args.loop)
+    ret, first = cap.read()
+    if not ret:
+        print("❌ Could not open camera source")
+        return
+
+    ring = FrameRing(args.name, first.shape, args.slots, create=True)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # run the cleanup below
+    ring.write(first, cap.timestamp)
+    print(f"✅ Camera broker publishing {first.shape[1]}x{first.shape[0]} frames as '{args.name}'.")
+    period = 1.0 / args.fps if args.fps else 0.0
+    next_frame = time.monotonic()
+    in_place = 0
+    try:
+        while True:
+            count, view = ring.begin_write()
+            ret, frame = cap.read(view)  # decodes straight into the slot when shapes match
+            if not ret:
+                print("⚠️ Frame capture failed")
+                break
+            if frame is view or np.shares_memory(frame, view):
+                in_place += 1
+            else:
+                view[...] = frame
+            ring.end_write(count, cap.timestamp)  # the backend's capture time, not ours
+            if args.idle_exit and ring.idle_for() > args.idle_exit:
+                print(f"No reader for {args.idle_exit:.0f} s, releasing the camera.")
+                break
+            if period:
+                next_frame += period
+                time.sleep(max(0.0, next_frame - time.monotonic()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Camera broker stopped after {ring.count} frames ({in_place} captured in place).")
+        age = cap.stats()['age']
+        if age is not None:
+            print(f"Frame age at read: p50 {age['p50_ms']:.1f} ms, p95 {age['p95_ms']:.1f} ms")
+        cap.release()
+        ring.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+import os
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+# The interface every capture backend shares. It is the subset of
+# cv2.VideoCapture the scripts use - isOpened(), read(image=None) -> (ok,
+# frame), release() - plus:
+#   timestamp   wall-clock capture time of the last frame (time.time() base)
+#   stats()     frame count and frame age at read, where the backend knows it
+# Backends:
+#   GStreamerCapture   OpenCV + the pipeline from gst_pipeline.py
+#   FileCapture        video file through OpenCV, optionally looped / paced
+#   V4L2Capture        v4l2_capture.py: ioctl + mmap, kernel timestamps
+# Backend selection via environment for make_capture():
+#   DOG_CAPTURE_BACKEND=gstreamer|v4l2|fake    (default gstreamer)
+#   DOG_CAPTURE_DEVICE=/dev/video0             device, or video file for "fake"
+
+BACKENDS = ("gstreamer", "v4l2", "fake")
+
+
+def summarize_ms(values):
+    if not values:
+        return None
+    values = np.array(values)
+    return {'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)),
+            'max_ms': float(values.max())}
+
+
+class Capture:
+    def __init__(self, window=300):
+        self.timestamp = None
+        self.frames = 0
+        self.ages = deque(maxlen=window)  # ms from capture to read() returning
+
+    def isOpened(self):
+        raise NotImplementedError
+
+    def read(self, image=None):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def _record(self, timestamp, now=None):
+        now = time.time() if now is None else now
+        self.frames += 1
+        self.timestamp = timestamp
+        self.ages.append(max(0.0, (now - timestamp) * 1000))
+
+    def stats(self):
+        return {'frames': self.frames, 'age': summarize_ms(self.ages)}
+
+
+class GStreamerCapture(Capture):
+    # Frame age comes from the pipeline timestamps (see gst_pipeline.TimedCapture)
+    def __init__(self, **pipeline_options):
+        from gst_pipeline import open_pipeline
+        super().__init__()
+        self.cap = open_pipeline(**pipeline_options)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, image=None):
+        ret, frame = self.cap.read(image)
+        if ret:
+            now = time.time()
+            age = self.cap.age  # None when this buffer had no pipeline timestamp
+            self._record(now - age / 1000 if age is not None else now, now)
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+    def stats(self):
+        return dict(self.cap.stats(), frames=self.frames)
+
+
+class FileCapture(Capture):
+    # realtime=True paces reads to the file's frame rate; timestamps follow
+    # the file's own clock, shifted to when playback started
+    def __init__(self, path, loop=False, realtime=False):
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self.cap = cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.started = None
+        self.offset = 0.0  # media seconds played before the last loop
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, image=None):
+        ret, frame = self.cap.read(image)
+        if not ret and self.loop:
+            self.offset += self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000 or self.frames / self.fps
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(image)
+        if not ret:
+            return ret, frame
+        if self.started is None:
+            self.started = time.time()
+        media_time = self.offset + self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+        capture_time = self.started + media_time
+        if self.realtime:
+            time.sleep(max(0.0, capture_time - time.time()))
+        self._record(capture_time if self.realtime else time.time())
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+def make_capture(backend=None, device=None, **options):
+    backend = backend or os.environ.get("DOG_CAPTURE_BACKEND", "gstreamer")
+    device = device or os.environ.get("DOG_CAPTURE_DEVICE")
+    if backend == "gstreamer":
+        return GStreamerCapture(**(dict(options, device=device) if device else options))
+    if backend == "v4l2":
+        from v4l2_capture import V4L2Capture
+        return V4L2Capture(device or "/dev/video0", **options)
+    if backend == "fake":
+        from v4l2_capture import FakeV4L2Device, V4L2Capture
+        return V4L2Capture(FakeV4L2Device(device), **options)
+    raise ValueError(f"Unknown capture backend: {backend}")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+import json
+import os
+import socket
+import threading
+
+from pubsub import is_listening
+
+# Request/response commands over a Unix domain socket, one JSON object per
+# line each way:
+#   -> {"command": "set_deterrent", "frequency": 25000}
+#   <- {"ok": true, ...handler result} or {"ok": false, "error": "..."}
+# Handlers run on the connection's thread and must be quick.
+
+DETECTOR_SOCKET = "/tmp/dog-detector.sock"  # served by my_detection.py
+
+
+class ControlServer:
+    def __init__(self, path, handlers):
+        self.path = path
+        self.handlers = handlers
+        self.running = True
+
+        if os.path.exists(path):
+            if is_listening(path):
+                raise RuntimeError(f"another process is already serving {path}")
+            os.unlink(path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen(8)
+        self.thread = threading.Thread(target=self._accept, name=f"ctl:{os.path.basename(path)}", daemon=True)
+        self.thread.start()
+
+    def _accept(self):
+        while self.running:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn, conn.makefile('rwb') as f:
+            for line in f:
+                f.write((json.dumps(self._dispatch(line), separators=(',', ':')) + "\n").encode())
+                f.flush()
+
+    def _dispatch(self, line):
+        try:
+            request = json.loads(line)
+            command = request.pop('command')
+        except (ValueError, KeyError, AttributeError):
+            return {'ok': False, 'error': "malformed request"}
+        handler = self.handlers.get(command)
+        if handler is None:
+            return {'ok': False, 'error': f"unknown command {command!r}"}
+        try:
+            result = handler(**request)
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+        return dict(result or {}, ok=True)
+
+    def close(self):
+        self.running = False
+        try:
+            self.server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.server.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def send_command(path, command, timeout=1.0, **args):
+    # Raises OSError if nobody is listening on path
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall((json.dumps(dict(args, command=command)) + "\n").encode())
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError(f"{path} closed the connection")
+    return json.loads(line)
@@ -4,9 +4,11 @@ import tkinter as tk
 from tkinter import font
 from tkinter import ttk
 import subprocess
-import Jetson.GPIO as GPIO
+from sensor_daemon import SensorClient, ensure_daemon
+from audio_engine import make_audio_engine
+from tone_synth import tone
+from control_socket import DETECTOR_SOCKET, send_command
 import time
-import os
 
 # --- Optional Firebase integration ---
 import firebase_admin
@@ -15,16 +17,14 @@ from firebase_admin import credentials, db
 # === CONFIGURATION ===
 
 FILE_PATH = 'detection_logs.txt'
-TRIG = 35  # Physical pin 35
-ECHO = 33  # Physical pin 33
 
 FIREBASE_CREDENTIAL_PATH = 'project8-b295f-firebase-adminsdk-fbsvc-619af81878.json'
 FIREBASE_DB_URL = 'https://project8-b295f-default-rtdb.asia-southeast1.firebasedatabase.app/'
 
-# --- GPIO SETUP ---
-GPIO.setmode(GPIO.BOARD)
-GPIO.setup(TRIG, GPIO.OUT)
-GPIO.setup(ECHO, GPIO.IN)
+# --- SENSOR ---
+# sensor_daemon.py owns the ultrasonic pins; this script only subscribes to its readings
+ensure_daemon()
+sensor = SensorClient(autostart=True)
 
 # --- Firebase Initialization (comment if not needed) ---
 cred = credentials.Certificate(FIREBASE_CREDENTIAL_PATH)
@@ -41,34 +41,11 @@ def read_trigger_file():
         return False
 
 def measure_distance():
-    GPIO.output(TRIG, False)
-    time.sleep(0.1)
-    GPIO.output(TRIG, True)
-    time.sleep(0.00001)
-    GPIO.output(TRIG, False)
-    timeout_start = time.time() + 1
-    while GPIO.input(ECHO) == 0:
-        if time.time() > timeout_start:
-            print("Timeout: ECHO did not go high")
-            return None
-    pulse_start = time.time()
-    timeout_end = time.time() + 1
-    while GPIO.input(ECHO) == 1:
-        if time.time() > timeout_end:
-            print("Timeout: ECHO did not go low")
-            return None
-    pulse_end = time.time()
-    pulse_duration = pulse_end - pulse_start
-    distance_cm = round(pulse_duration * 17150, 2)
-    distance_m = round(distance_cm / 100, 3)
-    return distance_cm, distance_m
-
-def kill_all_aplay():
-    try:
-        os.system("pkill -9 aplay")
-        print("All aplay processes killed.")
-    except Exception as e:
-        print(f"Error killing aplay processes: {e}")
+    return sensor.measure()
+
+# Speaker test tones play in-process; my_detection.py has its own engine
+speaker = make_audio_engine()
+SPEAKER_TEST_SECONDS = 3.0  # test tones play once for this long, like the old WAV files
 
 class ButtonApp:
     def __init__(self, master):
@@ -77,7 +54,6 @@ class ButtonApp:
         master.geometry("700x520")
 
         self.camera_process = None
-        self.speaker_process = None
         self.distance_monitoring = False
         self.distance_job = None
 
@@ -135,6 +111,7 @@ class ButtonApp:
             state="readonly"
         )
         self.display_freq_dropdown.grid(row=0, column=3, sticky="nsew", padx=5, pady=5)
+        self.display_freq_dropdown.bind("<<ComboboxSelected>>", self.on_display_freq_selected)
 
         # Start Detection button (disabled by default)
         self.btn_start_detection = tk.Button(main_frame, text="Start Detection", font=button_font, command=self.start_camera_clicked, state=tk.DISABLED)
@@ -217,29 +194,49 @@ class ButtonApp:
         self.btn_stop_monitor.grid(row=2, column=1, sticky="nsew", padx=5, pady=5)
 
     def on_speaker_dropdown_selected(self, event):
-        freq = self.freq_var.get()
-        wav_file = f"{freq}.wav"
-        self.play_speaker_selected(wav_file)
+        self.play_speaker_selected(self.freq_var.get())
 
-    def play_speaker_selected(self, selected_file):
-        print(f"Playing sound: {selected_file}")
+    def play_speaker_selected(self, freq):
+        print(f"Playing tone: {freq}")
         try:
-            kill_all_aplay()
-            self.speaker_process = subprocess.Popen(['aplay', f'./{selected_file}'])
-            print("aplay launched.")
+            speaker.play(tone(freq, duration=SPEAKER_TEST_SECONDS), loop=False)
         except Exception as e:
-            print(f"Failed to launch aplay: {e}")
+            print(f"Failed to play tone: {e}")
 
     def stop_speaker_clicked(self):
-        kill_all_aplay()
-        self.speaker_process = None
+        speaker.stop()
         self.freq_var.set(self.speaker_freqs[0])
-        print("All aplay processes killed (Stop Speaker Test).")
+        print("Speaker test stopped.")
+
+    def detection_running(self):
+        return self.camera_process is not None and self.camera_process.poll() is None
+
+    def set_deterrent(self, freq):
+        # Switch the running detector's frequency without restarting it
+        try:
+            reply = send_command(DETECTOR_SOCKET, "set_deterrent", frequency=freq)
+        except OSError as e:
+            print(f"Detector not reachable: {e}")
+            return False
+        if not reply.get('ok'):
+            print(f"Detector refused {freq}: {reply.get('error')}")
+            return False
+        print(f"Deterrent switched to {freq} live.")
+        return True
+
+    def on_display_freq_selected(self, event):
+        freq = self.display_freq_var.get()
+        if freq != "Select Frequency..." and self.detection_running():
+            self.set_deterrent(freq)
 
     def start_camera_clicked(self):
         print("Start button pressed! Starting camera...")
         try:
-            if self.camera_process and self.camera_process.poll() is None:
+            freq = self.display_freq_var.get()
+            if self.detection_running():
+                # Already running: only the deterrent changes, the camera stays warm
+                if self.set_deterrent(freq):
+                    return
                 self.camera_process.terminate()
                 try:
                     self.camera_process.wait(timeout=1)
@@ -248,13 +245,8 @@ class ButtonApp:
                 print("Existing camera process terminated.")
                 self.camera_process = None
 
-            freq = self.display_freq_var.get()
-            if freq == "10khz":
-                script = "my_detection.py"
-            else:
-                script = f"my_detection{freq}.py"
-            self.camera_process = subprocess.Popen(['python3', script])
-            print(f"Camera started using {script}.")
+            self.camera_process = subprocess.Popen(['python3', 'my_detection.py', '--frequency', freq])
+            print(f"Camera started with a {freq} deterrent.")
             self.start_distance_monitoring()
         except Exception as e:
             print(f"Failed to start camera: {e}")
@@ -353,10 +345,8 @@ class ButtonApp:
                 self.camera_process.kill()
             print("Camera process terminated by Stop Detection.")
             self.camera_process = None
-        kill_all_aplay()
-        self.speaker_process = None
+        speaker.stop()
         self.freq_var.set(self.speaker_freqs[0])
-        print("All aplay processes killed (Stop Detection).")
         self.stop_distance_monitoring()
         print("All detection processes stopped.")
 
@@ -370,10 +360,8 @@ class ButtonApp:
             except subprocess.TimeoutExpired:
                 self.camera_process.kill()
             print("Camera process terminated on exit.")
-        kill_all_aplay()
-        self.speaker_process = None
-        print("All aplay processes killed on exit.")
-        GPIO.cleanup()
+        speaker.close()
+        sensor.stop()
         self.master.destroy()
 
 if __name__ == "__main__":
@@ -4,71 +4,59 @@ import tkinter as tk
 from tkinter import font
 from tkinter import ttk
 import subprocess
-import Jetson.GPIO as GPIO
+from sensor_daemon import SensorClient, ensure_daemon
+from detection_events import DetectionSubscriber
+from telemetry_uploader import TelemetryUploader, make_sink
+from audio_engine import make_audio_engine
+from tone_synth import KINDS, tone
+from detector_client import DetectorClient, DetectorError, ensure_detector
+from ui_worker import UiWorker, WidgetCache
+import threading
 import time
-import os
-
-# --- Optional Firebase integration ---
-import firebase_admin
-from firebase_admin import credentials, db
 
 # === CONFIGURATION ===
 
-FILE_PATH = 'detection_logs.txt'
-TRIG = 35  # Physical pin 35
-ECHO = 33  # Physical pin 33
-
 FIREBASE_CREDENTIAL_PATH = 'project8-b295f-firebase-adminsdk-fbsvc-619af81878.json'
 FIREBASE_DB_URL = 'https://project8-b295f-default-rtdb.asia-southeast1.firebasedatabase.app/'
 
-# --- GPIO SETUP ---
-GPIO.setmode(GPIO.BOARD)
-GPIO.setup(TRIG, GPIO.OUT)
-GPIO.setup(ECHO, GPIO.IN)
-
-# --- Firebase Initialization (comment if not needed) ---
-cred = credentials.Certificate(FIREBASE_CREDENTIAL_PATH)
-firebase_admin.initialize_app(cred, {'databaseURL': FIREBASE_DB_URL})
-distance_ref = db.reference('distance')
-player_ref = db.reference('player')
-
-def read_detection_file():
-    try:
-        with open(FILE_PATH, 'r') as file:
-            content = file.read().strip().lower()
-            return content
-    except FileNotFoundError:
-        return None
+# --- SENSOR ---
+# sensor_daemon.py owns the ultrasonic pins; this script only subscribes to its readings
+
+# --- DETECTIONS ---
+# Pushed by my_detection.py as they happen; see detection_events.py.
+# A dog is only acted on while the detector keeps reporting it (it sends
+# several results a second while a dog is in view).
+DETECTION_MAX_AGE = 5.0  # seconds
+
+# --- DETECTOR ---
+# my_detection.py runs as a warm-standby daemon; Start/Stop only switch it on and off.
+# Started without waiting so the camera is warming up while the UI comes up.
+
+# Speaker test tones play in-process; my_detection.py has its own engine
+SPEAKER_TEST_SECONDS = 3.0  # test tones play once for this long, like the old WAV files
+
+# Services, set up by start_services() so that importing this module has no side effects
+sensor = None
+detections = None
+telemetry = None
+detector = None
+detector_process = None
+speaker = None
+
+def start_services():
+    global sensor, detections, telemetry, detector, detector_process, speaker
+    ensure_daemon()
+    sensor = SensorClient(autostart=True)
+    detections = DetectionSubscriber()
+    # Uploads run on a background thread; set() never waits on the network.
+    # Firebase is only initialised when the Firebase sink is used.
+    telemetry = TelemetryUploader(make_sink(FIREBASE_CREDENTIAL_PATH, FIREBASE_DB_URL))
+    detector = DetectorClient()
+    detector_process = ensure_detector(wait=0)
+    speaker = make_audio_engine()
 
 def measure_distance():
-    GPIO.output(TRIG, False)
-    time.sleep(0.1)
-    GPIO.output(TRIG, True)
-    time.sleep(0.00001)
-    GPIO.output(TRIG, False)
-    timeout_start = time.time() + 1
-    while GPIO.input(ECHO) == 0:
-        if time.time() > timeout_start:
-            print("Timeout: ECHO did not go high")
-            return None
-    pulse_start = time.time()
-    timeout_end = time.time() + 1
-    while GPIO.input(ECHO) == 1:
-        if time.time() > timeout_end:
-            print("Timeout: ECHO did not go low")
-            return None
-    pulse_end = time.time()
-    pulse_duration = pulse_end - pulse_start
-    distance_cm = round(pulse_duration * 17150, 2)
-    distance_m = round(distance_cm / 100, 3)
-    return distance_cm, distance_m
-
-def kill_all_aplay():
-    try:
-        os.system("pkill -9 aplay")
-        print("All aplay processes killed.")
-    except Exception as e:
-        print(f"Error killing aplay processes: {e}")
+    return sensor.measure()
 
 class ButtonApp:
     def __init__(self, master):
@@ -76,10 +64,16 @@ class ButtonApp:
         master.title("Dog Detection")
         master.geometry("700x520")
 
-        self.camera_process = None
-        self.speaker_process = None
+        self.camera_process = None  # testcamera.py
+        self.start_clicked_at = None
+        self.last_start_latency = None
+        detections.callback = self.on_detection_event
         self.distance_monitoring = False
-        self.distance_job = None
+        self.monitor_thread = None
+
+        # Blocking work runs on the worker; widgets only change when their value does
+        self.worker = UiWorker(master)
+        self.widgets = WidgetCache()
 
         button_font = font.Font(family='Helvetica', size=12, weight='bold')
 
@@ -115,7 +109,7 @@ class ButtonApp:
 
         # Distance variable (shared for home and distance tabs)
         self.distance_var = tk.StringVar()
-        self.distance_var.set("Distance: N/A")
+        self.show_distance("Distance: N/A")
 
         # Distance label in Home tab (live-updating)
         self.home_distance_label = tk.Label(main_frame, textvariable=self.distance_var, font=button_font, fg="#1338be")
@@ -125,6 +119,19 @@ class ButtonApp:
         self.btn_start_detection = tk.Button(main_frame, text="Start Detection", font=button_font, command=self.start_camera_clicked, state=tk.NORMAL)
         self.btn_start_detection.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
 
+        # Deterrent pattern; applied live when detection is already running
+        self.pattern_var = tk.StringVar()
+        self.pattern_var.set(KINDS[0])
+        self.pattern_dropdown = ttk.Combobox(
+            main_frame,
+            textvariable=self.pattern_var,
+            values=KINDS,
+            font=button_font,
+            state="readonly"
+        )
+        self.pattern_dropdown.grid(row=0, column=1, sticky="nsew", padx=5, pady=5)
+        self.pattern_dropdown.bind("<<ComboboxSelected>>", self.on_pattern_selected)
+
         btn_stop_detection = tk.Button(
             main_frame, text="Stop Detection", font=button_font,
             command=self.stop_detection_clicked, bg="#be1313", fg="white"
@@ -194,169 +201,222 @@ class ButtonApp:
         self.btn_stop_monitor.grid(row=2, column=1, sticky="nsew", padx=5, pady=5)
 
     def on_speaker_dropdown_selected(self, event):
-        freq = self.freq_var.get()
-        wav_file = f"{freq}.wav"
-        self.play_speaker_selected(wav_file)
+        self.play_speaker_selected(self.freq_var.get())
 
-    def play_speaker_selected(self, selected_file):
-        print(f"Playing sound: {selected_file}")
+    def play_speaker_selected(self, freq):
+        # freq is a name like "40khz"; the tone is synthesized, no WAV file needed
+        print(f"Playing tone: {freq}")
         try:
-            kill_all_aplay()
-            self.speaker_process = subprocess.Popen(['aplay', f'./{selected_file}'])
-            print("aplay launched.")
+            speaker.play(tone(freq, duration=SPEAKER_TEST_SECONDS), loop=False)
         except Exception as e:
-            print(f"Failed to launch aplay: {e}")
+            print(f"Failed to play tone: {e}")
 
     def stop_speaker_clicked(self):
-        kill_all_aplay()
-        self.speaker_process = None
+        speaker.stop()
         self.freq_var.set(self.speaker_freqs[0])
-        print("All aplay processes killed (Stop Speaker Test).")
+        print("Speaker test stopped.")
 
-    def start_camera_clicked(self):
-        print("Start button pressed! Starting camera...")
-        try:
-            if self.camera_process and self.camera_process.poll() is None:
-                self.camera_process.terminate()
-                try:
-                    self.camera_process.wait(timeout=1)
-                except subprocess.TimeoutExpired:
-                    self.camera_process.kill()
-                print("Existing camera process terminated.")
-                self.camera_process = None
-
-            # Only use my_detection.py
-            script = "my_detection.py"
-            self.camera_process = subprocess.Popen(['python3', script])
-            print(f"Camera started using {script}.")
-            self.start_distance_monitoring()
-        except Exception as e:
-            print(f"Failed to start camera: {e}")
+    def show_distance(self, text):
+        # Tk thread only
+        self.widgets.set(self.distance_var, text)
 
-    def action3_clicked(self):
-        print("Button 'Test Distance' was clicked!")
+    def detection_running(self):
         try:
-            result = measure_distance()
-            if result is not None:
-                distance_cm, distance_m = result
-                self.distance_var.set(f"Distance: {distance_cm} cm ({distance_m} m)")
-                print(f"Distance reading: {distance_cm} cm ({distance_m} m)")
-                timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-                distance_ref.set({
-                    'cm': distance_cm,
-                    'm': distance_m,
-                    'timestamp': timestamp
-                })
-            else:
-                self.distance_var.set("Distance: Error")
-                print("Error measuring distance")
-        except Exception as e:
-            self.distance_var.set("Distance: Error")
-            print(f"Exception measuring distance: {e}")
-
-    def action4_clicked(self):
-        print("Button 'Test Camera' was clicked!")
+            return detector.status()['state'] in ("running", "paused")
+        except DetectorError:
+            return False
+
+    def set_deterrent(self, **settings):
+        # Worker thread: change the running detector's deterrent without restarting it
+        if not self.detection_running():
+            return False
         try:
-            if self.camera_process and self.camera_process.poll() is None:
-                self.camera_process.terminate()
-                try:
-                    self.camera_process.wait(timeout=1)
-                except subprocess.TimeoutExpired:
-                    self.camera_process.kill()
-                print("Existing camera process terminated.")
-                self.camera_process = None
-            self.camera_process = subprocess.Popen(['python3', 'testcamera.py'])
-            print("testcamera.py launched.")
-        except Exception as e:
-            print(f"Failed to launch testcamera.py: {e}")
-
-    def stop_camera_clicked(self):
+            detector.set_deterrent(**settings)
+        except DetectorError as e:
+            print(f"Could not change deterrent: {e}")
+            return False
+        return True
+
+    def on_pattern_selected(self, event):
+        self.worker.submit(self.set_deterrent, pattern=self.pattern_var.get())
+
+    def on_detection_event(self, event):
+        # Subscriber thread: only measures, never touches Tk
+        clicked_at = self.start_clicked_at
+        if clicked_at is not None and event['t'] >= clicked_at:
+            self.start_clicked_at = None
+            self.last_start_latency = time.time() - clicked_at
+            print(f"Click to first detection: {self.last_start_latency * 1000:.0f} ms")
+
+    def stop_test_camera(self):
+        # Worker thread
         if self.camera_process and self.camera_process.poll() is None:
             self.camera_process.terminate()
             try:
                 self.camera_process.wait(timeout=1)
             except subprocess.TimeoutExpired:
                 self.camera_process.kill()
-            print("Camera process terminated.")
-            self.camera_process = None
+            print("Camera test terminated.")
+        self.camera_process = None
+
+    def start_camera_clicked(self):
+        print("Start button pressed! Starting detection...")
+        self.start_clicked_at = time.time()
+        self.worker.submit(self.start_detection, self.start_clicked_at, self.pattern_var.get(),
+                           on_done=lambda _: self.start_distance_monitoring(),
+                           on_error=self.on_start_failed)
+
+    def start_detection(self, clicked_at, pattern):
+        # Worker thread
+        global detector_process
+        if not detector.running:
+            # Only after a crash; normally the daemon is already warm
+            print("Detector daemon not running, starting it...")
+            detector_process = ensure_detector()
+        detector.start(clicked_at=clicked_at, frequency=self.speaker_freqs[0], pattern=pattern)
+        print("Detection started.")
+
+    def on_start_failed(self, error):
+        self.start_clicked_at = None
+        print(f"Failed to start detection: {error}")
+
+    def action3_clicked(self):
+        print("Button 'Test Distance' was clicked!")
+        self.worker.submit(self.read_and_upload_distance, on_done=self.on_test_distance,
+                           on_error=self.on_test_distance_failed)
+
+    def read_and_upload_distance(self):
+        # Worker/monitor thread: returns the (cm, m) reading or None
+        result = measure_distance()
+        if result is not None:
+            distance_cm, distance_m = result
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+            telemetry.set('distance', {
+                'cm': distance_cm,
+                'm': distance_m,
+                'timestamp': timestamp
+            })
+        return result
+
+    def on_test_distance(self, result):
+        if result is not None:
+            distance_cm, distance_m = result
+            self.show_distance(f"Distance: {distance_cm} cm ({distance_m} m)")
+            print(f"Distance reading: {distance_cm} cm ({distance_m} m)")
         else:
-            print("No camera process is running.")
+            self.show_distance("Distance: Error")
+            print("Error measuring distance")
+
+    def on_test_distance_failed(self, error):
+        self.show_distance("Distance: Error")
+        print(f"Exception measuring distance: {error}")
+
+    def action4_clicked(self):
+        print("Button 'Test Camera' was clicked!")
+        self.worker.submit(self.launch_test_camera,
+                           on_error=lambda e: print(f"Failed to launch testcamera.py: {e}"))
+
+    def launch_test_camera(self):
+        # Worker thread
+        self.stop_test_camera()
+        self.camera_process = subprocess.Popen(['python3', 'testcamera.py'])
+        print("testcamera.py launched.")
+
+    def stop_camera_clicked(self):
+        self.worker.submit(self.stop_test_camera)
 
     def start_distance_monitoring(self):
         if not self.distance_monitoring:
             self.distance_monitoring = True
-            self.update_distance()
+            self.monitor_thread = threading.Thread(target=self.monitor_distance, name="monitor", daemon=True)
+            self.monitor_thread.start()
             print("Distance monitoring started.")
 
     def stop_distance_monitoring(self):
         self.distance_monitoring = False
-        if self.distance_job is not None:
-            self.master.after_cancel(self.distance_job)
-            self.distance_job = None
+        self.monitor_thread = None
+        self.show_distance("Distance: N/A")
         print("Distance monitoring stopped.")
 
-    def update_distance(self):
-        if self.distance_monitoring:
+    def monitor_distance(self):
+        # Monitor thread: wakes on each detection event (or every 0.5 s), does the
+        # sensor and Firebase work here, and hands only the text to the Tk thread
+        me = threading.current_thread()
+        while self.distance_monitoring and self.monitor_thread is me:
             try:
-                detection = read_detection_file()
+                detection = detections.current_state(DETECTION_MAX_AGE)
                 if detection == "dog_with_collar":
-                    self.distance_var.set("Dog With Collar")
+                    text = "Dog With Collar"
                 elif detection == "dog_without_collar":
-                    result = measure_distance()
+                    result = self.read_and_upload_distance()
                     if result is not None:
                         distance_cm, distance_m = result
-                        self.distance_var.set(f"Distance: {distance_cm} cm ({distance_m} m)")
+                        text = f"Distance: {distance_cm} cm ({distance_m} m)"
                         print(f"[Live] Distance: {distance_cm} cm ({distance_m} m)")
-                        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-                        distance_ref.set({
-                            'cm': distance_cm,
-                            'm': distance_m,
-                            'timestamp': timestamp
-                        })
                     else:
-                        self.distance_var.set("Distance: Error")
+                        text = "Distance: Error"
                 else:
-                    self.distance_var.set("")
+                    text = ""
             except Exception as e:
-                self.distance_var.set("Distance: Error")
+                text = "Distance: Error"
                 print(f"Exception in live distance: {e}")
-            self.distance_job = self.master.after(500, self.update_distance)
-        else:
-            self.distance_var.set("Distance: N/A")
+            if self.distance_monitoring and self.monitor_thread is me:
+                self.worker.post(self.show_distance, text)
+            detections.wait(0.5)
 
-    def stop_detection_clicked(self):
-        if self.camera_process and self.camera_process.poll() is None:
-            self.camera_process.terminate()
+    def shutdown_detector(self):
+        global detector_process
+        if detector.running:
             try:
-                self.camera_process.wait(timeout=1)
+                detector.shutdown()
+            except DetectorError as e:
+                print(f"Could not shut down detector: {e}")
+        if detector_process is not None:
+            try:
+                detector_process.wait(timeout=5)
             except subprocess.TimeoutExpired:
-                self.camera_process.kill()
-            print("Camera process terminated by Stop Detection.")
-            self.camera_process = None
-        kill_all_aplay()
-        self.speaker_process = None
+                detector_process.kill()
+            detector_process = None
+
+    def stop_detection(self):
+        # Worker thread. Back to standby: the daemon keeps the camera warm for the next Start
+        if detector.running:
+            try:
+                detector.stop()
+                print("Detection stopped, detector on standby.")
+            except DetectorError as e:
+                print(f"Could not stop detection: {e}")
+
+    def stop_detection_clicked(self):
+        self.worker.submit(self.stop_detection)
+        self.start_clicked_at = None
+        speaker.stop()
         self.freq_var.set(self.speaker_freqs[0])
-        print("All aplay processes killed (Stop Detection).")
         self.stop_distance_monitoring()
         print("All detection processes stopped.")
 
     def close_window(self):
         print("Closing the application...")
         self.stop_distance_monitoring()
-        if self.camera_process and self.camera_process.poll() is None:
-            self.camera_process.terminate()
-            try:
-                self.camera_process.wait(timeout=1)
-            except subprocess.TimeoutExpired:
-                self.camera_process.kill()
-            print("Camera process terminated on exit.")
-        kill_all_aplay()
-        self.speaker_process = None
-        print("All aplay processes killed on exit.")
-        GPIO.cleanup()
+        self.worker.close()
+        stats = self.worker.stats()
+        print(f"UI latency: p50 {stats['lag_p50_ms']:.1f} ms, p95 {stats['lag_p95_ms']:.1f} ms, "
+              f"max {stats['lag_max_ms']:.1f} ms, {stats['stalls']} stalls; "
+              f"{self.widgets.skipped} unchanged widget updates skipped.")
+        # Exiting anyway, so the remaining blocking cleanup can run here
+        self.stop_test_camera()
+        self.shutdown_detector()
+        speaker.close()
+        detections.close()
+        telemetry.close()
+        sensor.stop()
         self.master.destroy()
 
-if __name__ == "__main__":
+def main():
+    start_services()
     root = tk.Tk()
     app = ButtonApp(root)
     root.mainloop()
+
+if __name__ == "__main__":
+    main()
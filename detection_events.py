@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+import os
+import threading
+import time
+
+from pubsub import Publisher, Subscriber
+
+# Structured detection events pushed from my_detection.py to any local
+# consumer over a Unix socket, replacing polling of detection_logs.txt.
+# Each event: {'type': 'detection', 'session', 'frame_id', 't', 'state', 'classes', 'boxes'}
+# where state is "dog_without_collar", "dog_with_collar" or "none". session is
+# the publisher's start time; frame ids count up from 1 again after a restart.
+
+DETECTION_SOCKET = "/tmp/dog-detections.sock"
+LEGACY_LOG_PATH = "detection_logs.txt"
+
+
+def detection_state(detections):
+    classes = {det['class'] for det in detections}
+    if "dog_without_collar" in classes:
+        return "dog_without_collar"
+    if "dog_with_collar" in classes:
+        return "dog_with_collar"
+    return "none"
+
+
+class LegacyLogWriter:
+    # Keeps detection_logs.txt up to date for old readers ("true" = collarless
+    # dog, "false" = collared dog; left untouched when nothing is seen), but
+    # only rewrites it when the value changes, and atomically.
+
+    def __init__(self, path=LEGACY_LOG_PATH):
+        self.path = path
+        self.last = None
+
+    def write(self, state):
+        content = {"dog_without_collar": "true\n", "dog_with_collar": "false\n"}.get(state)
+        if content is None or content == self.last:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(content)
+        os.replace(tmp, self.path)
+        self.last = content
+
+
+class DetectionEventPublisher:
+    def __init__(self, path=DETECTION_SOCKET, legacy_log=LEGACY_LOG_PATH):
+        self.publisher = Publisher(path)
+        self.session = time.time()
+        self.legacy = LegacyLogWriter(legacy_log) if legacy_log else None
+
+    def publish(self, frame_id, detections, timestamp=None):
+        state = detection_state(detections)
+        self.publisher.publish({
+            'type': 'detection',
+            'session': self.session,
+            'frame_id': frame_id,
+            't': time.time() if timestamp is None else timestamp,
+            'state': state,
+            'classes': sorted({det['class'] for det in detections}),
+            'boxes': [
+                {k: det[k] for k in ('x', 'y', 'width', 'height', 'confidence', 'class') if k in det}
+                for det in detections
+            ],
+        })
+        if self.legacy is not None:
+            self.legacy.write(state)
+
+    def close(self):
+        self.publisher.close()
+
+
+class DetectionSubscriber:
+    # Keeps the latest detection event and optionally calls callback(event) for
+    # each new one from the subscriber thread. wait() blocks until an event
+    # newer than the last one it returned for has arrived (events in between
+    # calls are not lost). last_dog latches the last dog state seen, like
+    # detection_logs.txt did.
+
+    def __init__(self, callback=None, path=DETECTION_SOCKET):
+        self.callback = callback
+        self.latest = None
+        self.last_dog = None
+        self.cond = threading.Condition()
+        self.events = 0  # events received so far
+        self.seen = 0  # events[:seen] were reported by wait()
+        self.subscriber = Subscriber(path, self._on_message)
+
+    def _on_message(self, message):
+        if message.get('type') != 'detection':
+            return
+        key = (message.get('session'), message.get('frame_id'))
+        if self.latest is not None and key == (self.latest.get('session'), self.latest.get('frame_id')):
+            return  # replay of an event we already have
+        with self.cond:
+            self.latest = message
+            if message.get('state') not in (None, "none"):
+                self.last_dog = message['state']
+            self.events += 1
+            self.cond.notify_all()
+        if self.callback is not None:
+            self.callback(message)
+
+    @property
+    def state(self):
+        return self.latest['state'] if self.latest is not None else None
+
+    def current_state(self, max_age):
+        # state, or None when the detector's last event is older than max_age
+        # seconds or the bus is down (e.g. the detector stopped)
+        latest = self.latest
+        if latest is None or not self.subscriber.connected or time.time() - latest.get('t', 0.0) > max_age:
+            return None
+        return latest['state']
+
+    def wait(self, timeout=None):
+        # True if there was a new event, False on timeout
+        with self.cond:
+            fired = self.cond.wait_for(lambda: self.events > self.seen, timeout)
+            self.seen = self.events
+        return fired
+
+    def close(self):
+        self.subscriber.close()
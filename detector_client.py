@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import os
+import subprocess
+import sys
+import time
+
+from control_socket import DETECTOR_SOCKET, send_command
+from pubsub import is_listening
+
+# Client for my_detection.py running as a warm-standby daemon
+# (python3 my_detection.py --daemon). The daemon keeps the camera pipeline
+# open and idle; start/pause/resume/stop only switch inference and the
+# display on and off, so a Start click does not pay for process start-up,
+# imports, pipeline negotiation or auto-exposure settling.
+
+
+class DetectorError(RuntimeError):
+    pass
+
+
+class DetectorClient:
+    def __init__(self, path=DETECTOR_SOCKET, timeout=2.0):
+        self.path = path
+        self.timeout = timeout
+
+    def _call(self, command, **args):
+        try:
+            reply = send_command(self.path, command, timeout=self.timeout, **args)
+        except OSError as e:
+            raise DetectorError(f"detector not reachable on {self.path}: {e}") from e
+        if not reply.pop('ok', False):
+            raise DetectorError(reply.get('error', "command failed"))
+        return reply
+
+    @property
+    def running(self):
+        return is_listening(self.path)
+
+    def start(self, clicked_at=None, **deterrent):
+        # clicked_at (time.time() of the user's click) lets the daemon report
+        # click-to-first-detection latency
+        return self._call("start", clicked_at=clicked_at or time.time(), **deterrent)
+
+    def pause(self):
+        return self._call("pause")
+
+    def resume(self):
+        return self._call("resume")
+
+    def stop(self):
+        return self._call("stop")
+
+    def status(self):
+        return self._call("status")
+
+    def set_deterrent(self, frequency=None, pattern=None):
+        return self._call("set_deterrent", frequency=frequency, pattern=pattern)
+
+    def shutdown(self):
+        return self._call("shutdown")
+
+
+def ensure_detector(path=DETECTOR_SOCKET, wait=20.0, args=()):
+    # Starts the detector daemon unless one is already serving path. Returns
+    # the Popen of the daemon we started, or None if one was already running.
+    # The wait covers camera start-up, which is paid once here, not per click.
+    if is_listening(path):
+        return None
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "my_detection.py")
+    process = subprocess.Popen([sys.executable, script, "--daemon", "--control-socket", path, *args])
+    deadline = time.time() + wait
+    while time.time() < deadline and not is_listening(path):
+        if process.poll() is not None:
+            raise DetectorError(f"detector daemon exited with code {process.returncode}")
+        time.sleep(0.05)
+    return process
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+import cv2
+import numpy as np
+
+from inference_client import InferenceClient
+
+# Every detector returns Roboflow-style predictions in FRAME_RESIZE pixel space:
+# [{'x': cx, 'y': cy, 'width': w, 'height': h, 'confidence': c, 'class': name}, ...]
+
+FRAME_RESIZE = (416, 416)
+CLASS_NAMES = ["dog_with_collar", "dog_without_collar"]
+
+
+class EncodedFrame:
+    # A frame that arrives already JPEG-encoded: from the GStreamer tee branch
+    # at the detector resolution, or straight from an MJPEG camera at its own
+    # size. shape is that of the displayed frame it stands in for, so it can be
+    # passed wherever a frame goes; size is the JPEG's (width, height).
+    def __init__(self, jpeg, shape, size=FRAME_RESIZE):
+        self.jpeg = jpeg
+        self.shape = shape
+        self.size = tuple(size)
+
+    def decode(self, min_size=None):
+        # With min_size, libjpeg scales down by 2, 4 or 8 in the DCT domain as
+        # far as the result stays at least min_size, which is far cheaper than
+        # decoding in full and resizing
+        flag = cv2.IMREAD_COLOR
+        if min_size is not None:
+            for factor, reduced in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                    (2, cv2.IMREAD_REDUCED_COLOR_2)):
+                if self.size[0] // factor >= min_size[0] and self.size[1] // factor >= min_size[1]:
+                    flag = reduced
+                    break
+        return cv2.imdecode(np.frombuffer(self.jpeg, np.uint8), flag)
+
+
+def rescale_predictions(predictions, from_size, to_size):
+    sx = to_size[0] / from_size[0]
+    sy = to_size[1] / from_size[1]
+    return [dict(p, x=p['x'] * sx, y=p['y'] * sy, width=p['width'] * sx, height=p['height'] * sy)
+            for p in predictions]
+
+
+class Detector:
+    name = "base"
+
+    def detect(self, frame):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class RoboflowDetector(Detector):
+    name = "roboflow"
+
+    def __init__(self, model_url, frame_resize=FRAME_RESIZE, client=None, **client_kwargs):
+        self.frame_resize = frame_resize
+        self.client = client if client is not None else InferenceClient(model_url, **client_kwargs)
+
+    def detect(self, frame):
+        if isinstance(frame, EncodedFrame):
+            # Sent as is; the model answers in the JPEG's own pixel space
+            predictions = self.detect_jpeg(frame.jpeg)
+            if frame.size != tuple(self.frame_resize):
+                predictions = rescale_predictions(predictions, frame.size, self.frame_resize)
+            return predictions
+        resized = cv2.resize(frame, self.frame_resize)
+        _, img_encoded = cv2.imencode('.jpg', resized)
+        return self.detect_jpeg(img_encoded.tobytes())
+
+    def detect_jpeg(self, img_bytes, deadline=None):
+        return self.client.post_image(img_bytes, deadline=deadline).get("predictions", [])
+
+    def close(self):
+        self.client.close()
+
+
+def decode_yolo_output(output, class_names, conf_threshold, nms_threshold):
+    # Accepts YOLOv5 (1, N, 5 + C) and YOLOv8 (1, 4 + C, N) layouts.
+    out = np.squeeze(output)
+    if out.ndim != 2:
+        return []
+    num_classes = len(class_names)
+    if out.shape[0] in (4 + num_classes, 5 + num_classes) and out.shape[1] > out.shape[0]:
+        out = out.T
+
+    boxes = out[:, :4]
+    if out.shape[1] == 5 + num_classes:
+        scores = out[:, 5:] * out[:, 4:5]
+    else:
+        scores = out[:, 4:4 + num_classes]
+
+    class_ids = np.argmax(scores, axis=1)
+    confidences = scores[np.arange(len(scores)), class_ids]
+    keep = confidences >= conf_threshold
+    if not np.any(keep):
+        return []
+    boxes, class_ids, confidences = boxes[keep], class_ids[keep], confidences[keep]
+
+    # NMSBoxes wants top-left corner boxes
+    tl_boxes = np.column_stack((boxes[:, 0] - boxes[:, 2] / 2, boxes[:, 1] - boxes[:, 3] / 2, boxes[:, 2], boxes[:, 3]))
+    indices = cv2.dnn.NMSBoxes(tl_boxes.tolist(), confidences.tolist(), conf_threshold, nms_threshold)
+
+    predictions = []
+    for i in np.array(indices).flatten():
+        cx, cy, w, h = boxes[i]
+        predictions.append({
+            'x': float(cx),
+            'y': float(cy),
+            'width': float(w),
+            'height': float(h),
+            'confidence': float(confidences[i]),
+            'class': class_names[int(class_ids[i])],
+        })
+    return predictions
+
+
+class LocalDetector(Detector):
+    # Runs an exported YOLO ONNX model on the CPU, preferring ONNX Runtime and
+    # falling back to OpenCV DNN when onnxruntime is not installed.
+    name = "local"
+
+    def __init__(self, model_path, class_names=CLASS_NAMES, frame_resize=FRAME_RESIZE,
+                 conf_threshold=0.4, nms_threshold=0.45, engine="auto"):
+        self.class_names = class_names
+        self.frame_resize = frame_resize
+        self.conf_threshold = conf_threshold
+        self.nms_threshold = nms_threshold
+        self.session = None
+        self.net = None
+
+        if engine in ("auto", "onnxruntime"):
+            try:
+                import onnxruntime as ort
+                self.session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+                self.input_name = self.session.get_inputs()[0].name
+                self.name = "onnxruntime"
+            except ImportError:
+                if engine == "onnxruntime":
+                    raise
+        if self.session is None:
+            self.net = cv2.dnn.readNetFromONNX(model_path)
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            self.name = "opencv-dnn"
+
+    def detect(self, frame):
+        if isinstance(frame, EncodedFrame):
+            frame = frame.decode(min_size=self.frame_resize)
+        blob = cv2.dnn.blobFromImage(frame, 1 / 255.0, self.frame_resize, swapRB=True, crop=False)
+        if self.session is not None:
+            output = self.session.run(None, {self.input_name: blob})[0]
+        else:
+            self.net.setInput(blob)
+            output = self.net.forward()
+        return decode_yolo_output(output, self.class_names, self.conf_threshold, self.nms_threshold)
+
+
+def make_detector(backend, model_url=None, model_path=None, client_kwargs=None, **kwargs):
+    if backend == "roboflow":
+        return RoboflowDetector(model_url, **(client_kwargs or {}), **kwargs)
+    if backend in ("local", "onnxruntime", "opencv-dnn"):
+        engine = {"local": "auto", "onnxruntime": "onnxruntime", "opencv-dnn": "opencv"}[backend]
+        return LocalDetector(model_path, engine=engine, **kwargs)
+    raise ValueError(f"Unknown detector backend: {backend}")
@@ -1,82 +1,54 @@
-import Jetson.GPIO as GPIO
+from sensor_daemon import SensorClient, ensure_daemon
+from detection_events import DetectionSubscriber
+from telemetry_uploader import TelemetryUploader, make_sink
 import time
-import firebase_admin
-from firebase_admin import credentials, db
 
 # === CONFIGURATION ===
 
-FILE_PATH = 'detection_logs.txt'
-TRIG = 35  # Physical pin 35
-ECHO = 33  # Physical pin 33
+UPDATE_INTERVAL = 1.0  # seconds between distance uploads while a player is seen
 
 FIREBASE_CREDENTIAL_PATH = 'project8-b295f-firebase-adminsdk-fbsvc-619af81878.json'
 FIREBASE_DB_URL = 'https://project8-b295f-default-rtdb.asia-southeast1.firebasedatabase.app/'
 
-# === GPIO SETUP ===
+# === SENSOR ===
 
-GPIO.setmode(GPIO.BOARD)
-GPIO.setup(TRIG, GPIO.OUT)
-GPIO.setup(ECHO, GPIO.IN)
+# sensor_daemon.py owns the ultrasonic pins; this script only subscribes to its readings
+ensure_daemon()
+sensor = SensorClient(autostart=True)
 
-# === FIREBASE INITIALIZATION ===
+# === DETECTIONS ===
 
-cred = credentials.Certificate(FIREBASE_CREDENTIAL_PATH)
-firebase_admin.initialize_app(cred, {
-    'databaseURL': FIREBASE_DB_URL
-})
+# Pushed by my_detection.py as they happen; see detection_events.py
+detections = DetectionSubscriber()
 
-# References to Firebase Realtime Database fields
-distance_ref = db.reference('distance')
-player_ref = db.reference('player')  # <-- Reference to the "player" field
+# === FIREBASE ===
+
+# Uploads to the "distance" and "player" fields run on a background thread,
+# coalesced and spooled to disk while offline; Firebase is only initialised
+# when the Firebase sink is used (not with DOG_TELEMETRY_URL)
+telemetry = TelemetryUploader(make_sink(FIREBASE_CREDENTIAL_PATH, FIREBASE_DB_URL))
 
 # === FUNCTIONS ===
 
-def read_trigger_file():
-    try:
-        with open(FILE_PATH, 'r') as file:
-            content = file.read().strip().lower()
-            return content == 'true'
-    except FileNotFoundError:
-        return False
+def player_detected():
+    # A collarless dog was the last dog seen
+    return detections.last_dog == "dog_without_collar"
 
 def measure_distance():
-    GPIO.output(TRIG, False)
-    time.sleep(0.1)
-
-    GPIO.output(TRIG, True)
-    time.sleep(0.00001)
-    GPIO.output(TRIG, False)
-
-    timeout_start = time.time() + 1
-    while GPIO.input(ECHO) == 0:
-        if time.time() > timeout_start:
-            print("Timeout: ECHO did not go high")
-            return None
-    pulse_start = time.time()
-
-    timeout_end = time.time() + 1
-    while GPIO.input(ECHO) == 1:
-        if time.time() > timeout_end:
-            print("Timeout: ECHO did not go low")
-            return None
-    pulse_end = time.time()
-
-    pulse_duration = pulse_end - pulse_start
-    distance_cm = round(pulse_duration * 17150, 2)
-    distance_m = round(distance_cm / 100, 3)
-
-    return distance_cm, distance_m
+    return sensor.measure()
 
 # === MAIN LOOP ===
 
 try:
+    last_upload = 0.0
     while True:
-        is_player_detected = read_trigger_file()
+        is_player_detected = player_detected()
 
-        # Update player field
-        player_ref.set(is_player_detected)
+        # Update player field (unchanged values are not resent)
+        telemetry.set('player', is_player_detected)
 
-        if is_player_detected:
+        if is_player_detected and time.monotonic() - last_upload >= UPDATE_INTERVAL:
+            last_upload = time.monotonic()
             result = measure_distance()
             if result is not None:
                 distance_cm, distance_m = result
@@ -84,14 +56,17 @@ try:
                 print(f"Distance: {distance_cm} cm ({distance_m} m)")
 
                 # Store the data as a structured object in Firebase under "distance"
-                distance_ref.set({
+                telemetry.set('distance', {
                     'cm': distance_cm,
                     'm': distance_m,
                     'timestamp': timestamp
                 })
 
-        time.sleep(1)
+        # Wake on the next detection event, or in time for the next distance upload
+        detections.wait(UPDATE_INTERVAL)
 
 except KeyboardInterrupt:
     print("\nMeasurement stopped by User")
-    GPIO.cleanup()
+    detections.close()
+    telemetry.close()
+    sensor.stop()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Smoothing for raw HC-SR04 readings:
+#   1. plausibility gate: outside the sensor's range, or a jump faster than
+#      max_speed from the current estimate, is rejected as an outlier
+#   2. rolling median over the last `window` accepted readings
+#   3. 1-D Kalman filter (random walk) over the median
+# Each estimate comes with a confidence in [0, 1] from the Kalman variance and
+# the recent acceptance rate, so consumers can ignore shaky values.
+
+MIN_CM = 2.0
+MAX_CM = 400.0
+
+
+class DistanceFilter:
+    def __init__(self, window=5, max_speed=500.0, gate_margin=30.0, process_noise=400.0,
+                 measurement_noise=4.0, max_rejects=5, history=10):
+        self.window = window
+        self.max_speed = max_speed  # cm/s
+        self.gate_margin = gate_margin  # cm allowed on top of max_speed * dt
+        self.q = process_noise  # cm^2/s
+        self.r = measurement_noise  # cm^2
+        self.max_rejects = max_rejects
+        self.history = history
+
+        self.samples = np.full(window, np.nan)
+        self.sample_count = 0
+        self.accepted = np.zeros(history, dtype=bool)
+        self.accepted_count = 0
+        self.estimate = None
+        self.variance = None
+        self.last_time = None
+        self.rejects = 0
+
+    def reset(self):
+        self.samples[:] = np.nan
+        self.sample_count = 0
+        self.estimate = None
+        self.variance = None
+        self.rejects = 0
+
+    def _plausible(self, t, cm):
+        if cm is None or not (MIN_CM <= cm <= MAX_CM):
+            return False
+        if self.estimate is None:
+            return True
+        dt = max(t - self.last_time, 0.0)
+        return abs(cm - self.estimate) <= self.max_speed * dt + self.gate_margin
+
+    def _record(self, ok):
+        self.accepted[self.accepted_count % self.history] = ok
+        self.accepted_count += 1
+
+    def confidence(self):
+        if self.estimate is None:
+            return 0.0
+        n = min(self.accepted_count, self.history)
+        acceptance = np.count_nonzero(self.accepted[:n]) / n if n else 0.0
+        return float(acceptance / (1.0 + np.sqrt(self.variance) / 5.0))
+
+    def update(self, t, cm):
+        # Returns (estimate_cm or None, confidence)
+        if self.last_time is not None and self.variance is not None:
+            self.variance += self.q * max(t - self.last_time, 0.0)
+
+        if not self._plausible(t, cm):
+            self._record(False)
+            self.rejects += 1
+            if self.rejects >= self.max_rejects and cm is not None and MIN_CM <= cm <= MAX_CM:
+                # Persistent disagreement: the target really moved, start over
+                self.reset()
+            else:
+                self.last_time = t
+                return self.estimate, self.confidence()
+
+        self.rejects = 0
+        self._record(True)
+        self.samples[self.sample_count % self.window] = cm
+        self.sample_count += 1
+        median = float(np.nanmedian(self.samples))
+
+        if self.estimate is None:
+            self.estimate, self.variance = median, self.r
+        else:
+            gain = self.variance / (self.variance + self.r)
+            self.estimate += gain * (median - self.estimate)
+            self.variance *= (1.0 - gain)
+        self.last_time = t
+        return self.estimate, self.confidence()
+
+
+def filter_batch(times, values, window=5, min_cm=MIN_CM, max_cm=MAX_CM, **kwargs):
+    # Offline replay of a recorded trace. Range gating and the rolling median
+    # are vectorized; the speed gate and Kalman step are inherently sequential
+    # and run over the precomputed medians (so unlike the streaming filter the
+    # median sees a spike before the speed gate does). NaN marks missing readings.
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    in_range = np.isfinite(values) & (values >= min_cm) & (values <= max_cm)
+    gated = np.where(in_range, values, np.nan)
+
+    padded = np.concatenate((np.full(window - 1, np.nan), gated))
+    windows = sliding_window_view(padded, window)
+    valid = np.isfinite(windows).any(axis=1)
+    medians = np.full(len(values), np.nan)
+    medians[valid] = np.nanmedian(windows[valid], axis=1)
+
+    f = DistanceFilter(window=1, **kwargs)
+    estimates = np.full(len(values), np.nan)
+    confidences = np.zeros(len(values))
+    for i in range(len(values)):
+        cm = medians[i] if in_range[i] else None
+        estimate, confidence = f.update(times[i], cm)
+        estimates[i] = np.nan if estimate is None else estimate
+        confidences[i] = confidence
+    return estimates, confidences
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the Firebase Realtime Database REST API, for exercising
+# telemetry_uploader.py without the network:
+#   python3 fake_rtdb.py --latency 0.1
+# then run with DOG_TELEMETRY_URL=http://127.0.0.1:8766
+# Supports GET/PUT/PATCH/DELETE on /<path>.json; PATCH keys may be multi-segment
+# paths ("a/b") as in a real multi-path update. go_down() answers 503.
+
+
+class FakeRTDB:
+    def __init__(self, latency=0.0, down_until=0.0):
+        self.latency = latency
+        self.down_until = down_until
+        self.data = {}
+        self.writes = []  # (monotonic time, method, path, body)
+        self.lock = threading.Lock()
+
+    def go_down(self, seconds):
+        self.down_until = time.monotonic() + seconds
+
+    def come_up(self):
+        self.down_until = 0.0
+
+    @staticmethod
+    def _split(path):
+        return [p for p in path.strip("/").split("/") if p]
+
+    def get(self, path=""):
+        with self.lock:
+            node = self.data
+            for key in self._split(path):
+                if not isinstance(node, dict) or key not in node:
+                    return None
+                node = node[key]
+            return node
+
+    def _set(self, parts, value):
+        if not parts:
+            self.data = value if isinstance(value, dict) else {}
+            return
+        node = self.data
+        for key in parts[:-1]:
+            if not isinstance(node.get(key), dict):
+                node[key] = {}
+            node = node[key]
+        if value is None:
+            node.pop(parts[-1], None)
+        else:
+            node[parts[-1]] = value
+
+    def put(self, path, value):
+        with self.lock:
+            self._set(self._split(path), value)
+
+    def patch(self, path, values):
+        with self.lock:
+            base = self._split(path)
+            for key, value in values.items():
+                self._set(base + self._split(key), value)
+
+
+def make_handler(db):
+    class FakeRTDBHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _path(self):
+            path = self.path.split("?", 1)[0]
+            return path[:-len(".json")] if path.endswith(".json") else path
+
+        def _body(self):
+            length = int(self.headers.get('Content-Length', 0))
+            return json.loads(self.rfile.read(length) or b"null")
+
+        def _handle(self, method):
+            body = self._body() if method in ("PUT", "PATCH") else None
+            time.sleep(db.latency)
+            if time.monotonic() < db.down_until:
+                self._reply(503, {'error': 'unavailable'})
+                return
+            path = self._path()
+            if method == "GET":
+                self._reply(200, db.get(path))
+                return
+            if method == "PUT":
+                db.put(path, body)
+            elif method == "PATCH":
+                if not isinstance(body, dict):
+                    self._reply(400, {'error': 'PATCH body must be an object'})
+                    return
+                db.patch(path, body)
+            elif method == "DELETE":
+                db.put(path, None)
+            with db.lock:
+                db.writes.append((time.monotonic(), method, path, body))
+            self._reply(200, body)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_PUT(self):
+            self._handle("PUT")
+
+        def do_PATCH(self):
+            self._handle("PATCH")
+
+        def do_DELETE(self):
+            self._handle("DELETE")
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return FakeRTDBHandler
+
+
+def start_fake_rtdb(db, host="127.0.0.1", port=0):
+    server = ThreadingHTTPServer((host, port), make_handler(db))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Firebase Realtime Database (REST) for local testing")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="response latency in seconds")
+    parser.add_argument("--down-for", type=float, default=0.0, help="answer 503 for the first N seconds")
+    args = parser.parse_args()
+
+    db = FakeRTDB(args.latency)
+    db.go_down(args.down_for)
+    server, url = start_fake_rtdb(db, port=args.port)
+    print(f"✅ Fake Realtime Database on {url}. Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"writes={len(db.writes)} data={json.dumps(db.get())}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+FRAME_RESIZE = (416, 416)
+
+
+class FlowPropagator:
+    # Latency compensation for detector boxes with sparse Lucas-Kanade flow.
+    #   remember(frame_id, frame): keep a small gray copy of every frame sent to inference
+    #   compensate(frame_id, detections): move boxes from their source frame to the newest frame
+    #   step(frame, tracks): move track boxes frame-to-frame between inference results
+    # Boxes are in FRAME_RESIZE pixel space like the detector predictions. Work is
+    # done on a downscaled gray image and step() stops early once budget_ms is spent.
+
+    def __init__(self, scale=0.5, max_points=20, budget_ms=4.0, history=16,
+                 win_size=(15, 15), max_level=3, min_points=4):
+        self.scale = scale
+        self.max_points = max_points
+        self.budget_ms = budget_ms
+        self.history = history
+        self.min_points = min_points
+        self.lk_params = dict(winSize=win_size, maxLevel=max_level,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+        self.lock = threading.Lock()
+        self.sources = OrderedDict()
+        self.prev_gray = None
+        self.offsets = {}
+        self.points = {}
+
+        self.frames = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.over_budget = 0
+        self.skipped_tracks = 0
+
+    def _gray(self, frame):
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def _to_gray_space(self, gray):
+        return gray.shape[1] / FRAME_RESIZE[0], gray.shape[0] / FRAME_RESIZE[1]
+
+    def _features(self, gray, det, sx, sy, dx=0.0, dy=0.0):
+        x1 = int(max(0, (det['x'] + dx - det['width'] / 2) * sx))
+        y1 = int(max(0, (det['y'] + dy - det['height'] / 2) * sy))
+        x2 = int(min(gray.shape[1], (det['x'] + dx + det['width'] / 2) * sx))
+        y2 = int(min(gray.shape[0], (det['y'] + dy + det['height'] / 2) * sy))
+        if x2 - x1 < 4 or y2 - y1 < 4:
+            return None
+        mask = np.zeros_like(gray)
+        mask[y1:y2, x1:x2] = 255
+        return cv2.goodFeaturesToTrack(gray, maxCorners=self.max_points, qualityLevel=0.01,
+                                       minDistance=3, mask=mask)
+
+    def _flow(self, gray_from, gray_to, points):
+        new_points, status, _ = cv2.calcOpticalFlowPyrLK(gray_from, gray_to, points, None, **self.lk_params)
+        if new_points is None:
+            return None, None
+        good = status.reshape(-1) == 1
+        if np.count_nonzero(good) < self.min_points:
+            return None, None
+        shift = np.median(new_points[good] - points[good], axis=0).reshape(2)
+        return shift, new_points[good].reshape(-1, 1, 2)
+
+    def remember(self, frame_id, frame):
+        gray = self._gray(frame)
+        with self.lock:
+            self.sources[frame_id] = gray
+            while len(self.sources) > self.history:
+                self.sources.popitem(last=False)
+
+    def compensate(self, frame_id, detections):
+        with self.lock:
+            source = self.sources.get(frame_id)
+            current = self.prev_gray
+            for old_id in [k for k in self.sources if k <= frame_id]:
+                del self.sources[old_id]
+        if source is None or current is None:
+            return detections
+
+        sx, sy = self._to_gray_space(current)
+        compensated = []
+        for det in detections:
+            det = dict(det)
+            points = self._features(source, det, sx, sy)
+            if points is not None and len(points) >= self.min_points:
+                shift, _ = self._flow(source, current, points)
+                if shift is not None:
+                    det['x'] += float(shift[0]) / sx
+                    det['y'] += float(shift[1]) / sy
+            compensated.append(det)
+        return compensated
+
+    def reset(self):
+        # New detections replace the propagated boxes
+        with self.lock:
+            self.offsets.clear()
+            self.points.clear()
+
+    def step(self, frame, tracks):
+        start = time.perf_counter()
+        gray = self._gray(frame)
+        with self.lock:
+            prev = self.prev_gray
+            self.prev_gray = gray
+            if prev is None or prev.shape != gray.shape:
+                return tracks
+            sx, sy = self._to_gray_space(gray)
+
+            live_ids = set()
+            moved = []
+            for i, det in enumerate(tracks):
+                track_id = det['track_id']
+                live_ids.add(track_id)
+                dx, dy = self.offsets.get(track_id, (0.0, 0.0))
+
+                if (time.perf_counter() - start) * 1000 < self.budget_ms:
+                    points = self.points.get(track_id)
+                    if points is None or len(points) < self.min_points:
+                        points = self._features(prev, det, sx, sy, dx, dy)
+                    if points is not None and len(points) >= self.min_points:
+                        shift, points = self._flow(prev, gray, points)
+                        if shift is not None:
+                            dx += float(shift[0]) / sx
+                            dy += float(shift[1]) / sy
+                    self.points[track_id] = points
+                    self.offsets[track_id] = (dx, dy)
+                else:
+                    self.skipped_tracks += 1
+                    self.points.pop(track_id, None)
+
+                det = dict(det)
+                det['x'] += dx
+                det['y'] += dy
+                moved.append(det)
+
+            for track_id in list(self.offsets):
+                if track_id not in live_ids:
+                    del self.offsets[track_id]
+                    self.points.pop(track_id, None)
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.frames += 1
+        self.total_ms += elapsed
+        self.max_ms = max(self.max_ms, elapsed)
+        if elapsed > self.budget_ms:
+            self.over_budget += 1
+        return moved
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'mean_ms': self.total_ms / self.frames if self.frames else 0.0,
+            'max_ms': self.max_ms,
+            'over_budget': self.over_budget,
+            'skipped_tracks': self.skipped_tracks,
+        }
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+from capture import Capture, make_capture
+
+# Where the detector's frames come from. Every source has the capture
+# interface (read() -> (ok, frame), isOpened(), release(), timestamp, stats())
+# and returns frames the caller owns, so they can be drawn on. Recorded and
+# generated sources are paced either
+#   "realtime"  at their frame rate, like a camera
+#   "fast"      as fast as the consumer reads, for benchmarks and profiling
+# and report exhausted=True once they run out (never with loop=True).
+#
+#   open_frame_source("camera")
+#   open_frame_source("clip.mp4", pacing="fast")
+#   open_frame_source("captures/*.jpg")         # or a directory
+#   open_frame_source("synthetic", seed=1)
+
+PACINGS = ("realtime", "fast")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class FrameSource(Capture):
+    live = False
+
+    def __init__(self, fps=30.0, pacing="realtime", loop=False):
+        super().__init__()
+        if pacing not in PACINGS:
+            raise ValueError(f"pacing must be one of {', '.join(PACINGS)}, got {pacing!r}")
+        self.fps = fps
+        self.pacing = pacing
+        self.loop = loop
+        self.exhausted = False
+        self.index = 0  # frames delivered
+        self.started = None
+
+    def _next(self):
+        # The next frame as a new array, or None at the end
+        raise NotImplementedError
+
+    def _rewind(self):
+        raise NotImplementedError
+
+    def isOpened(self):
+        return not self.exhausted
+
+    def read(self, image=None):
+        if self.exhausted:
+            return False, None
+        frame = self._next()
+        if frame is None and self.loop and self.index:
+            self._rewind()
+            frame = self._next()
+        if frame is None:
+            self.exhausted = True
+            return False, None
+
+        if self.started is None:
+            self.started = time.time()
+        if self.pacing == "realtime":
+            due = self.started + self.index / self.fps
+            time.sleep(max(0.0, due - time.time()))
+            self._record(due)
+        else:
+            self._record(time.time())
+        self.index += 1
+        if image is not None and image.shape == frame.shape:
+            image[...] = frame
+            return True, image
+        return True, frame
+
+    def stats(self):
+        elapsed = time.time() - self.started if self.started else 0.0
+        return dict(super().stats(), fps=self.index / elapsed if elapsed else 0.0)
+
+
+class CameraSource(FrameSource):
+    # A live capture (any capture.py backend, the camera broker, ...); paced by
+    # the camera itself. Extra methods such as read_inference() pass through.
+    # Backends may return views of their own buffers (V4L2 BGR3 mmap, broker
+    # slots); those are copied so the caller owns the frame like everywhere else.
+    live = True
+
+    def __init__(self, capture=None, backend=None):
+        super().__init__()
+        self.capture = capture if capture is not None else make_capture(backend)
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def read(self, image=None):
+        ret, frame = self.capture.read() if image is None else self.capture.read(image)
+        if ret:
+            if not frame.flags.owndata:
+                frame = frame.copy()
+            if self.started is None:
+                self.started = time.time()
+            self.index += 1
+            self.timestamp = getattr(self.capture, 'timestamp', None) or time.time()
+        return ret, frame
+
+    def stats(self):
+        stats = self.capture.stats() if hasattr(self.capture, 'stats') else {}
+        elapsed = time.time() - self.started if self.started else 0.0
+        return dict(stats, frames=self.index, fps=self.index / elapsed if elapsed else 0.0)
+
+    def release(self):
+        self.capture.release()
+
+    def __getattr__(self, name):
+        if 'capture' not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.__dict__['capture'], name)
+
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path, pacing="realtime", loop=False, fps=None):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise ValueError(f"could not open video {path}")
+        super().__init__(fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0, pacing, loop)
+        self.path = path
+
+    def _next(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def _rewind(self):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    # A directory (all images in it), a glob pattern or a single image, in
+    # sorted file name order. Decoded images are cached when cache=True, so
+    # repeated passes measure the pipeline rather than JPEG decoding.
+    def __init__(self, pattern, pacing="realtime", loop=False, fps=10.0, cache=True):
+        if os.path.isdir(pattern):
+            paths = [os.path.join(pattern, name) for name in os.listdir(pattern)
+                     if name.lower().endswith(IMAGE_EXTENSIONS)]
+        else:
+            paths = glob.glob(pattern)
+        self.paths = sorted(paths)
+        if not self.paths:
+            raise ValueError(f"no images match {pattern}")
+        super().__init__(fps, pacing, loop)
+        self.position = 0
+        self.cache = {} if cache else None
+
+    def _next(self):
+        while self.position < len(self.paths):
+            path = self.paths[self.position]
+            self.position += 1
+            image = self.cache.get(path) if self.cache is not None else None
+            if image is None:
+                image = cv2.imread(path)
+                if image is None:
+                    print(f"⚠️ Skipping unreadable image {path}")
+                    continue
+                if self.cache is not None:
+                    self.cache[path] = image
+            return image.copy()
+        return None
+
+    def _rewind(self):
+        self.position = 0
+
+
+class SyntheticSource(FrameSource):
+    # Dog-sized blobs (a body ellipse and a head) wandering over a fixed
+    # textured background; some wear a red collar. Fully determined by seed.
+    # boxes holds the last frame's ground truth as (x1, y1, x2, y2, has_collar).
+    def __init__(self, size=(640, 480), dogs=2, pacing="realtime", loop=False, fps=30.0, length=None,
+                 seed=0, collar_fraction=0.5):
+        super().__init__(fps, pacing, loop)
+        self.size = size
+        self.length = length  # frames per pass, None: endless (loop only matters with a length)
+        self.seed = seed
+        self.dogs = dogs
+        self.collar_fraction = collar_fraction
+        self._rewind()
+
+    def _rewind(self):
+        width, height = self.size
+        rng = np.random.default_rng(self.seed)
+        noise = rng.integers(0, 40, (height // 8, width // 8, 3), dtype=np.uint8)
+        background = cv2.resize(noise, self.size, interpolation=cv2.INTER_CUBIC)
+        self.background = cv2.add(background, np.full_like(background, (60, 90, 70)))
+        scale = width / 640
+        self.state = []
+        for _ in range(self.dogs):
+            body = (int(rng.uniform(50, 80) * scale), int(rng.uniform(28, 40) * scale))
+            self.state.append({
+                'pos': rng.uniform((body[0] * 1.5, body[1] * 2), (width - body[0] * 1.5, height - body[1] * 2)),
+                'vel': rng.uniform(-4, 4, 2) * scale,
+                'body': body,
+                'color': tuple(int(c) for c in rng.integers((20, 50, 80), (70, 110, 160))),
+                'collar': bool(rng.random() < self.collar_fraction),
+            })
+        self.generated = 0
+        self.boxes = []
+
+    def _next(self):
+        if self.length is not None and self.generated >= self.length:
+            return None
+        width, height = self.size
+        frame = self.background.copy()
+        self.boxes = []
+        for dog in self.state:
+            (bx, by), (x, y) = dog['body'], dog['pos']
+            facing = 1 if dog['vel'][0] >= 0 else -1
+            head = (int(x + facing * bx * 1.05), int(y - by * 0.8))
+            head_r = int(by * 0.75)
+            cv2.ellipse(frame, (int(x), int(y)), (bx, by), 0, 0, 360, dog['color'], -1)
+            cv2.circle(frame, head, head_r, dog['color'], -1)
+            if dog['collar']:
+                neck = (int(x + facing * bx * 0.75), int(y - by * 0.45))
+                cv2.ellipse(frame, neck, (max(2, bx // 10), int(by * 0.55)), -20 * facing, 0, 360, (30, 30, 220), -1)
+            x1, x2 = sorted((int(x - facing * bx), head[0] + facing * head_r))
+            self.boxes.append((x1, head[1] - head_r, x2, int(y + by), dog['collar']))
+
+            # bounce off the edges, with a little wander
+            dog['pos'] = dog['pos'] + dog['vel']
+            for axis, (low, high) in enumerate(((bx * 1.5, width - bx * 1.5), (by * 2, height - by * 1.5))):
+                if not low <= dog['pos'][axis] <= high:
+                    dog['vel'][axis] *= -1
+                    dog['pos'][axis] = min(max(dog['pos'][axis], low), high)
+            dog['vel'] = dog['vel'] * 0.98 + np.sin(self.generated * 0.05 + dog['pos'][::-1] * 0.01) * 0.1
+        self.generated += 1
+        return frame
+
+
+def open_frame_source(spec="camera", pacing="realtime", loop=False, fps=None, **kwargs):
+    # "camera", "synthetic", a video file, an image directory, a glob or an image
+    if spec == "camera":
+        return CameraSource(**kwargs)
+    if spec == "synthetic":
+        return SyntheticSource(pacing=pacing, loop=loop, fps=fps or 30.0, **kwargs)
+    if os.path.isdir(spec) or any(c in spec for c in "*?[") or spec.lower().endswith(IMAGE_EXTENSIONS):
+        return ImageDirectorySource(spec, pacing, loop, fps or 10.0, **kwargs)
+    if not os.path.exists(spec):
+        raise ValueError(f"no such frame source: {spec}")
+    return VideoFileSource(spec, pacing, loop, fps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preview or time a frame source")
+    parser.add_argument("source", nargs="?", default="synthetic",
+                        help='"camera", "synthetic", a video file, an image directory or a glob')
+    parser.add_argument("--pacing", default="realtime", choices=PACINGS)
+    parser.add_argument("--fps", type=float)
+    parser.add_argument("--loop", action="store_true")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--show", action="store_true")
+    args = parser.parse_args()
+
+    source = open_frame_source(args.source, args.pacing, args.loop, args.fps)
+    for _ in range(args.frames):
+        ret, frame = source.read()
+        if not ret:
+            break
+        if args.show:
+            for x1, y1, x2, y2, collar in getattr(source, 'boxes', []):
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0) if collar else (0, 0, 255), 1)
+            cv2.imshow("Frame source", frame)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    stats = source.stats()
+    source.release()
+    print(f"{stats['frames']} frames at {stats['fps']:.1f} fps ({args.pacing})")
+
+
+if __name__ == "__main__":
+    main()
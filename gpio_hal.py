@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+import csv
+import os
+import random
+import time
+
+from gpio_sim import SimulatedGPIO
+
+# Scripts import GPIO from here instead of Jetson.GPIO:
+#   from gpio_hal import GPIO
+# Backend selection via environment:
+#   DOG_GPIO_BACKEND=auto|jetson|sim   (auto falls back to sim off the Jetson)
+#   DOG_GPIO_SIM_TRACE=trace.csv       recorded "seconds,cm" rows; empty cm = no echo
+#   DOG_GPIO_SIM_DISTANCE=120          fixed distance instead of the default script
+#   DOG_GPIO_SIM_NOISE=1.5             gaussian noise in cm
+#   DOG_GPIO_SIM_DROPOUT=0.05          fraction of pings that time out
+#   DOG_GPIO_SIM_SEED=1                seed for reproducible runs
+
+# Default scripted trace: a dog walks in from 3 m, lingers at ~60 cm, and leaves
+DEFAULT_SCRIPT = [(0.0, 300.0), (8.0, 150.0), (12.0, 60.0), (20.0, 65.0), (24.0, 200.0), (30.0, 300.0)]
+
+
+class DistanceTrace:
+    # Distance over time for the simulated sensor: linear interpolation between
+    # (seconds, cm) keyframes, looping, plus noise and random missing echoes.
+    # A keyframe with cm=None makes the sensor time out until the next keyframe.
+
+    def __init__(self, keyframes, noise_cm=0.0, dropout=0.0, loop=True, seed=None):
+        self.keyframes = sorted(keyframes, key=lambda k: k[0])
+        self.noise_cm = noise_cm
+        self.dropout = dropout
+        self.loop = loop
+        self.rng = random.Random(seed)
+        self.start = time.monotonic()
+
+    @classmethod
+    def from_csv(cls, path, **kwargs):
+        keyframes = []
+        with open(path, newline='') as f:
+            for row in csv.reader(f):
+                if not row or row[0].startswith('#'):
+                    continue
+                try:
+                    t = float(row[0])
+                except ValueError:
+                    continue  # header
+                cm = float(row[1]) if len(row) > 1 and row[1].strip() else None
+                keyframes.append((t, cm))
+        return cls(keyframes, **kwargs)
+
+    def distance_at(self, elapsed):
+        frames = self.keyframes
+        if len(frames) == 1:
+            return frames[0][1]
+        duration = frames[-1][0]
+        if self.loop and duration > 0:
+            elapsed %= duration
+        if elapsed <= frames[0][0]:
+            return frames[0][1]
+        for (t0, d0), (t1, d1) in zip(frames, frames[1:]):
+            if elapsed < t1:
+                if d0 is None or d1 is None:
+                    return d0
+                return d0 + (d1 - d0) * (elapsed - t0) / (t1 - t0)
+        return frames[-1][1]
+
+    def __call__(self):
+        if self.rng.random() < self.dropout:
+            return None
+        distance = self.distance_at(time.monotonic() - self.start)
+        if distance is None:
+            return None
+        return max(2.0, distance + self.rng.gauss(0.0, self.noise_cm)) if self.noise_cm else distance
+
+
+def make_simulated_gpio():
+    noise = float(os.environ.get("DOG_GPIO_SIM_NOISE", "1.0"))
+    dropout = float(os.environ.get("DOG_GPIO_SIM_DROPOUT", "0.02"))
+    seed = os.environ.get("DOG_GPIO_SIM_SEED")
+    seed = int(seed) if seed is not None else None
+
+    trace_path = os.environ.get("DOG_GPIO_SIM_TRACE")
+    fixed = os.environ.get("DOG_GPIO_SIM_DISTANCE")
+    if trace_path:
+        trace = DistanceTrace.from_csv(trace_path, noise_cm=noise, dropout=dropout, seed=seed)
+    elif fixed:
+        trace = DistanceTrace([(0.0, float(fixed))], noise_cm=noise, dropout=dropout, seed=seed)
+    else:
+        trace = DistanceTrace(DEFAULT_SCRIPT, noise_cm=noise, dropout=dropout, seed=seed)
+    return SimulatedGPIO(distance_cm=trace)
+
+
+def load_gpio(backend=None):
+    backend = backend or os.environ.get("DOG_GPIO_BACKEND", "auto")
+    if backend in ("auto", "jetson"):
+        try:
+            import Jetson.GPIO
+            return Jetson.GPIO
+        except Exception as e:
+            # Jetson.GPIO raises on import when it cannot identify the board
+            if backend == "jetson":
+                raise
+            print(f"⚠️ Jetson.GPIO unavailable ({e}), using simulated GPIO.")
+    elif backend != "sim":
+        raise ValueError(f"Unknown GPIO backend: {backend}")
+    return make_simulated_gpio()
+
+
+GPIO = load_gpio()
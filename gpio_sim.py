@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+import heapq
+import threading
+import time
+from collections import deque
+
+# Stand-in for the parts of Jetson.GPIO this project uses. Driving TRIG high and
+# then low schedules an HC-SR04 style pulse on ECHO whose width matches the
+# simulated distance. input() reads the level exactly from perf_counter, while
+# edge events (wait_for_edge / add_event_detect callbacks) are delivered by a
+# background thread, with the wake-up jitter a real edge interrupt would have.
+
+SOUND_CM_PER_S = 34300.0
+
+
+class SimulatedGPIO:
+    BOARD = 10
+    BCM = 11
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+
+    def __init__(self, distance_cm=100.0, trig=35, echo=33, echo_delay=0.0004):
+        # distance_cm: a number, or a callable returning cm (None = no echo)
+        self.distance_cm = distance_cm
+        self.trig = trig
+        self.echo = echo
+        self.echo_delay = echo_delay
+        self.mode = None
+        self.directions = {}
+        self.levels = {}
+        self.pulse = (0.0, 0.0)
+        self.callbacks = {}
+        self.edges = []
+        self.cond = threading.Condition()
+        self.worker = None
+        self.edge_seq = 0
+        self.edge_log = deque(maxlen=64)
+
+    # --- Jetson.GPIO API ---
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def getmode(self):
+        return self.mode
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, channel, direction, initial=None, pull_up_down=None):
+        channels = channel if isinstance(channel, (list, tuple)) else [channel]
+        for ch in channels:
+            self.directions[ch] = direction
+            self.levels[ch] = initial if initial is not None else self.LOW
+
+    def output(self, channel, value):
+        value = self.HIGH if value else self.LOW
+        previous = self.levels.get(channel, self.LOW)
+        self.levels[channel] = value
+        if channel == self.trig and previous == self.HIGH and value == self.LOW:
+            self._schedule_echo()
+
+    def input(self, channel):
+        if channel == self.echo:
+            rise, fall = self.pulse
+            return self.HIGH if rise <= time.perf_counter() < fall else self.LOW
+        return self.levels.get(channel, self.LOW)
+
+    def wait_for_edge(self, channel, edge, bouncetime=None, timeout=None):
+        deadline = None if timeout is None else time.perf_counter() + timeout / 1000.0
+        with self.cond:
+            seq = self.edge_seq
+            while True:
+                for edge_seq, ch, kind in self.edge_log:
+                    if edge_seq > seq and ch == channel and edge in (kind, self.BOTH):
+                        return channel
+                seq = self.edge_seq
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.cond.wait(remaining)
+
+    def add_event_detect(self, channel, edge, callback=None, bouncetime=None):
+        self.callbacks[channel] = (edge, [callback] if callback else [])
+
+    def add_event_callback(self, channel, callback):
+        self.callbacks[channel][1].append(callback)
+
+    def remove_event_detect(self, channel):
+        self.callbacks.pop(channel, None)
+
+    def cleanup(self, channel=None):
+        if channel is None:
+            self.callbacks.clear()
+            self.directions.clear()
+            self.levels.clear()
+        else:
+            self.callbacks.pop(channel, None)
+            self.directions.pop(channel, None)
+
+    # --- echo simulation ---
+
+    def next_distance(self):
+        return self.distance_cm() if callable(self.distance_cm) else self.distance_cm
+
+    def _schedule_echo(self):
+        distance = self.next_distance()
+        if distance is None:
+            return  # no echo: ECHO never goes high
+        rise = time.perf_counter() + self.echo_delay
+        fall = rise + 2 * distance / SOUND_CM_PER_S
+        self.pulse = (rise, fall)
+        with self.cond:
+            heapq.heappush(self.edges, (rise, self.RISING))
+            heapq.heappush(self.edges, (fall, self.FALLING))
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._deliver_edges, name="gpio-sim", daemon=True)
+                self.worker.start()
+            self.cond.notify_all()
+
+    def _deliver_edges(self):
+        while True:
+            with self.cond:
+                while not self.edges:
+                    self.cond.wait()
+                when, kind = self.edges[0]
+                delay = when - time.perf_counter()
+                if delay > 0.0005:
+                    self.cond.wait(delay - 0.0005)
+                    continue
+                # spin the last half millisecond so edges land close to their time
+                while time.perf_counter() < when:
+                    pass
+                heapq.heappop(self.edges)
+                self.levels[self.echo] = self.HIGH if kind == self.RISING else self.LOW
+                self.edge_seq += 1
+                self.edge_log.append((self.edge_seq, self.echo, kind))
+                self.cond.notify_all()
+                edge, callbacks = self.callbacks.get(self.echo, (None, []))
+            if edge in (kind, self.BOTH):
+                for callback in callbacks:
+                    callback(self.echo)
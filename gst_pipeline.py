@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+import argparse
+import time
+from collections import deque
+
+import cv2
+
+from capture import summarize_ms
+
+# Builds the GStreamer capture pipeline for cv2.VideoCapture(..., CAP_GSTREAMER).
+# Only the elements the caps actually need are added: no videoscale when the
+# camera already delivers the display size, no videoconvert when it already
+# delivers BGR. The default appsink is leaky (drop=true max-buffers=1
+# sync=false) so read() always returns the newest frame instead of draining
+# a backlog of old ones when the consumer falls behind.
+#
+#   python3 gst_pipeline.py --print                  # show the camera pipeline
+#   python3 gst_pipeline.py --test --work-ms 80      # videotestsrc, slow consumer
+#   python3 gst_pipeline.py --test --no-leaky --work-ms 80
+
+SOURCES = ("v4l2", "test")
+LEAKY_APPSINK = "appsink drop=true max-buffers=1 sync=false"
+QUEUED_APPSINK = "appsink"
+
+# videoflip method values; 1, 3, 5 and 7 swap width and height
+FLIP_METHODS = {
+    0: "none",
+    1: "clockwise",
+    2: "rotate-180",
+    3: "counterclockwise",
+    4: "horizontal-flip",
+    5: "upper-right-diagonal",
+    6: "vertical-flip",
+    7: "upper-left-diagonal",
+}
+
+
+def source_elements(capture_width=640, capture_height=480, framerate=30, flip_method=0,
+                    device="/dev/video0", source="v4l2", capture_format=None):
+    # Source, its caps and the optional flip. Returns (elements, (width, height)
+    # after the flip, capture_format); capture_format pins the camera's raw
+    # format (e.g. "YUY2", "BGR"), None lets v4l2src pick.
+    if flip_method not in FLIP_METHODS:
+        raise ValueError(f"flip_method must be 0-7, got {flip_method}")
+    if source not in SOURCES:
+        raise ValueError(f"unknown source {source!r}, expected one of {', '.join(SOURCES)}")
+
+    if source == "test":
+        # videotestsrc produces any format, so ask for BGR directly
+        capture_format = capture_format or "BGR"
+        elements = ["videotestsrc is-live=true pattern=ball"]
+    else:
+        elements = [f"v4l2src device={device}"]
+    caps = f"video/x-raw, width={capture_width}, height={capture_height}, framerate={framerate}/1"
+    if capture_format:
+        caps = f"video/x-raw, format={capture_format}, width={capture_width}, height={capture_height}, framerate={framerate}/1"
+    elements.append(caps)
+
+    width, height = capture_width, capture_height
+    if flip_method:
+        elements.append(f"videoflip method={FLIP_METHODS[flip_method]}")
+        if flip_method % 2:
+            width, height = height, width
+    return elements, (width, height), capture_format
+
+
+def display_size(display_width, display_height, flip_method=0):
+    # The display size is given in the camera's orientation; flips that swap
+    # width and height (90/270 degree rotations and the diagonals) swap it
+    # too, so a rotated frame is scaled without distortion
+    if flip_method % 2:
+        return display_height, display_width
+    return display_width, display_height
+
+
+def bgr_elements(size, display_width, display_height, capture_format=None):
+    # Scale/convert to BGR at the display size, skipping elements that would be no-ops
+    elements = []
+    if tuple(size) != (display_width, display_height):
+        # scale before converting: fewer pixels to convert when downscaling
+        elements += ["videoscale", f"video/x-raw, width={display_width}, height={display_height}"]
+    if capture_format != "BGR":
+        elements += ["videoconvert", "video/x-raw, format=BGR"]
+    return elements
+
+
+def pipeline_elements(
+    capture_width=640,
+    capture_height=480,
+    display_width=640,
+    display_height=480,
+    framerate=30,
+    flip_method=0,
+    device="/dev/video0",
+    source="v4l2",
+    capture_format=None,
+    leaky=True,
+):
+    elements, size, capture_format = source_elements(capture_width, capture_height, framerate, flip_method,
+                                                     device, source, capture_format)
+    elements += bgr_elements(size, *display_size(display_width, display_height, flip_method), capture_format)
+    elements.append(LEAKY_APPSINK if leaky else QUEUED_APPSINK)
+    return elements
+
+
+def gstreamer_pipeline(**kwargs):
+    return " ! ".join(pipeline_elements(**kwargs))
+
+
+def open_pipeline(**kwargs):
+    return TimedCapture(cv2.VideoCapture(gstreamer_pipeline(**kwargs), cv2.CAP_GSTREAMER))
+
+
+class TimedCapture:
+    # Wraps a cv2.VideoCapture and measures, per read():
+    # - wait: how long read() blocked
+    # - age: how old the frame was when read() returned it. OpenCV reports the
+    #   buffer's pipeline timestamp as CAP_PROP_POS_MSEC. Its offset from wall
+    #   time is fixed, so the smallest (read time - timestamp) seen so far is
+    #   used as the zero point and age is the queueing delay on top of that.
+    #   .age is the last read's age, None when the buffer had no timestamp.
+    def __init__(self, cap, window=300):
+        self.cap = cap
+        self.pos_msec = cv2.CAP_PROP_POS_MSEC
+        self.waits = deque(maxlen=window)
+        self.ages = deque(maxlen=window)
+        self.offset = None
+        self.age = None
+        self.frames = 0
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, image=None):
+        started = time.perf_counter()
+        ret, frame = self.cap.read() if image is None else self.cap.read(image)
+        now = time.perf_counter()
+        if not ret:
+            return ret, frame
+        self.frames += 1
+        self.waits.append((now - started) * 1000)
+        timestamp = self.cap.get(self.pos_msec)
+        self.age = None
+        if timestamp > 0:
+            offset = now * 1000 - timestamp
+            self.offset = offset if self.offset is None else min(self.offset, offset)
+            self.age = offset - self.offset
+            self.ages.append(self.age)
+        return ret, frame
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        self.cap.release()
+
+    def stats(self):
+        return {'frames': self.frames, 'wait': summarize_ms(self.waits), 'age': summarize_ms(self.ages)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and measure the camera capture pipeline")
+    parser.add_argument("--test", action="store_true", help="use videotestsrc instead of the camera")
+    parser.add_argument("--device", default="/dev/video0")
+    parser.add_argument("--size", default="640x480", help="capture size WxH")
+    parser.add_argument("--display", help="display size WxH (default: capture size)")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--flip", type=int, default=0, help="videoflip method 0-7")
+    parser.add_argument("--format", help="camera raw format, e.g. YUY2")
+    parser.add_argument("--no-leaky", action="store_true", help="plain appsink with an unbounded queue")
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--work-ms", type=float, default=0, help="simulated processing time per frame")
+    parser.add_argument("--print", action="store_true", help="only print the pipeline")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    display_width, display_height = (int(v) for v in (args.display or args.size).lower().split("x"))
+    options = dict(capture_width=width, capture_height=height, display_width=display_width,
+                   display_height=display_height, framerate=args.fps, flip_method=args.flip,
+                   device=args.device, source="test" if args.test else "v4l2",
+                   capture_format=args.format, leaky=not args.no_leaky)
+    print(gstreamer_pipeline(**options))
+    if args.print:
+        return
+
+    cap = open_pipeline(**options)
+    if not cap.isOpened():
+        print("❌ Could not open pipeline (is OpenCV built with GStreamer?)")
+        return
+    for _ in range(args.frames):
+        ret, _frame = cap.read()
+        if not ret:
+            print("⚠️ Frame capture failed")
+            break
+        if args.work_ms:
+            time.sleep(args.work_ms / 1000)
+    cap.release()
+
+    stats = cap.stats()
+    print(f"{stats['frames']} frames")
+    for name in ("wait", "age"):
+        if stats[name] is None:
+            print(f"  {name}: not available")
+        else:
+            print(f"  {name}: p50 {stats[name]['p50_ms']:.1f} ms, p95 {stats[name]['p95_ms']:.1f} ms, "
+                  f"max {stats[name]['max_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
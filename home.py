@@ -4,9 +4,10 @@ import tkinter as tk
 from tkinter import font
 from tkinter import ttk
 import subprocess
-import Jetson.GPIO as GPIO
+from sensor_daemon import SensorClient, ensure_daemon
+from audio_engine import make_audio_engine
+from tone_synth import tone
 import time
-import os
 
 # --- Optional Firebase integration ---
 import firebase_admin
@@ -15,16 +16,14 @@ from firebase_admin import credentials, db
 # === CONFIGURATION ===
 
 FILE_PATH = 'detection_logs.txt'
-TRIG = 35  # Physical pin 35
-ECHO = 33  # Physical pin 33
 
 FIREBASE_CREDENTIAL_PATH = 'project8-b295f-firebase-adminsdk-fbsvc-619af81878.json'
 FIREBASE_DB_URL = 'https://project8-b295f-default-rtdb.asia-southeast1.firebasedatabase.app/'
 
-# --- GPIO SETUP ---
-GPIO.setmode(GPIO.BOARD)
-GPIO.setup(TRIG, GPIO.OUT)
-GPIO.setup(ECHO, GPIO.IN)
+# --- SENSOR ---
+# sensor_daemon.py owns the ultrasonic pins; this script only subscribes to its readings
+ensure_daemon()
+sensor = SensorClient(autostart=True)
 
 # --- Firebase Initialization (comment if not needed) ---
 cred = credentials.Certificate(FIREBASE_CREDENTIAL_PATH)
@@ -43,39 +42,11 @@ def read_trigger_file():
         return False
 
 def measure_distance():
-    GPIO.output(TRIG, False)
-    time.sleep(0.1)
-
-    GPIO.output(TRIG, True)
-    time.sleep(0.00001)
-    GPIO.output(TRIG, False)
-
-    timeout_start = time.time() + 1
-    while GPIO.input(ECHO) == 0:
-        if time.time() > timeout_start:
-            print("Timeout: ECHO did not go high")
-            return None
-    pulse_start = time.time()
-
-    timeout_end = time.time() + 1
-    while GPIO.input(ECHO) == 1:
-        if time.time() > timeout_end:
-            print("Timeout: ECHO did not go low")
-            return None
-    pulse_end = time.time()
-
-    pulse_duration = pulse_end - pulse_start
-    distance_cm = round(pulse_duration * 17150, 2)
-    distance_m = round(distance_cm / 100, 3)
-
-    return distance_cm, distance_m
-
-def kill_all_aplay():
-    try:
-        os.system("pkill -9 aplay")
-        print("All aplay processes killed.")
-    except Exception as e:
-        print(f"Error killing aplay processes: {e}")
+    return sensor.measure()
+
+# Speaker test tones are synthesized and played in-process
+speaker = make_audio_engine()
+SPEAKER_TEST_SECONDS = 3.0  # test tones play once for this long, like the old WAV files
 
 class ButtonApp:
     def __init__(self, master):
@@ -84,7 +55,6 @@ class ButtonApp:
         master.geometry("500x500")
 
         self.camera_process = None
-        self.speaker_process = None
         self.distance_monitoring = False
         self.distance_job = None
 
@@ -170,27 +140,20 @@ class ButtonApp:
         self.slider_last_value = int(float(value))
 
     def on_speaker_slider_release(self, event):
-        freq = self.slider_last_value
-        if freq in self.speaker_freqs:
-            wav_file = f"{freq}.wav"
-            self.play_speaker_selected(wav_file)
-        else:
-            print(f"No sound file for {freq} Hz.")
+        self.play_speaker_frequency(self.slider_last_value)
 
-    def play_speaker_selected(self, selected_file):
-        print(f"Playing sound: {selected_file}")
+    def play_speaker_frequency(self, freq):
+        # Any slider position works: the tone is synthesized (and cached) on demand
+        print(f"Playing tone: {freq} Hz")
         try:
-            kill_all_aplay()
-            self.speaker_process = subprocess.Popen(['aplay', f'./{selected_file}'])
-            print("aplay launched.")
+            speaker.play(tone(freq, duration=SPEAKER_TEST_SECONDS), loop=False)
         except Exception as e:
-            print(f"Failed to launch aplay: {e}")
+            print(f"Failed to play tone: {e}")
 
     def stop_speaker_clicked(self):
-        kill_all_aplay()
-        self.speaker_process = None
+        speaker.stop()
         self.speaker_slider.set(self.speaker_freqs[0])
-        print("All aplay processes killed (Stop Speaker Test).")
+        print("Speaker test stopped.")
 
     def start_camera_clicked(self):
         print("Start button pressed! Starting camera...")
@@ -304,10 +267,8 @@ class ButtonApp:
             print("Camera process terminated by Stop Detection.")
             self.camera_process = None
 
-        kill_all_aplay()
-        self.speaker_process = None
+        speaker.stop()
         self.speaker_slider.set(self.speaker_freqs[0])
-        print("All aplay processes killed (Stop Detection).")
 
         self.stop_distance_monitoring()
         print("All detection processes stopped.")
@@ -322,10 +283,8 @@ class ButtonApp:
             except subprocess.TimeoutExpired:
                 self.camera_process.kill()
             print("Camera process terminated on exit.")
-        kill_all_aplay()
-        self.speaker_process = None
-        print("All aplay processes killed on exit.")
-        GPIO.cleanup()
+        speaker.close()
+        sensor.stop()
         self.master.destroy()
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class DeadlineExceeded(RuntimeError):
+    pass
+
+
+class RetryableStatus(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    # closed -> open after failure_threshold consecutive failures. While open,
+    # calls fail fast; after reset_timeout a single probe is let through
+    # (half-open). A successful probe closes the circuit, a failed one reopens
+    # it with the wait doubled up to max_reset_timeout.
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=5.0, max_reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            if self.state != self.CLOSED:
+                print("✅ Inference endpoint recovered, circuit closed.")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.reset_timeout = self.base_reset_timeout
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+                self._open()
+            elif self.state == self.CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+        print(f"⚠️ Inference endpoint failing, circuit open for {self.reset_timeout:.1f}s.")
+
+
+class InferenceClient:
+    # Long-lived client for the inference endpoint: pooled keep-alive
+    # connections, optional HTTP/2 (needs httpx[http2]), a deadline budget per
+    # call that covers all retries, and exponential backoff with full jitter.
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, url, pool_size=4, http2=False, deadline=5.0, attempt_timeout=3.0,
+                 max_retries=2, backoff_base=0.2, backoff_max=2.0, breaker=None):
+        self.url = url
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.http2 = False
+
+        if http2:
+            try:
+                import httpx
+                self.session = httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                )
+                self.http2 = True
+            except ImportError:
+                print("⚠️ httpx[http2] not installed, falling back to HTTP/1.1 keep-alive.")
+        if not self.http2:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _post_once(self, img_bytes, timeout):
+        files = {"file": ("image.jpg", img_bytes, "image/jpeg")}
+        response = self.session.post(self.url, files=files, timeout=timeout)
+        if response.status_code in self.RETRY_STATUS:
+            raise RetryableStatus(f"HTTP {response.status_code}")
+        if response.status_code != 200:
+            # Client errors will not get better by retrying
+            raise RuntimeError(f"Roboflow Error: {response.status_code} {response.text}")
+        return response.json()
+
+    def post_image(self, img_bytes, deadline=None):
+        budget = self.deadline if deadline is None else deadline
+        end = time.monotonic() + budget
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            if not self.breaker.allow():
+                if attempt == 0:
+                    # Nothing was sent: not a round trip (see InferenceDispatcher unmeasured)
+                    raise CircuitOpenError("circuit open, skipping inference request")
+                break  # opened by our own failed attempts
+            try:
+                data = self._post_once(img_bytes, min(self.attempt_timeout, remaining))
+            except RetryableStatus as e:
+                last_error = e
+            except RuntimeError:
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                last_error = e
+            else:
+                self.breaker.record_success()
+                return data
+
+            self.breaker.record_failure()
+            delay = self._backoff(attempt)
+            if attempt == self.max_retries or time.monotonic() + delay >= end:
+                break
+            time.sleep(delay)
+
+        raise DeadlineExceeded(f"no response within {budget:.1f}s budget: {last_error}")
+
+    def close(self):
+        self.session.close()
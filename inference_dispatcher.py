@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class InferenceDispatcher:
+    # Keeps up to max_in_flight inference calls outstanding. Every submitted frame
+    # gets a monotonically increasing frame id; a result is only handed to
+    # on_result if it is newer than the last applied one, so state never goes
+    # backwards in time when responses arrive out of order. on_latency(seconds)
+    # sees every call except those failing with one of the unmeasured
+    # exception types, which never reached the server (e.g. CircuitOpenError).
+
+    def __init__(self, infer, on_result, max_in_flight=2, rate_window=10.0, on_latency=None, unmeasured=()):
+        self.infer = infer
+        self.on_result = on_result
+        self.on_latency = on_latency
+        self.unmeasured = tuple(unmeasured)
+        self.max_in_flight = max_in_flight
+        self.rate_window = rate_window
+
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="inference")
+        self.lock = threading.Lock()
+        self.apply_lock = threading.Lock()
+        self.next_frame_id = 0
+        self.latest_applied_id = -1
+        self._in_flight = 0
+        self.completed = deque()
+
+        self.submitted = 0
+        self.applied = 0
+        self.dropped_stale = 0
+        self.failed = 0
+
+    @property
+    def in_flight(self):
+        with self.lock:
+            return self._in_flight
+
+    def can_submit(self):
+        return self.in_flight < self.max_in_flight
+
+    def submit(self, frame):
+        with self.lock:
+            if self._in_flight >= self.max_in_flight:
+                return None
+            self.next_frame_id += 1
+            frame_id = self.next_frame_id
+            self._in_flight += 1
+            self.submitted += 1
+        self.executor.submit(self._run, frame_id, frame)
+        return frame_id
+
+    def _run(self, frame_id, frame):
+        start = time.time()
+        measured = True
+        try:
+            result = self.infer(frame)
+        except Exception as e:
+            print(f"❌ Detection failed (frame {frame_id}):", e)
+            with self.lock:
+                self.failed += 1
+            measured = not isinstance(e, self.unmeasured)
+            result = None
+        finally:
+            now = time.time()
+            with self.lock:
+                self._in_flight -= 1
+                self.completed.append(now)
+            if self.on_latency is not None and measured:
+                self.on_latency(now - start)
+
+        if result is None:
+            return
+        # apply_lock keeps results applied strictly in frame id order
+        with self.apply_lock:
+            if frame_id <= self.latest_applied_id:
+                with self.lock:
+                    self.dropped_stale += 1
+                return
+            self.latest_applied_id = frame_id
+            try:
+                self.on_result(frame_id, frame, result)
+            except Exception as e:
+                print(f"❌ Could not apply detections (frame {frame_id}):", e)
+        with self.lock:
+            self.applied += 1
+
+    def requests_per_second(self):
+        now = time.time()
+        with self.lock:
+            while self.completed and now - self.completed[0] > self.rate_window:
+                self.completed.popleft()
+            return len(self.completed) / self.rate_window
+
+    def stats(self):
+        rps = self.requests_per_second()
+        with self.lock:
+            return {
+                'requests_per_second': rps,
+                'in_flight': self._in_flight,
+                'submitted': self.submitted,
+                'applied': self.applied,
+                'dropped_stale': self.dropped_stale,
+                'failed': self.failed,
+                'latest_applied_id': self.latest_applied_id,
+            }
+
+    def shutdown(self, wait=False):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
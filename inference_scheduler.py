@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+import threading
+
+
+class AdaptiveScheduler:
+    # Picks the interval between inference requests:
+    #   - active_rate while a dog_without_collar is in view or the timer runs
+    #   - idle_rate when something else (e.g. a collared dog) is in view
+    #   - exponential back-off towards min_rate while the scene stays empty
+    # The interval is never shorter than the measured round-trip time divided
+    # by the number of requests allowed in flight, so requests never queue up.
+
+    def __init__(self, min_rate=0.1, max_rate=4.0, idle_rate=0.67, backoff_factor=1.5,
+                 max_in_flight=1, rtt_alpha=0.3):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.idle_rate = min(max(idle_rate, min_rate), max_rate)
+        self.backoff_factor = backoff_factor
+        self.max_in_flight = max_in_flight
+        self.rtt_alpha = rtt_alpha
+
+        self.lock = threading.Lock()
+        self.target_rate = self.idle_rate
+        self.rtt = None
+        self.mode = "idle"
+
+    def observe_result(self, detections, timer_running=False):
+        with self.lock:
+            if timer_running or any(det['class'] == "dog_without_collar" for det in detections):
+                self.target_rate = self.max_rate
+                self.mode = "active"
+            elif detections:
+                self.target_rate = self.idle_rate
+                self.mode = "idle"
+            else:
+                self._back_off()
+
+    def observe_static(self):
+        # The motion gate saw no change: treat it like another empty result
+        with self.lock:
+            if self.mode != "active":
+                self._back_off()
+
+    def _back_off(self):
+        self.target_rate = max(self.min_rate, min(self.target_rate, self.idle_rate) / self.backoff_factor)
+        self.mode = "empty"
+
+    def reset(self):
+        # Back to the idle rate; the measured round-trip time stays valid
+        with self.lock:
+            self.target_rate = self.idle_rate
+            self.mode = "idle"
+
+    def observe_rtt(self, seconds):
+        with self.lock:
+            if self.rtt is None:
+                self.rtt = seconds
+            else:
+                self.rtt += self.rtt_alpha * (seconds - self.rtt)
+
+    def interval(self):
+        with self.lock:
+            interval = 1.0 / self.target_rate
+            if self.rtt is not None:
+                interval = max(interval, self.rtt / self.max_in_flight)
+            return min(interval, 1.0 / self.min_rate)
+
+    @property
+    def current_rate(self):
+        return 1.0 / self.interval()
+
+    def due(self, now, last_sent_time):
+        return now - last_sent_time >= self.interval()
+
+    def stats(self):
+        rate = self.current_rate
+        with self.lock:
+            return {
+                'rate': rate,
+                'target_rate': self.target_rate,
+                'mode': self.mode,
+                'rtt': self.rtt,
+            }
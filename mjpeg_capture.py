@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+import argparse
+import struct
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from detectors import EncodedFrame
+from gst_pipeline import LEAKY_APPSINK
+
+# Most USB webcams deliver MJPEG natively. This capture asks the camera for
+# JPEG frames and keeps them compressed: read_inference() hands the camera's
+# own JPEG to the detector with no decode or encode at all, and only read(),
+# the display path, decodes. display_reduce decodes the display frame at
+# 1/2, 1/4 or 1/8 size in the DCT domain (IMREAD_REDUCED_COLOR_*), which is
+# much cheaper than a full decode followed by cv2.resize.
+#
+#   python3 mjpeg_capture.py                       # /dev/video0 through V4L2
+#   python3 mjpeg_capture.py --backend gstreamer --size 1280x720 --display-reduce 2
+
+BACKENDS = ("v4l2", "gstreamer")
+REDUCED_COLOR = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+MAX_CORRUPT = 5  # corrupt camera frames skipped in a row by read()
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_size(data):
+    # (width, height) from the JPEG's start-of-frame header, without decoding
+    data = memoryview(data).cast('B')
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            raise ValueError("corrupt JPEG marker stream")
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1  # fill byte
+            continue
+        length = struct.unpack(">H", data[i + 2:i + 4])[0]
+        if marker in SOF_MARKERS:
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        i += 2 + length
+    raise ValueError("no start-of-frame marker in JPEG")
+
+
+def mjpeg_pipeline(width=640, height=480, framerate=30, device="/dev/video0"):
+    return (f"v4l2src device={device} ! "
+            f"image/jpeg, width={width}, height={height}, framerate={framerate}/1 ! "
+            f"{LEAKY_APPSINK}")
+
+
+def decode_reduced(jpeg, reduce=1):
+    return cv2.imdecode(np.frombuffer(jpeg, np.uint8), REDUCED_COLOR[reduce])
+
+
+class MjpegCapture:
+    # cap may be any object whose read() returns (ok, JPEG bytes as a uint8
+    # array), e.g. a fake for testing; by default the camera is opened
+    def __init__(self, device="/dev/video0", width=640, height=480, framerate=30, backend="v4l2",
+                 display_reduce=1, cap=None):
+        if display_reduce not in REDUCED_COLOR:
+            raise ValueError(f"display_reduce must be one of {sorted(REDUCED_COLOR)}, got {display_reduce}")
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+        self.display_reduce = display_reduce
+        if cap is not None:
+            self.cap = cap
+        elif backend == "gstreamer":
+            self.cap = cv2.VideoCapture(mjpeg_pipeline(width, height, framerate, device), cv2.CAP_GSTREAMER)
+        else:
+            index = int(device.rsplit("video", 1)[-1]) if isinstance(device, str) else device
+            self.cap = cv2.VideoCapture(index, cv2.CAP_V4L2)
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            self.cap.set(cv2.CAP_PROP_FPS, framerate)
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)  # hand back the compressed frame
+
+        self.jpeg = None
+        self.size = None  # (width, height) of the camera's JPEG
+        self.shape = None  # shape of the decoded display frame
+        self.handed_out = True
+        self.jpegs = 0
+        self.corrupt = 0
+        self.decode_ms = deque(maxlen=300)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        # Truncated or garbage JPEGs from the camera are skipped (and counted),
+        # up to MAX_CORRUPT in a row before read() gives up
+        for _ in range(MAX_CORRUPT + 1):
+            ret, buf = self.cap.read()
+            if not ret or buf is None or buf.size == 0:
+                return False, None
+            frame = self._decode(buf.tobytes())
+            if frame is not None:
+                return True, frame
+            self.corrupt += 1
+        return False, None
+
+    def _decode(self, jpeg):
+        try:
+            size = self.size or jpeg_size(jpeg)
+        except (ValueError, struct.error):
+            return None
+        started = time.perf_counter()
+        frame = decode_reduced(jpeg, self.display_reduce)
+        self.decode_ms.append((time.perf_counter() - started) * 1000)
+        if frame is None:
+            return None
+        self.jpeg = jpeg
+        self.size = size
+        self.shape = frame.shape
+        self.handed_out = False
+        return frame
+
+    def read_inference(self):
+        # The camera's JPEG behind the last read(), once; never blocks
+        if self.handed_out or self.jpeg is None:
+            return None
+        self.handed_out = True
+        self.jpegs += 1
+        return EncodedFrame(self.jpeg, self.shape, self.size)
+
+    def release(self):
+        self.cap.release()
+
+    def stats(self):
+        decode = np.array(self.decode_ms) if self.decode_ms else np.zeros(1)
+        return {'jpegs': self.jpegs, 'size': self.size, 'corrupt': self.corrupt,
+                'display_decode_mean_ms': float(decode.mean()), 'display_decode_max_ms': float(decode.max())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MJPEG passthrough capture")
+    parser.add_argument("--device", default="/dev/video0")
+    parser.add_argument("--backend", default="v4l2", choices=BACKENDS)
+    parser.add_argument("--size", default="640x480", help="camera size WxH")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--display-reduce", type=int, default=1, choices=sorted(REDUCED_COLOR))
+    parser.add_argument("--frames", type=int, default=150)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    cap = MjpegCapture(args.device, width, height, args.fps, args.backend, args.display_reduce)
+    if not cap.isOpened():
+        print("❌ Could not open the camera for MJPEG capture")
+        return
+    jpeg_bytes = 0
+    for _ in range(args.frames):
+        ret, _frame = cap.read()
+        if not ret:
+            print("⚠️ Frame capture failed (does the camera offer MJPEG at this size?)")
+            break
+        jpeg_bytes += len(cap.read_inference().jpeg)
+    cap.release()
+    stats = cap.stats()
+    print(f"{stats['jpegs']} JPEGs of {stats['size']}, {jpeg_bytes / max(stats['jpegs'], 1) / 1024:.1f} KiB average; "
+          f"display decode {stats['display_decode_mean_ms']:.2f} ms mean, {stats['display_decode_max_ms']:.2f} ms max")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    # Decides on a small grayscale copy whether the scene changed enough since
+    # the last inference to be worth another one.
+    #   method="diff": absolute difference against the last frame that was sent
+    #   method="mog2": foreground fraction from a MOG2 background subtractor
+    # A frame is let through anyway after max_skip seconds, or when force=True
+    # (e.g. a dog is already in view and the timer needs fresh results).
+
+    def __init__(self, method="diff", width=160, pixel_threshold=25, min_changed_fraction=0.01,
+                 max_skip=10.0, blur=5, mog2_history=200, mog2_var_threshold=16):
+        self.method = method
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_fraction = min_changed_fraction
+        self.max_skip = max_skip
+        self.blur = blur
+        self.mog2_history = mog2_history
+        self.mog2_var_threshold = mog2_var_threshold
+        if method not in ("diff", "mog2"):
+            raise ValueError(f"Unknown motion gate method: {method}")
+        self.reset()
+
+        self.checked = 0
+        self.passed = 0
+        self.skipped = 0
+
+    def reset(self):
+        # Drop the reference frame / learned background, so the next frame is
+        # sent; may be called from another thread than should_infer()
+        self.reference = None
+        self.last_pass_time = 0.0
+        self.last_changed_fraction = 0.0
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=self.mog2_history, varThreshold=self.mog2_var_threshold,
+            detectShadows=False) if self.method == "mog2" else None
+
+    def _small_gray(self, frame):
+        height, width = frame.shape[:2]
+        size = (self.width, max(1, int(height * self.width / width)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        if self.blur:
+            gray = cv2.GaussianBlur(gray, (self.blur, self.blur), 0)
+        return gray
+
+    def changed_fraction(self, gray):
+        subtractor, reference = self.subtractor, self.reference
+        if subtractor is not None:
+            mask = subtractor.apply(gray)
+            return float(np.count_nonzero(mask)) / mask.size
+        if reference is None:
+            return 1.0
+        diff = cv2.absdiff(gray, reference)
+        return float(np.count_nonzero(diff > self.pixel_threshold)) / diff.size
+
+    def should_infer(self, frame, force=False, now=None):
+        now = time.time() if now is None else now
+        gray = self._small_gray(frame)
+        fraction = self.changed_fraction(gray)
+        self.last_changed_fraction = fraction
+        self.checked += 1
+
+        if force or fraction >= self.min_changed_fraction or now - self.last_pass_time >= self.max_skip:
+            self.reference = gray
+            self.last_pass_time = now
+            self.passed += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def stats(self):
+        return {
+            'checked': self.checked,
+            'passed': self.passed,
+            'skipped': self.skipped,
+            'saved_fraction': self.skipped / self.checked if self.checked else 0.0,
+            'last_changed_fraction': self.last_changed_fraction,
+        }
@@ -1,171 +1,268 @@
 #!/usr/bin/env python3
+import argparse
 import cv2
-import requests
+import math
+import sys
 import time
 import threading
-import math
-import subprocess
-import Jetson.GPIO as GPIO
-
-sound_process = None
+from detectors import make_detector
+from inference_client import CircuitOpenError
+from inference_dispatcher import InferenceDispatcher
+from motion_gate import MotionGate
+from inference_scheduler import AdaptiveScheduler
+from tracker import Tracker
+from flow_propagation import FlowPropagator
+from sensor_daemon import SensorClient, ensure_daemon
+from detection_events import DetectionEventPublisher
+from audio_engine import make_audio_engine
+from tone_synth import KINDS, parse_frequency, tone
+from control_socket import DETECTOR_SOCKET, ControlServer
+from camera_broker import BrokerCapture, ensure_broker
+from frame_source import PACINGS, CameraSource, open_frame_source
+from tee_capture import TeeCapture
+from mjpeg_capture import MjpegCapture
 
 ROBOFLOW_API_KEY = "KufuKK4oeLFhc2LYQwKl"
 ROBOFLOW_MODEL_URL = "https://detect.roboflow.com/cheryldogs/1?api_key=" + ROBOFLOW_API_KEY
-USE_WEBCAM = True
-IMAGE_PATH = "test.jpg"
+USE_CAMERA_BROKER = True  # read the camera through camera_broker.py so other tools can share it
+USE_TEE_CAPTURE = False  # GStreamer encodes the inference JPEG in a tee branch (needs PyGObject; owns the camera)
+USE_MJPEG_CAPTURE = False  # send the camera's own MJPEG frames to inference; only the display decodes (owns the camera)
 FRAME_RESIZE = (416, 416)
-SEND_INTERVAL = 1.5  # seconds between API calls
+# Inference rate (requests/second), adapted at runtime by AdaptiveScheduler
+MIN_SEND_RATE = 0.1  # floor when the scene stays empty
+IDLE_SEND_RATE = 1 / 1.5  # something in view, but no collarless dog
+MAX_SEND_RATE = 4.0  # collarless dog in view or countdown running
+MAX_IN_FLIGHT = 2  # inference requests allowed to be outstanding at once
+
+# Detector backend: "roboflow" (HTTP API) or "local" / "onnxruntime" / "opencv-dnn" (on-device CPU)
+DETECTOR_BACKEND = "roboflow"
+LOCAL_MODEL_PATH = "cheryldogs.onnx"
+
+# Roboflow HTTP client: pooled keep-alive connections, deadline per request, circuit breaker
+INFERENCE_CLIENT = {
+    'pool_size': MAX_IN_FLIGHT,
+    'http2': False,
+    'deadline': 5.0,  # total seconds per frame including retries
+    'attempt_timeout': 3.0,
+    'max_retries': 2,
+}
 
 timer_start = None
 timer_duration = 10  # seconds
 
+# Deterrent sound, synthesized and looped in-process while the collarless dog stays.
+# Set with --frequency/--pattern and changeable while running through the control
+# socket, e.g. send_command(DETECTOR_SOCKET, "set_deterrent", frequency="25khz")
+deterrent = {'frequency': 40000.0, 'pattern': "sine"}
+audio = None  # audio engine, opened by main()
+
 # Shared state
 latest_detections = []
 latest_frame_shape = (0, 0, 0)
+latest_frame_id = 0
 lock = threading.Lock()
-last_positions = {}
-MOVE_THRESHOLD = 5  # pixels
-
-# Ultrasonic distance sensor configuration
-TRIG = 35  # Physical pin 35
-ECHO = 33  # Physical pin 33
-GPIO.setmode(GPIO.BOARD)
-GPIO.setup(TRIG, GPIO.OUT)
-GPIO.setup(ECHO, GPIO.IN)
-
-def measure_distance():
-    GPIO.output(TRIG, False)
-    time.sleep(0.1)
-    GPIO.output(TRIG, True)
-    time.sleep(0.00001)
-    GPIO.output(TRIG, False)
-    timeout_start = time.time() + 1
-    while GPIO.input(ECHO) == 0:
-        if time.time() > timeout_start:
-            print("Timeout: ECHO did not go high")
-            return None, None
-    pulse_start = time.time()
-    timeout_end = time.time() + 1
-    while GPIO.input(ECHO) == 1:
-        if time.time() > timeout_end:
-            print("Timeout: ECHO did not go low")
-            return None, None
-    pulse_end = time.time()
-    pulse_duration = pulse_end - pulse_start
-    distance_cm = round(pulse_duration * 17150, 2)
-    distance_m = round(distance_cm / 100, 3)
-    return distance_cm, distance_m
-
-def disable_speaker():
-    try:
-        subprocess.call(['amixer', 'set', 'Speaker', 'mute'])
-        print("🔇 Speaker disabled.")
-    except Exception as e:
-        print(f"Could not disable speaker: {e}")
+detection_bus = None
+
+# Run state, switched by the control socket: "running" (inference on),
+# "paused" (display only), "standby" (daemon idle: camera kept warm, no window)
+# and "exiting". --daemon starts in standby; otherwise the detector starts running.
+daemon_mode = False
+detector_state = "running"
+start_requested_at = None  # wall-clock time of the Start click
+first_detection_latency = None  # seconds from that click to the first applied result
+# Skip inference when the scene has not changed (set USE_MOTION_GATE = False to always send)
+USE_MOTION_GATE = True
+MOTION_GATE = {
+    'method': "diff",  # "diff" (frame differencing) or "mog2" (background subtraction)
+    'width': 160,  # gate works on a downscaled grayscale copy this wide
+    'pixel_threshold': 25,  # per-pixel intensity change counted as motion (diff only)
+    'min_changed_fraction': 0.01,  # fraction of changed pixels needed to send
+    'max_skip': 10.0,  # always send at least this often (seconds)
+}
+motion_gate = MotionGate(**MOTION_GATE) if USE_MOTION_GATE else None
+
+scheduler = AdaptiveScheduler(min_rate=MIN_SEND_RATE, max_rate=MAX_SEND_RATE, idle_rate=IDLE_SEND_RATE,
+                              max_in_flight=MAX_IN_FLIGHT)
+detector = None  # made by main() unless set before (e.g. a fake for testing)
+tracker = Tracker(iou_threshold=0.2, ttl=5.0, max_misses=2)
+
+# Optional: move boxes with Lucas-Kanade optical flow instead of Kalman extrapolation,
+# compensating for inference latency (costs up to OPTICAL_FLOW['budget_ms'] per frame)
+USE_OPTICAL_FLOW = False
+OPTICAL_FLOW = {
+    'scale': 0.5,  # flow runs on a downscaled gray copy
+    'max_points': 20,  # feature points per box
+    'budget_ms': 4.0,  # per-frame time budget for propagating boxes
+}
+flow = FlowPropagator(**OPTICAL_FLOW) if USE_OPTICAL_FLOW else None
+
+# Distance comes from sensor_daemon.py, which owns the ultrasonic pins;
+# the display loop only reads the latest published value
+DISTANCE_MAX_AGE = 1.0  # seconds before a reading is shown as N/A
+distance_sampler = None  # SensorClient, started by main()
+
+def deterrent_sound():
+    current = deterrent
+    return tone(current['frequency'], kind=current['pattern'])
+
+def set_deterrent(frequency=None, pattern=None):
+    # Control command; a sounding deterrent switches over at once
+    global deterrent
+    new = dict(deterrent)
+    if frequency is not None:
+        new['frequency'] = parse_frequency(frequency)
+    if pattern is not None:
+        new['pattern'] = pattern
+    sound = tone(new['frequency'], kind=new['pattern'])  # raises on a bad pattern or frequency
+    deterrent = new
+    if audio is not None and audio.is_playing:
+        audio.play(sound)
+    print(f"🔊 Deterrent set to {new['pattern']} at {new['frequency']:.0f} Hz.")
+    return {'deterrent': new}
+
+def control_status():
+    with lock:
+        detections = len(latest_detections)
+    return {
+        'state': detector_state,
+        'first_detection_latency': first_detection_latency,
+        'deterrent': deterrent,
+        'sounding': audio.is_playing,
+        'timer_running': timer_start is not None,
+        'detections': detections,
+    }
+
+def reset_detection_state():
+    # A paused or stopped run starts over: no boxes, no back-off, fresh motion reference
+    global timer_start, latest_detections
+    with lock:
+        latest_detections = []
+        timer_start = None
+    tracker.reset()
+    scheduler.reset()
+    if motion_gate is not None:
+        motion_gate.reset()
+    audio.stop()
+
+def control_start(clicked_at=None, frequency=None, pattern=None):
+    global detector_state, start_requested_at, first_detection_latency
+    if frequency is not None or pattern is not None:
+        set_deterrent(frequency, pattern)
+    with lock:
+        if detector_state != "running":
+            start_requested_at = clicked_at or time.time()
+            first_detection_latency = None
+            detector_state = "running"
+    return control_status()
+
+def control_pause():
+    global detector_state
+    with lock:
+        if detector_state == "running":
+            detector_state = "paused"
+    reset_detection_state()
+    return control_status()
+
+def control_resume():
+    global detector_state
+    with lock:
+        if detector_state == "paused":
+            detector_state = "running"
+    return control_status()
+
+def control_stop():
+    # The daemon goes back to standby; a standalone detector exits
+    global detector_state
+    with lock:
+        detector_state = "standby" if daemon_mode else "exiting"
+    reset_detection_state()
+    return control_status()
+
+def control_shutdown():
+    global detector_state
+    with lock:
+        detector_state = "exiting"
+    return control_status()
 
 def fetch_detections(frame):
-    global timer_start, latest_detections, latest_frame_shape, sound_process
+    return detector.detect(frame)
 
-    height, width, _ = frame.shape
-    resized = cv2.resize(frame, FRAME_RESIZE)
-    _, img_encoded = cv2.imencode('.jpg', resized)
-    img_bytes = img_encoded.tobytes()
+def apply_detections(frame_id, frame, detections):
+    global timer_start, latest_detections, latest_frame_shape, latest_frame_id, first_detection_latency
 
     try:
-        response = requests.post(
-            ROBOFLOW_MODEL_URL,
-            files={"file": ("image.jpg", img_bytes, "image/jpeg")},
-            timeout=5
-        )
+        with lock:
+            if detector_state != "running":
+                return  # result of a frame sent before pause/stop
+            if first_detection_latency is None and start_requested_at is not None:
+                first_detection_latency = time.time() - start_requested_at
+                print(f"⏱️ Start to first detection: {first_detection_latency * 1000:.0f} ms")
+            latest_detections = detections
+            latest_frame_shape = frame.shape
+            latest_frame_id = frame_id
+        if flow is not None:
+            # Boxes were computed on an older frame; move them to where the dog is now
+            tracker.update(flow.compensate(frame_id, detections))
+            flow.reset()
+        else:
+            tracker.update(detections)
 
-        if response.status_code == 200:
-            data = response.json()
-            detections = data.get("predictions", [])
+        dog_wo_collar_detected = any(det['class'] == "dog_without_collar" for det in detections)
+        dog_w_collar_detected = any(det['class'] == "dog_with_collar" for det in detections)
 
-            with lock:
-                latest_detections = detections
-                latest_frame_shape = frame.shape
-
-            dog_wo_collar_detected = any(det['class'] == "dog_without_collar" for det in detections)
-            dog_w_collar_detected = any(det['class'] == "dog_with_collar" for det in detections)
-
-            now = time.time()
-
-            # Logic for timer and sound
-            if dog_wo_collar_detected and not dog_w_collar_detected:
-                if timer_start is None:
-                    timer_start = now  # Start counting
-                elapsed = now - timer_start
-                if elapsed >= timer_duration:
-                    # Play sound if not already playing
-                    if sound_process is None or sound_process.poll() is not None:
-                        try:
-                            sound_process = subprocess.Popen(['aplay', './40khz.wav'])
-                        except Exception as e:
-                            print(f"Could not play sound: {e}")
-                else:
-                    # Stop sound if it's somehow playing before 10 seconds
-                    if sound_process is not None and sound_process.poll() is None:
-                        try:
-                            sound_process.terminate()
-                            sound_process = None
-                        except Exception as e:
-                            print(f"Could not stop sound: {e}")
-            elif dog_w_collar_detected:
-                # Reset timer and stop sound if playing, and disable speaker
-                timer_start = None
-                if sound_process is not None and sound_process.poll() is None:
+        now = time.time()
+
+        # Logic for timer and sound
+        if dog_wo_collar_detected and not dog_w_collar_detected:
+            if timer_start is None:
+                timer_start = now  # Start counting
+            elapsed = now - timer_start
+            if elapsed >= timer_duration:
+                # Play sound if not already playing
+                if not audio.is_playing:
                     try:
-                        sound_process.terminate()
-                        sound_process = None
-                        disable_speaker()
+                        audio.play(deterrent_sound())
                     except Exception as e:
-                        print(f"Could not stop sound: {e}")
-                else:
-                    disable_speaker()
+                        print(f"Could not play sound: {e}")
             else:
-                # Reset timer and stop sound if playing
-                timer_start = None
-                if sound_process is not None and sound_process.poll() is None:
-                    try:
-                        sound_process.terminate()
-                        sound_process = None
-                    except Exception as e:
-                        print(f"Could not stop sound: {e}")
+                # Stop sound if it's somehow playing before 10 seconds
+                audio.stop()
+        elif dog_w_collar_detected:
+            # Reset timer, stop sound and disable speaker (the mixer is only touched on change)
+            timer_start = None
+            was_muted = audio.mixer is not None and audio.mixer.muted
+            audio.mute()
+            if audio.mixer is not None and audio.mixer.muted and not was_muted:
+                print("🔇 Speaker disabled.")  # once per alert, when the mixer actually mutes
+        else:
+            # Reset timer and stop sound if playing
+            timer_start = None
+            audio.stop()
 
-            # Write detection state to file
-            if dog_wo_collar_detected:
-                with open("detection_logs.txt", "w") as f:
-                    f.write("true\n")
-            elif dog_w_collar_detected:
-                with open("detection_logs.txt", "w") as f:
-                    f.write("false\n")
+        scheduler.observe_result(detections, timer_running=timer_start is not None)
 
-        else:
-            print("❌ Roboflow Error:", response.status_code, response.text)
+        # Push the result to local consumers (also keeps detection_logs.txt for old readers)
+        if detection_bus is not None:
+            detection_bus.publish(frame_id, detections)
 
     except Exception as e:
-        print("❌ Request failed:", e)
-
-def object_moved(last_pos, current_pos):
-    dx = last_pos[0] - current_pos[0]
-    dy = last_pos[1] - current_pos[1]
-    dist = math.sqrt(dx*dx + dy*dy)
-    return dist > MOVE_THRESHOLD
+        print("❌ Could not apply detections:", e)
 
 def draw_detections(frame):
-    global timer_start, last_positions
+    global timer_start
 
     height, width, _ = frame.shape
 
-    with lock:
-        detections = latest_detections.copy()
-        shape = latest_frame_shape
-
     scale_x = width / FRAME_RESIZE[0]
     scale_y = height / FRAME_RESIZE[1]
 
     now = time.time()
+    # Boxes follow the dog between results: via optical flow when enabled,
+    # otherwise Kalman-extrapolated to now
+    if flow is not None:
+        detections = flow.step(frame, tracker.tracks_at(now, extrapolate=False))
+    else:
+        detections = tracker.tracks_at(now)
 
     draw_class = "dog_without_collar" if any(det['class'] == "dog_without_collar" for det in detections) else "dog_with_collar"
 
@@ -187,17 +284,10 @@ def draw_detections(frame):
         color = (0, 255, 0) if class_name == "dog_without_collar" else (255, 0, 0)
         cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
 
-        label = f"{class_name} ({det['confidence']:.2f})"
+        label = f"#{det['track_id']} {class_name} ({det['confidence']:.2f})"
         cv2.putText(frame, label, (x1, y1 - 10),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
 
-        obj_id = f"{class_name}_{int(x)}_{int(y)}"
-        last_pos = last_positions.get(obj_id)
-        current_pos = (x, y)
-
-        if last_pos is None or object_moved(last_pos, current_pos):
-            last_positions[obj_id] = current_pos
-
         # Show center counter for "dog_without_collar"
         if class_name == "dog_without_collar":
             with lock:
@@ -217,7 +307,8 @@ def draw_detections(frame):
                         cv2.putText(frame, counter_text, (text_x, text_y),
                                     cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 165, 255), 4)
             # --- Distance display inside bounding box ---
-            distance_cm, distance_m = measure_distance()
+            reading = distance_sampler.latest(max_age=DISTANCE_MAX_AGE)
+            distance_cm, distance_m = reading[1:] if reading is not None else (None, None)
             if distance_cm is not None and distance_m is not None:
                 distance_text = f"{distance_cm:.1f} cm / {distance_m:.2f} m"
             else:
@@ -231,74 +322,227 @@ def draw_detections(frame):
             cv2.putText(frame, distance_text, (text_x, text_y),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 0), 2)
 
-def gstreamer_pipeline(
-    capture_width=640,
-    capture_height=480,
-    display_width=640,
-    display_height=480,
-    framerate=30,
-    flip_method=0
-):
-    return (
-        f"v4l2src device=/dev/video0 ! "
-        f"video/x-raw, width={capture_width}, height={capture_height}, framerate={framerate}/1 ! "
-        f"videoconvert ! "
-        f"videoscale ! "
-        f"video/x-raw, width={display_width}, height={display_height} ! "
-        f"appsink"
-    )
-
-def main():
-    if USE_WEBCAM:
-        cap = cv2.VideoCapture(gstreamer_pipeline(), cv2.CAP_GSTREAMER)
+def draw_inference_stats(frame, stats, gate_stats=None):
+    text = (f"{stats['requests_per_second']:.2f} req/s (target {scheduler.current_rate:.2f})"
+            f"  in-flight {stats['in_flight']}/{MAX_IN_FLIGHT}")
+    if gate_stats is not None:
+        text += f"  gate saved {gate_stats['skipped']}/{gate_stats['checked']}"
+    cv2.putText(frame, text, (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Dog detector with ultrasonic deterrent")
+    parser.add_argument("--frequency", default="40khz", help='deterrent frequency, e.g. 25000 or "25khz"')
+    parser.add_argument("--pattern", default="sine", choices=KINDS, help="deterrent sound pattern")
+    parser.add_argument("--control-socket", default=DETECTOR_SOCKET,
+                        help="Unix socket accepting live control commands")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep the camera warm in standby and wait for a start command")
+    parser.add_argument("--source", default="camera",
+                        help='"camera", "synthetic", a video file, an image directory or a glob of images')
+    parser.add_argument("--pacing", default="realtime", choices=PACINGS,
+                        help="play recorded/synthetic sources at their frame rate or as fast as possible")
+    parser.add_argument("--fps", type=float, help="frame rate of recorded/synthetic sources")
+    parser.add_argument("--loop", action="store_true", help="restart recorded sources at the end")
+    parser.add_argument("--max-frames", type=int, help="stop after this many frames (benchmarking)")
+    parser.add_argument("--headless", action="store_true", help="no preview window")
+    return parser.parse_args()
+
+def open_capture(args, camera, encoded_capture, shared_frames):
+    # The frame source for args.source; None (after printing why) if it cannot be opened
+    if encoded_capture:
+        try:
+            cap = TeeCapture(inference_fps=math.ceil(MAX_SEND_RATE)) if USE_TEE_CAPTURE else MjpegCapture()
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return None
+        if not cap.isOpened():
+            print("❌ Could not open USB camera")
+            return None
+    elif shared_frames:
+        try:
+            ensure_broker()
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return None
+        cap = BrokerCapture()
+        if not cap.isOpened():
+            print("❌ Camera broker not available")
+            return None
+    elif camera:
+        cap = CameraSource()  # DOG_CAPTURE_BACKEND picks GStreamer, direct V4L2 or the fake device
         if not cap.isOpened():
             print("❌ Could not open USB camera")
-            GPIO.cleanup()
-            return
+            return None
     else:
-        frame = cv2.imread(IMAGE_PATH)
-        if frame is None:
-            print("❌ Could not load image:", IMAGE_PATH)
-            GPIO.cleanup()
-            return
+        try:
+            cap = open_frame_source(args.source, args.pacing, args.loop, args.fps)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return None
+    return cap
 
-    print("✅ Roboflow Detection Running. Press 'q' to quit.")
+def main():
+    global detection_bus, daemon_mode, detector_state, start_requested_at, audio, detector, distance_sampler
 
-    last_sent_time = 0
-    send_thread = None
+    args = parse_args()
+    daemon_mode = args.daemon
+    detector_state = "standby" if daemon_mode else "running"
+    start_requested_at = None if daemon_mode else time.time()
+    try:
+        set_deterrent(args.frequency, args.pattern)
+    except ValueError as e:
+        print(f"❌ Invalid deterrent: {e}")
+        return 1
 
-    while True:
-        if USE_WEBCAM:
-            ret, frame = cap.read()
-            if not ret:
+    # Claim the detection bus before opening anything: if another detector
+    # already serves it (e.g. one auto-started by controlcenter.py), leave
+    try:
+        detection_bus = DetectionEventPublisher()
+    except (RuntimeError, OSError) as e:
+        print(f"❌ Detector already running: {e}")
+        return 1
+
+    audio = make_audio_engine()
+    if detector is None:
+        detector = make_detector(DETECTOR_BACKEND, model_url=ROBOFLOW_MODEL_URL, model_path=LOCAL_MODEL_PATH,
+                                 client_kwargs=INFERENCE_CLIENT)
+    ensure_daemon()
+    distance_sampler = SensorClient(autostart=True)  # restarts the daemon if it goes away
+
+    def close_services():
+        audio.close()
+        distance_sampler.stop()
+        detection_bus.close()
+
+    # The control handlers use the services above, so the socket comes last
+    try:
+        control = ControlServer(args.control_socket, {
+            'set_deterrent': set_deterrent,
+            'status': control_status,
+            'start': control_start,
+            'pause': control_pause,
+            'resume': control_resume,
+            'stop': control_stop,
+            'shutdown': control_shutdown,
+        })
+    except (RuntimeError, OSError) as e:
+        close_services()
+        print(f"❌ Detector already running: {e}")
+        return 1
+
+    camera = args.source == "camera"
+    # Captures that hand over ready JPEGs for inference; the broker shares the camera with other processes
+    encoded_capture = camera and (USE_TEE_CAPTURE or USE_MJPEG_CAPTURE)
+    shared_frames = camera and USE_CAMERA_BROKER and not encoded_capture
+    cap = open_capture(args, camera, encoded_capture, shared_frames)
+    if cap is None:
+        control.close()
+        close_services()
+        return 1
+
+    if daemon_mode:
+        print("✅ Detector daemon ready, waiting for a start command.")
+    else:
+        print("✅ Roboflow Detection Running. Press 'q' to quit.")
+    last_sent_time = 0
+    dispatcher = InferenceDispatcher(fetch_detections, apply_detections, max_in_flight=MAX_IN_FLIGHT,
+                                     on_latency=scheduler.observe_rtt, unmeasured=(CircuitOpenError,))
+    window_open = False
+    started_at = start_requested_at
+    frames = 0
+    draw_buffer = None
+    run_started = time.perf_counter()
+
+    while detector_state != "exiting":
+        # Broker frames are copied out of shared memory into one reused buffer
+        ret, frame = cap.read(draw_buffer) if shared_frames else cap.read()
+        if not ret:
+            if getattr(cap, 'exhausted', False):
+                print(f"✅ End of {args.source}")
+                if window_open and not daemon_mode:
+                    cv2.waitKey(0)  # keep the last frame (e.g. a single image) up until a key press
+            else:
                 print("⚠️ Frame capture failed")
-                break
-        else:
-            frame = frame.copy()
+            break
+        if shared_frames:
+            draw_buffer = frame
+
+        if detector_state == "standby":
+            # Keep reading so the pipeline and auto-exposure stay settled
+            if window_open:
+                cv2.destroyWindow("Roboflow Detection")
+                cv2.waitKey(1)
+                window_open = False
+            if not camera and args.pacing == "fast":
+                time.sleep(0.03)
+            continue
 
         now = time.time()
-
-        if now - last_sent_time >= SEND_INTERVAL and (send_thread is None or not send_thread.is_alive()):
-            frame_for_sending = frame.copy()
-            send_thread = threading.Thread(target=fetch_detections, args=(frame_for_sending,))
-            send_thread.start()
+        if start_requested_at != started_at:
+            started_at = start_requested_at
+            last_sent_time = 0  # infer on the first frame after a start, whatever the schedule
+
+        # While backed off, the motion gate still looks at the scene at the idle rate
+        # so a dog walking in does not have to wait for the slow schedule
+        due = scheduler.due(now, last_sent_time)
+        wake_check = motion_gate is not None and now - last_sent_time >= 1 / IDLE_SEND_RATE
+        ready = detector_state == "running" and (due or wake_check) and dispatcher.can_submit()
+        encoded = None
+        if ready and encoded_capture:
+            encoded = cap.read_inference()  # None until the capture has a new JPEG
+            ready = encoded is not None
+        if ready:
+            # Keep inferring while a dog is in view so the timer sees fresh results
+            with lock:
+                dog_in_view = timer_start is not None or len(latest_detections) > 0
+            if motion_gate is None or motion_gate.should_infer(frame, force=dog_in_view, now=now):
+                # Otherwise the detector gets the one snapshot it keeps, since this frame is drawn on below
+                frame_id = dispatcher.submit(encoded if encoded is not None else frame.copy())
+                if flow is not None and frame_id is not None:
+                    flow.remember(frame_id, frame)
+            elif due:
+                scheduler.observe_static()
             last_sent_time = now
 
         draw_detections(frame)
+        draw_inference_stats(frame, dispatcher.stats(), motion_gate.stats() if motion_gate else None)
+        frames += 1
+        if args.max_frames and frames >= args.max_frames:
+            break
 
+        if args.headless:
+            continue
         cv2.imshow("Roboflow Detection", frame)
+        window_open = True
 
         if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-
-        if not USE_WEBCAM:
-            cv2.waitKey(0)
-            break
+            control_stop()
+            continue
 
-    if USE_WEBCAM:
-        cap.release()
-    cv2.destroyAllWindows()
-    GPIO.cleanup()
+    elapsed = time.perf_counter() - run_started
+    dispatcher.shutdown()
+    if frames and not camera:
+        stats = dispatcher.stats()
+        print(f"Processed {frames} frames in {elapsed:.2f} s ({frames / elapsed:.1f} fps, {args.pacing} pacing), "
+              f"{stats['submitted']} inference calls.")
+    control.close()
+    detection_bus.close()
+    audio_stats = audio.stats()
+    audio.close()
+    if audio_stats['start'] is not None:
+        print(f"Sound start latency: {audio_stats['start']['mean_ms']:.1f} ms mean, "
+              f"{audio_stats['start']['max_ms']:.1f} ms max over {audio_stats['start']['count']} alerts.")
+    distance_sampler.stop()
+    if motion_gate is not None:
+        stats = motion_gate.stats()
+        print(f"Motion gate skipped {stats['skipped']} of {stats['checked']} inference calls ({stats['saved_fraction']:.0%}).")
+    if flow is not None:
+        stats = flow.stats()
+        print(f"Optical flow: {stats['mean_ms']:.2f} ms/frame mean, {stats['max_ms']:.2f} ms max, "
+              f"{stats['over_budget']} frames over budget.")
+    cap.release()
+    if not args.headless:
+        cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
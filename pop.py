@@ -1,5 +1,5 @@
 # --- Simple ON/OFF "Blink Test" Code ---
-import Jetson.GPIO as GPIO
+from gpio_hal import GPIO
 import time
 
 # Use the same pin as your main script
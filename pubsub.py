@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+import json
+import os
+import socket
+import threading
+import time
+
+# Minimal local publish/subscribe over a Unix domain stream socket.
+# Messages are JSON objects, one per line. The publisher replays its last
+# message to every new subscriber so late joiners see current state at once.
+
+
+class Publisher:
+    def __init__(self, path, send_timeout=0.05):
+        self.path = path
+        self.send_timeout = send_timeout
+        self.clients = []
+        self.lock = threading.Lock()
+        self.last_message = None
+        self.running = True
+
+        if os.path.exists(path):
+            if is_listening(path):
+                raise RuntimeError(f"another publisher is already serving {path}")
+            os.unlink(path)  # stale socket from a crashed run
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen(16)
+        self.thread = threading.Thread(target=self._accept, name=f"pub:{os.path.basename(path)}", daemon=True)
+        self.thread.start()
+
+    def _accept(self):
+        while self.running:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                break
+            conn.settimeout(self.send_timeout)
+            with self.lock:
+                if self.last_message is not None and not self._send(conn, self.last_message):
+                    continue
+                self.clients.append(conn)
+
+    def _send(self, conn, data):
+        try:
+            conn.sendall(data)
+            return True
+        except OSError:
+            # Gone, or too slow to keep up: drop it rather than stall the publisher
+            conn.close()
+            return False
+
+    def publish(self, message):
+        data = (json.dumps(message, separators=(',', ':')) + "\n").encode()
+        with self.lock:
+            self.last_message = data
+            self.clients = [c for c in self.clients if self._send(c, data)]
+
+    @property
+    def subscriber_count(self):
+        with self.lock:
+            return len(self.clients)
+
+    def close(self):
+        self.running = False
+        try:
+            self.server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.server.close()
+        finally:
+            with self.lock:
+                for c in self.clients:
+                    c.close()
+                self.clients = []
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+class Subscriber:
+    # Calls callback(message) from a background thread for every message;
+    # reconnects with back-off when the publisher is not (yet) running.
+    # on_unavailable() runs on the subscriber thread after every failed
+    # connection attempt.
+
+    def __init__(self, path, callback, retry_interval=0.5, max_retry_interval=5.0,
+                 on_unavailable=None):
+        self.path = path
+        self.callback = callback
+        self.on_unavailable = on_unavailable
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.connected = False
+        self.running = True
+        self.sock = None
+        self.thread = threading.Thread(target=self._run, name=f"sub:{os.path.basename(path)}", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        delay = self.retry_interval
+        while self.running:
+            try:
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.connect(self.path)
+            except OSError:
+                self.sock.close()
+                if self.on_unavailable is not None:
+                    self._hook(self.on_unavailable)
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_interval)
+                continue
+            delay = self.retry_interval
+            self.connected = True
+            self._read()
+            self.connected = False
+            self.sock.close()
+
+    def _hook(self, hook):
+        try:
+            hook()
+        except Exception as e:
+            print(f"Subscriber hook {getattr(hook, '__name__', hook)} failed: {e}")
+
+    def _read(self):
+        buffer = b""
+        while self.running:
+            try:
+                chunk = self.sock.recv(65536)
+            except OSError:
+                return
+            if not chunk:
+                return
+            buffer += chunk
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                try:
+                    self.callback(message)
+                except Exception as e:
+                    print(f"Subscriber callback failed: {e}")
+
+    def close(self):
+        self.running = False
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+
+
+def is_listening(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
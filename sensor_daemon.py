@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+import argparse
+import errno
+import fcntl
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from distance_filter import DistanceFilter
+from pubsub import Publisher, Subscriber, is_listening
+from sensor_service import RingBuffer
+
+# Single owner of the HC-SR04 pins. Pings at a fixed rate and publishes every
+# reading (raw, plus a smoothed estimate with a confidence from DistanceFilter)
+# on a Unix socket, so any number of processes can read the distance without
+# triggering the sensor themselves:
+#   python3 sensor_daemon.py --rate 5
+# Consumers use SensorClient; with autostart it starts the daemon on demand
+# and again whenever it disappears. The daemon runs detached in its own
+# session and is never stopped by a consumer, so it outlives whichever
+# process happened to start it. A lock file next to the socket makes sure
+# only one of several simultaneously started daemons keeps running.
+
+SENSOR_SOCKET = "/tmp/dog-sensor.sock"
+SENSOR_LOG = "/tmp/dog-sensor.log"
+TRIG = 35  # Physical pin 35
+ECHO = 33  # Physical pin 33
+RATE_HZ = 5.0
+
+
+class SensorClient:
+    # Subscribes to the daemon and keeps the smoothed estimates (and the raw
+    # readings in .raw) in local RingBuffers. Same latest()/window() API as
+    # UltrasonicSampler; never blocks on the sensor.
+
+    def __init__(self, path=SENSOR_SOCKET, capacity=256, min_confidence=0.2, autostart=False):
+        self.path = path
+        self.autostart = autostart
+        self.buffer = RingBuffer(capacity)
+        self.raw = RingBuffer(capacity)
+        self.min_confidence = min_confidence
+        self.confidence = 0.0
+        self.last_seq = None
+        self.subscriber = Subscriber(path, self._on_message, on_unavailable=self._on_unavailable)
+
+    def _on_unavailable(self):
+        # Called once per failed reconnect, i.e. at the subscriber's back-off rate
+        if self.autostart:
+            ensure_daemon(self.path, wait=0)
+
+    def _on_message(self, message):
+        if message.get('type') != 'distance' or message.get('seq') == self.last_seq:
+            return
+        self.last_seq = message.get('seq')
+        self.confidence = message.get('confidence', 0.0)
+        filtered = message.get('filtered_cm')
+        if filtered is not None and self.confidence < self.min_confidence:
+            filtered = None
+        self.raw.push(message['t'], message.get('cm'))
+        self.buffer.push(message['t'], filtered)
+
+    @property
+    def connected(self):
+        return self.subscriber.connected
+
+    def start(self):
+        return self
+
+    def stop(self):
+        self.subscriber.close()
+
+    def latest(self, max_age=None):
+        sample = self.buffer.latest()
+        if sample is None:
+            return None
+        t, cm = sample
+        if cm is None or (max_age is not None and time.time() - t > max_age):
+            return t, None, None
+        return t, round(cm, 2), round(cm / 100, 3)
+
+    def window(self, seconds):
+        return self.buffer.window(seconds)
+
+    def measure(self, max_age=1.0):
+        # Drop-in for the old measure_distance(): (cm, m) or None
+        sample = self.latest(max_age=max_age)
+        if sample is None or sample[1] is None:
+            return None
+        return sample[1], sample[2]
+
+
+def ensure_daemon(path=SENSOR_SOCKET, wait=2.0):
+    # Starts sensor_daemon.py, detached, unless one is already serving path.
+    # Returns True if a daemon was started. Racing callers may both start one;
+    # the daemon's lock file lets only the first keep running.
+    if is_listening(path):
+        return False
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sensor_daemon.py")
+    with open(SENSOR_LOG, "ab") as log:
+        subprocess.Popen([sys.executable, script, "--socket", path], stdin=subprocess.DEVNULL,
+                         stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+    deadline = time.time() + wait
+    while time.time() < deadline and not is_listening(path):
+        time.sleep(0.05)
+    return True
+
+
+def acquire_lock(path):
+    # Held for the daemon's lifetime; the kernel drops it when the process dies
+    lock = open(path + ".lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ultrasonic sensor daemon")
+    parser.add_argument("--socket", default=SENSOR_SOCKET)
+    parser.add_argument("--rate", type=float, default=RATE_HZ, help="pings per second")
+    args = parser.parse_args()
+
+    # Imported here so clients never touch GPIO
+    from gpio_hal import GPIO
+    from sensor_service import UltrasonicSampler
+    from ultrasonic import EchoReader
+
+    lock = acquire_lock(args.socket)
+    if lock is None:
+        print("Sensor daemon already running (lock held).")
+        return
+    try:
+        publisher = Publisher(args.socket)
+    except RuntimeError as e:
+        print(f"Sensor daemon already running: {e}")
+        return
+    except OSError as e:
+        if e.errno != errno.EADDRINUSE:
+            raise
+        print(f"Sensor daemon already running: {args.socket} is in use")
+        return
+
+    GPIO.setmode(GPIO.BOARD)
+    GPIO.setup(TRIG, GPIO.OUT)
+    GPIO.setup(ECHO, GPIO.IN)
+    reader = EchoReader(GPIO, TRIG, ECHO, verbose=False)
+    distance_filter = DistanceFilter()
+
+    seq = 0
+
+    def publish(timestamp, distance_cm):
+        nonlocal seq
+        seq += 1
+        filtered_cm, confidence = distance_filter.update(timestamp, distance_cm)
+        publisher.publish({
+            'type': 'distance',
+            'seq': seq,
+            't': timestamp,
+            'cm': distance_cm,
+            'm': round(distance_cm / 100, 3) if distance_cm is not None else None,
+            'filtered_cm': round(filtered_cm, 2) if filtered_cm is not None else None,
+            'confidence': round(confidence, 3),
+        })
+
+    sampler = UltrasonicSampler(reader.measure, rate_hz=args.rate, on_sample=publish).start()
+    print(f"✅ Sensor daemon publishing on {args.socket} at {args.rate} Hz.")
+    # SIGTERM (e.g. from systemd or kill) should still release the pins
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\nSensor daemon stopped by User")
+    finally:
+        sampler.stop()
+        publisher.close()
+        reader.close()
+        GPIO.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+import threading
+import time
+
+import numpy as np
+
+
+class RingBuffer:
+    # Single-writer ring of (timestamp, value) samples. Readers never take a
+    # lock: they snapshot the write counter, copy, and retry if the writer
+    # lapped them in the meantime. Failed readings are stored as NaN.
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.times = np.zeros(capacity)
+        self.values = np.full(capacity, np.nan)
+        self.count = 0
+
+    def push(self, timestamp, value):
+        i = self.count % self.capacity
+        self.times[i] = timestamp
+        self.values[i] = np.nan if value is None else value
+        self.count += 1  # publish after the slot is written
+
+    def latest(self):
+        while True:
+            n = self.count
+            if n == 0:
+                return None
+            i = (n - 1) % self.capacity
+            t, v = self.times[i], self.values[i]
+            if self.count - n <= self.capacity - 1:
+                return float(t), (None if np.isnan(v) else float(v))
+
+    def window(self, seconds, now=None):
+        now = time.time() if now is None else now
+        while True:
+            n = self.count
+            size = min(n, self.capacity)
+            idx = np.arange(n - size, n) % self.capacity
+            times, values = self.times[idx], self.values[idx]
+            if self.count - n <= self.capacity - size:
+                break
+        keep = times >= now - seconds
+        return times[keep], values[keep]
+
+
+class UltrasonicSampler:
+    # Pings the sensor from its own thread at rate_hz and records readings in a
+    # RingBuffer, so readers (e.g. the display loop) never touch GPIO or block.
+
+    def __init__(self, measure, rate_hz=5.0, capacity=256, on_sample=None):
+        self.measure = measure
+        self.on_sample = on_sample
+        self.period = 1.0 / rate_hz
+        self.buffer = RingBuffer(capacity)
+        self.running = False
+        self.thread = None
+        self.errors = 0
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="ultrasonic", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=3)
+            self.thread = None
+
+    def _run(self):
+        next_ping = time.monotonic()
+        while self.running:
+            try:
+                result = self.measure()
+            except Exception as e:
+                print(f"Exception measuring distance: {e}")
+                result = None
+            distance_cm = result[0] if result is not None else None
+            if distance_cm is None:
+                self.errors += 1
+            timestamp = time.time()
+            self.buffer.push(timestamp, distance_cm)
+            if self.on_sample is not None:
+                self.on_sample(timestamp, distance_cm)
+
+            next_ping += self.period
+            delay = next_ping - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_ping = time.monotonic()
+
+    def latest(self, max_age=None):
+        # Returns (timestamp, distance_cm, distance_m); distance is None if the
+        # last ping failed or the reading is older than max_age seconds
+        sample = self.buffer.latest()
+        if sample is None:
+            return None
+        t, cm = sample
+        if cm is None or (max_age is not None and time.time() - t > max_age):
+            return t, None, None
+        return t, round(cm, 2), round(cm / 100, 3)
+
+    def window(self, seconds):
+        return self.buffer.window(seconds)
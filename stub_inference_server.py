@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the Roboflow endpoint that injects latency and failures,
+# for exercising InferenceClient retries, deadlines and the circuit breaker:
+#   python3 stub_inference_server.py --latency 0.3 --jitter 0.2 --failure-rate 0.2
+# then point ROBOFLOW_MODEL_URL at http://127.0.0.1:8765/model
+
+
+class StubConfig:
+    def __init__(self, latency=0.05, jitter=0.0, failure_rate=0.0, drop_rate=0.0, down_until=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.drop_rate = drop_rate
+        self.down_until = down_until
+        self.requests = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def go_down(self, seconds):
+        self.down_until = time.monotonic() + seconds
+
+
+PREDICTIONS = [
+    {'x': 208.0, 'y': 220.0, 'width': 120.0, 'height': 150.0, 'confidence': 0.91, 'class': 'dog_without_collar'},
+]
+
+
+def make_handler(config):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients reuse connections
+
+        def setup(self):
+            super().setup()
+            with config.lock:
+                config.connections += 1
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            self.rfile.read(length)
+            with config.lock:
+                config.requests += 1
+
+            time.sleep(max(0.0, config.latency + random.uniform(-config.jitter, config.jitter)))
+
+            if time.monotonic() < config.down_until or random.random() < config.failure_rate:
+                self._reply(503, {'error': 'injected failure'})
+                return
+            if random.random() < config.drop_rate:
+                self.close_connection = True
+                self.connection.close()
+                return
+            self._reply(200, {'predictions': PREDICTIONS, 'image': {'width': 416, 'height': 416}})
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return StubHandler
+
+
+def start_stub_server(config, host="127.0.0.1", port=0):
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/model"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub inference server with injected latency and failures")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="base response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="uniform +/- latency jitter in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of connections closed without a reply")
+    parser.add_argument("--down-for", type=float, default=0.0, help="answer 503 for the first N seconds")
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency, args.jitter, args.failure_rate, args.drop_rate)
+    config.go_down(args.down_for)
+    server, url = start_stub_server(config, port=args.port)
+    print(f"✅ Stub inference server on {url}. Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"requests={config.requests} connections={config.connections}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+import argparse
+import time
+
+import numpy as np
+
+from detectors import FRAME_RESIZE, EncodedFrame
+from gst_pipeline import bgr_elements, display_size, source_elements
+
+try:
+    import gi
+    gi.require_version("Gst", "1.0")
+    from gi.repository import Gst
+except (ImportError, ValueError):  # PyGObject / GStreamer typelibs not installed
+    Gst = None
+
+# Tees the camera stream into two appsinks so the inference JPEG is produced
+# inside GStreamer instead of by cv2.resize + cv2.imencode in Python:
+#
+#   camera ! tee ─ queue ! [scale/convert] ! BGR appsink "display"
+#                └ queue ! videorate ! videoscale ! jpegenc ! appsink "inference"
+#
+# Both branches are leaky, so neither can back up the camera. The inference
+# branch is rate-limited to inference_fps, so frames nobody will send are not
+# encoded at all. read() returns display frames like cv2.VideoCapture;
+# read_inference() returns the newest ready-to-send JPEG as an EncodedFrame.
+#
+#   python3 tee_capture.py --test --compare     # CPU time vs resize + imencode
+
+LEAKY_QUEUE = "queue leaky=downstream max-size-buffers=1"
+LEAKY_SINK = "drop=true max-buffers=1 sync=false"
+
+
+def tee_pipeline(capture_width=640, capture_height=480, display_width=640, display_height=480,
+                 framerate=30, flip_method=0, device="/dev/video0", source="v4l2", capture_format=None,
+                 inference_size=FRAME_RESIZE, inference_fps=5, jpeg_quality=85, encoder="jpegenc",
+                 inference_branch=True):
+    # encoder can be a hardware element, e.g. "nvjpegenc" on a Jetson.
+    # inference_branch=False leaves only the display appsink (for comparisons).
+    elements, size, capture_format = source_elements(capture_width, capture_height, framerate, flip_method,
+                                                     device, source, capture_format)
+    display = bgr_elements(size, *display_size(display_width, display_height, flip_method), capture_format)
+    if not inference_branch:
+        return " ! ".join(elements + display + [f"appsink name=display {LEAKY_SINK}"])
+    inference = [
+        f"videorate drop-only=true max-rate={inference_fps}",
+        "videoscale",
+        f"video/x-raw, width={inference_size[0]}, height={inference_size[1]}",
+        f"{encoder} quality={jpeg_quality}",
+    ]
+    return (" ! ".join(elements + ["tee name=t"]) + " "
+            + " ! ".join(["t.", LEAKY_QUEUE] + display + [f"appsink name=display {LEAKY_SINK}"]) + " "
+            + " ! ".join(["t.", LEAKY_QUEUE] + inference + [f"appsink name=inference {LEAKY_SINK}"]))
+
+
+class TeeCapture:
+    def __init__(self, timeout=2.0, **options):
+        if Gst is None:
+            raise RuntimeError("TeeCapture needs PyGObject with GStreamer (python3-gi, gir1.2-gstreamer-1.0)")
+        Gst.init(None)
+        self.description = tee_pipeline(**options)
+        self.timeout = timeout
+        self.pipeline = Gst.parse_launch(self.description)
+        self.display = self.pipeline.get_by_name("display")
+        self.inference = self.pipeline.get_by_name("inference")  # None without the branch
+        self.shape = None
+        self.last_jpeg_pts = None
+        self.jpegs = 0
+        self.opened = self.pipeline.set_state(Gst.State.PLAYING) != Gst.StateChangeReturn.FAILURE
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        sample = self.display.emit("try-pull-sample", int(self.timeout * Gst.SECOND))
+        if sample is None:
+            return False, None
+        structure = sample.get_caps().get_structure(0)
+        width, height = structure.get_value("width"), structure.get_value("height")
+        buffer = sample.get_buffer()
+        ok, info = buffer.map(Gst.MapFlags.READ)
+        if not ok:
+            return False, None
+        try:
+            # rows may be padded; copy out before the buffer goes back to the pool
+            stride = info.size // height
+            rows = np.frombuffer(info.data, np.uint8, count=stride * height).reshape(height, stride)
+            frame = rows[:, :width * 3].reshape(height, width, 3).copy()
+        finally:
+            buffer.unmap(info)
+        self.shape = frame.shape
+        return True, frame
+
+    def read_inference(self):
+        # Newest JPEG not handed out before, or None; never blocks
+        sample = self.inference.emit("try-pull-sample", 0)
+        if sample is None:
+            return None
+        buffer = sample.get_buffer()
+        self.last_jpeg_pts = buffer.pts
+        self.jpegs += 1
+        return EncodedFrame(buffer.extract_dup(0, buffer.get_size()), self.shape)
+
+    def release(self):
+        if self.pipeline is not None:
+            self.pipeline.set_state(Gst.State.NULL)
+            self.pipeline = None
+            self.opened = False
+
+
+def compare_cpu(frames=300, inference_fps=5, **options):
+    # Same capture both ways, so only the JPEG path differs: (a) the display
+    # frame is copied, resized and encoded in Python at inference_fps, as the
+    # detector loop does, (b) jpegenc produces it in the tee branch. Process
+    # CPU time includes GStreamer's threads; thread CPU time is what the
+    # detector loop itself spends.
+    import cv2
+
+    def run(native):
+        cap = TeeCapture(inference_fps=inference_fps, inference_branch=native, **options)
+        interval = 1 / inference_fps
+        sent = 0
+        last_sent = 0.0
+        cpu_start, thread_start, wall_start = time.process_time(), time.thread_time(), time.perf_counter()
+        for _ in range(frames):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            now = time.perf_counter()
+            if now - last_sent < interval:
+                continue
+            if native:
+                encoded = cap.read_inference()
+                if encoded is None:
+                    continue
+            else:
+                resized = cv2.resize(frame.copy(), FRAME_RESIZE)
+                _, encoded = cv2.imencode('.jpg', resized)
+            sent += 1
+            last_sent = now
+        wall = time.perf_counter() - wall_start
+        result = {'process_cpu_s': time.process_time() - cpu_start,
+                  'thread_cpu_s': time.thread_time() - thread_start,
+                  'wall_s': wall, 'sent': sent}
+        cap.release()
+        return result
+
+    return {'python': run(False), 'tee': run(True)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Camera capture with a native inference JPEG branch")
+    parser.add_argument("--test", action="store_true", help="use videotestsrc instead of the camera")
+    parser.add_argument("--device", default="/dev/video0")
+    parser.add_argument("--encoder", default="jpegenc", help='JPEG encoder element, e.g. "nvjpegenc"')
+    parser.add_argument("--inference-fps", type=int, default=5)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--compare", action="store_true", help="CPU time against resize + imencode in Python")
+    parser.add_argument("--print", action="store_true", help="only print the pipeline")
+    args = parser.parse_args()
+
+    options = dict(source="test" if args.test else "v4l2", device=args.device)
+    print(tee_pipeline(encoder=args.encoder, inference_fps=args.inference_fps, **options))
+    if args.print:
+        return
+    if Gst is None:
+        print("❌ PyGObject with GStreamer is not installed (python3-gi, gir1.2-gstreamer-1.0)")
+        return
+    if args.compare:
+        results = compare_cpu(args.frames, args.inference_fps, **options)
+        for name, r in results.items():
+            print(f"{name:>6}: {r['process_cpu_s'] / r['wall_s']:.0%} of a core overall, "
+                  f"detector thread {r['thread_cpu_s'] * 1000 / max(r['sent'], 1):.2f} ms CPU per JPEG "
+                  f"({r['sent']} JPEGs in {r['wall_s']:.1f} s)")
+        return
+
+    cap = TeeCapture(encoder=args.encoder, inference_fps=args.inference_fps, **options)
+    jpeg_bytes = 0
+    for _ in range(args.frames):
+        ret, _frame = cap.read()
+        if not ret:
+            print("⚠️ Frame capture failed")
+            break
+        encoded = cap.read_inference()
+        if encoded is not None:
+            jpeg_bytes += len(encoded.jpeg)
+    cap.release()
+    print(f"{args.frames} display frames, {cap.jpegs} inference JPEGs "
+          f"({jpeg_bytes / max(cap.jpegs, 1) / 1024:.1f} KiB average)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+
+# Background uploader for Firebase Realtime Database telemetry. Callers only
+# record the newest value per path with set(); a worker thread sends all
+# changed paths in one multi-path update. Values equal to what the server
+# already has are dropped. When the sink fails, pending values are spooled to
+# SQLite (still one row per path) and resent once the network is back, also
+# after a restart.
+#   DOG_TELEMETRY_URL=http://127.0.0.1:8766   send to fake_rtdb.py over REST instead of firebase_admin
+
+SPOOL_PATH = "telemetry_spool.db"
+MISSING = object()  # a path the server has no value for yet
+
+
+class FirebaseAdminSink:
+    # Multi-path update through firebase_admin. The default app is initialised
+    # here from credential_path and db_url unless the caller already did, so
+    # firebase_admin is only imported when this sink is actually used.
+    def __init__(self, credential_path=None, db_url=None, root="/"):
+        import firebase_admin
+        from firebase_admin import credentials, db
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app(credentials.Certificate(credential_path), {'databaseURL': db_url})
+        self.ref = db.reference(root)
+
+    def update(self, values):
+        self.ref.update(values)
+
+
+class RestSink:
+    # Multi-path PATCH against the Realtime Database REST API (or fake_rtdb.py)
+    def __init__(self, db_url, auth=None, timeout=5.0):
+        self.url = db_url.rstrip("/") + "/.json"
+        self.params = {'auth': auth} if auth else None
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def update(self, values):
+        response = self.session.patch(self.url, params=self.params, data=json.dumps(values), timeout=self.timeout)
+        response.raise_for_status()
+
+
+def make_sink(credential_path=None, db_url=None):
+    # credential_path and db_url are only used (and firebase_admin only
+    # imported) when DOG_TELEMETRY_URL does not select the REST sink
+    url = os.environ.get("DOG_TELEMETRY_URL")
+    return RestSink(url) if url else FirebaseAdminSink(credential_path, db_url)
+
+
+class Spool:
+    def __init__(self, path=SPOOL_PATH):
+        # Only the worker thread touches the connection
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS pending (path TEXT PRIMARY KEY, value TEXT, t REAL)")
+        self.db.commit()
+
+    def put(self, values):
+        now = time.time()
+        self.db.executemany("INSERT OR REPLACE INTO pending (path, value, t) VALUES (?, ?, ?)",
+                            [(path, json.dumps(value), now) for path, value in values.items()])
+        self.db.commit()
+
+    def load(self):
+        return {path: json.loads(value) for path, value in self.db.execute("SELECT path, value FROM pending")}
+
+    def remove(self, paths):
+        self.db.executemany("DELETE FROM pending WHERE path = ?", [(p,) for p in paths])
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+class TelemetryUploader:
+    def __init__(self, sink, spool_path=SPOOL_PATH, flush_interval=0.2,
+                 retry_interval=1.0, max_retry_interval=30.0):
+        self.sink = sink
+        self.spool = Spool(spool_path) if spool_path else None
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.pending = {}
+        self.sent = {}  # path -> last value the server acknowledged
+        self.online = True
+        self.running = True
+        self.busy = False
+        # values waiting for the next successful upload, restored across restarts
+        self.spooled = self.spool.load() if self.spool is not None else {}
+
+        self.updates = 0
+        self.suppressed = 0
+        self.batches = 0
+        self.failures = 0
+
+        self.thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def set(self, path, value):
+        # Never blocks on the network
+        path = path.strip("/")
+        with self.lock:
+            self.updates += 1
+            if path not in self.pending and self._latest(path) == value:
+                self.suppressed += 1
+                return
+            self.pending[path] = value
+        self.wake.set()
+
+    def _latest(self, path):
+        # The value the server will end up with: a spooled value is newer
+        # than what was last acknowledged
+        return self.spooled[path] if path in self.spooled else self.sent.get(path, MISSING)
+
+    def _take(self):
+        with self.lock:
+            batch, self.pending = self.pending, {}
+            self.busy = bool(batch) or bool(self.spooled)
+            return {p: v for p, v in batch.items() if self._latest(p) != v}
+
+    def _spool(self, batch):
+        # Newer values replace spooled ones; a value reverted to what the
+        # server already has needs no upload and leaves the spool
+        with self.lock:
+            reverted = [p for p, v in batch.items() if p in self.spooled and self.sent.get(p, MISSING) == v]
+            changed = {p: v for p, v in batch.items() if p not in reverted}
+            spooled = {p: v for p, v in self.spooled.items() if p not in reverted}
+            spooled.update(changed)
+            self.spooled = spooled
+            self.busy = False
+        if self.spool is not None:
+            if reverted:
+                self.spool.remove(reverted)
+            if changed:
+                self.spool.put(changed)
+
+    def _run(self):
+        delay = self.retry_interval
+        retry_at = 0.0
+        while self.running:
+            if self.online:
+                woken = self.wake.wait(self.retry_interval)
+            else:
+                woken = self.wake.wait(max(0.0, retry_at - time.monotonic()))
+            self.wake.clear()
+            if woken and self.online:
+                time.sleep(self.flush_interval)  # let a burst of set() calls coalesce
+
+            batch = self._take()
+            if not self.online and (time.monotonic() < retry_at or not self.running):
+                # set() woke us while offline: spool, but keep to the back-off
+                self._spool(batch)
+                continue
+            if not batch and not self.spooled:
+                continue
+            values = dict(self.spooled)
+            values.update(batch)
+
+            try:
+                self.sink.update(values)
+            except Exception as e:
+                self.failures += 1
+                if self.online:
+                    print(f"⚠️ Telemetry upload failed, spooling offline: {e}")
+                    self.online = False
+                else:
+                    delay = min(delay * 2, self.max_retry_interval)
+                retry_at = time.monotonic() + delay
+                self._spool(batch)
+                continue
+
+            if not self.online:
+                print(f"✅ Telemetry back online, sent {len(values)} queued path(s).")
+                self.online = True
+                delay = self.retry_interval
+            self.batches += 1
+            with self.lock:
+                self.sent.update(values)
+                spooled, self.spooled = self.spooled, {}
+                self.busy = False
+            if self.spool is not None and spooled:
+                self.spool.remove(spooled)
+
+    def flush(self, timeout=5.0):
+        # Wait until everything set() so far has been sent; False on timeout
+        # (e.g. while offline, where values stay spooled)
+        end = time.monotonic() + timeout
+        self.wake.set()
+        while time.monotonic() < end:
+            with self.lock:
+                idle = not self.pending and not self.busy and not self.spooled
+            if idle:
+                return True
+            time.sleep(0.02)
+        return False
+
+    def stats(self):
+        return {
+            'updates': self.updates,
+            'suppressed': self.suppressed,
+            'batches': self.batches,
+            'failures': self.failures,
+            'online': self.online,
+            'spooled': len(self.spooled),
+        }
+
+    def close(self, timeout=2.0):
+        self.flush(timeout)
+        self.running = False
+        self.wake.set()
+        self.thread.join(timeout=max(timeout, self.flush_interval + 0.5))
+        if self.spool is not None and not self.thread.is_alive():
+            self.spool.close()
@@ -1,25 +1,16 @@
 #!/usr/bin/env python3
 import cv2
+from camera_broker import BrokerCapture, broker_running
+from capture import make_capture
 
-def gstreamer_pipeline(
-    capture_width=640,
-    capture_height=480,
-    display_width=640,
-    display_height=480,
-    framerate=30,
-    flip_method=0
-):
-    return (
-        f"v4l2src device=/dev/video0 ! "
-        f"video/x-raw, width={capture_width}, height={capture_height}, framerate={framerate}/1 ! "
-        f"videoconvert ! "
-        f"videoscale ! "
-        f"video/x-raw, width={display_width}, height={display_height} ! "
-        f"appsink"
-    )
+# Watches the camera_broker.py feed when one is running (e.g. alongside the
+# detector); otherwise opens the camera directly
 
 def main():
-    cap = cv2.VideoCapture(gstreamer_pipeline(), cv2.CAP_GSTREAMER)
+    if broker_running():
+        cap = BrokerCapture()
+    else:
+        cap = make_capture()
     if not cap.isOpened():
         print("❌ Could not open USB camera")
         return
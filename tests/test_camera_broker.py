@@ -0,0 +1,111 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from camera_broker import H_READ_NS, BrokerCapture, FrameRing, broker_running
+
+
+@pytest.fixture
+def ring():
+    ring = FrameRing(f"dog-test-{os.getpid()}", (4, 6, 3), slots=3, create=True)
+    yield ring
+    ring.close()
+
+
+def frame(value):
+    return np.full((4, 6, 3), value, np.uint8)
+
+
+def test_latest_returns_newest_complete_frame(ring):
+    reader = FrameRing(ring.name)
+    assert reader.latest() is None
+    ring.write(frame(1), timestamp=10.0)
+    ring.write(frame(2), timestamp=11.0)
+    latest = reader.latest()
+    assert latest.index == 1
+    assert latest.timestamp == 11.0
+    assert (latest.image == 2).all()
+    assert not latest.image.flags.writeable
+    reader.close()
+
+
+def test_frame_in_progress_is_skipped(ring):
+    ring.write(frame(1))
+    count, view = ring.begin_write()
+    view[...] = 9
+    latest = ring.latest()
+    assert latest.index == 0 and (latest.image == 1).all()
+    ring.end_write(count)
+    assert ring.latest().index == 1
+
+
+def test_view_is_invalidated_when_slot_is_reused(ring):
+    ring.write(frame(1))
+    first = ring.latest()
+    assert first.valid()
+    for value in range(2, 2 + ring.slots):
+        ring.write(frame(value))
+    assert not first.valid()
+    assert first.copy() is None
+
+
+def test_copy_detects_a_torn_slot(ring):
+    ring.write(frame(1))
+    latest = ring.latest()
+    ring.write(frame(2))
+    ring.write(frame(3))
+    ring.begin_write()  # the broker starts overwriting the slot of `latest`
+    assert latest.copy() is None
+
+
+def test_copy_into_buffer(ring):
+    ring.write(frame(5))
+    out = np.zeros((4, 6, 3), np.uint8)
+    copied = ring.latest().copy(out)
+    assert copied is out and (out == 5).all()
+
+
+def test_broker_capture_reads_owned_frames_in_order(ring):
+    ring.write(frame(1), timestamp=20.0)
+    cap = BrokerCapture(ring.name, timeout=0.1)
+    assert cap.isOpened()
+    ret, image = cap.read()
+    assert ret and (image == 1).all() and image.flags.writeable
+    assert cap.timestamp == 20.0
+    assert cap.read() == (False, None)  # nothing new yet
+
+    ring.write(frame(2))
+    ring.write(frame(3))
+    buffer = np.zeros((4, 6, 3), np.uint8)
+    ret, image = cap.read(buffer)
+    assert ret and image is buffer and (buffer == 3).all()
+    assert cap.dropped == 1
+    cap.release()
+
+
+def test_readers_reset_the_idle_clock(ring):
+    ring.header[H_READ_NS] = time.time_ns() - 5_000_000_000
+    assert ring.idle_for() > 4.9
+    cap = BrokerCapture(ring.name)
+    assert ring.idle_for() < 1.0
+    cap.release()
+
+
+def test_broker_running_needs_recent_frames(ring):
+    assert not broker_running(ring.name)
+    ring.write(frame(1))
+    assert broker_running(ring.name)
+    assert not broker_running("dog-test-missing")
+
+
+def test_capture_timestamp_reaches_consumers(ring):
+    # The broker passes the backend's capture time through end_write()
+    count, view = ring.begin_write()
+    view[...] = 1
+    ring.end_write(count, 1234.5)
+    cap = BrokerCapture(ring.name, timeout=0.1)
+    assert cap.read()[0]
+    assert cap.timestamp == 1234.5 and cap.last.timestamp == 1234.5
+    cap.release()
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from detection_events import DetectionSubscriber, detection_state
+
+
+def event(frame_id, state="dog_without_collar", session=1.0):
+    return {'type': 'detection', 'session': session, 'frame_id': frame_id, 't': 0.0, 'state': state}
+
+
+def subscriber(tmp_path):
+    return DetectionSubscriber(path=str(tmp_path / "missing.sock"))
+
+
+def test_detection_state_prefers_collarless_dog():
+    assert detection_state([{'class': "dog_with_collar"}, {'class': "dog_without_collar"}]) == "dog_without_collar"
+    assert detection_state([{'class': "dog_with_collar"}]) == "dog_with_collar"
+    assert detection_state([]) == "none"
+
+
+def test_event_between_waits_is_not_lost(tmp_path):
+    sub = subscriber(tmp_path)
+    try:
+        assert not sub.wait(0.01)
+        sub._on_message(event(1))  # arrives while nobody is waiting
+        assert sub.wait(0.01)
+        assert not sub.wait(0.01)
+    finally:
+        sub.close()
+
+
+def test_wait_wakes_on_event_from_another_thread(tmp_path):
+    sub = subscriber(tmp_path)
+    try:
+        threading.Timer(0.05, sub._on_message, (event(1),)).start()
+        assert sub.wait(2.0)
+        assert sub.state == "dog_without_collar"
+    finally:
+        sub.close()
+
+
+def test_replays_are_dropped_but_restarts_are_not(tmp_path):
+    received = []
+    sub = DetectionSubscriber(received.append, path=str(tmp_path / "missing.sock"))
+    try:
+        sub._on_message(event(1))
+        sub._on_message(event(1))  # replay to a reconnecting subscriber
+        sub._on_message(event(1, session=2.0))  # detector restarted, ids start over
+        assert [e['session'] for e in received] == [1.0, 2.0]
+    finally:
+        sub.close()
+
+
+def test_last_dog_latches(tmp_path):
+    sub = subscriber(tmp_path)
+    try:
+        sub._on_message(event(1, "dog_with_collar"))
+        sub._on_message(event(2, "none"))
+        assert sub.state == "none" and sub.last_dog == "dog_with_collar"
+    finally:
+        sub.close()
+
+
+def test_current_state_expires(tmp_path, monkeypatch):
+    sub = subscriber(tmp_path)
+    try:
+        monkeypatch.setattr(sub.subscriber, 'connected', True)
+        message = dict(event(1), t=time.time())
+        sub._on_message(message)
+        assert sub.current_state(5.0) == "dog_without_collar"
+        message['t'] -= 10
+        assert sub.current_state(5.0) is None
+        message['t'] += 10
+        monkeypatch.setattr(sub.subscriber, 'connected', False)  # detector gone
+        assert sub.current_state(5.0) is None
+    finally:
+        sub.close()
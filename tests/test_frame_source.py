@@ -0,0 +1,102 @@
+import cv2
+import numpy as np
+import pytest
+
+from frame_source import CameraSource, ImageDirectorySource, SyntheticSource, open_frame_source
+
+
+def read_all(source, limit=50):
+    frames = []
+    for _ in range(limit):
+        ret, frame = source.read()
+        if not ret:
+            break
+        frames.append(frame)
+    return frames
+
+
+def test_synthetic_source_ends_without_loop():
+    source = open_frame_source("synthetic", pacing="fast", loop=False, length=3)
+    assert len(read_all(source)) == 3
+    assert source.exhausted and not source.isOpened()
+
+
+def test_synthetic_source_loops_and_repeats():
+    source = open_frame_source("synthetic", pacing="fast", loop=True, length=3, size=(64, 48))
+    frames = read_all(source, 6)
+    assert len(frames) == 6 and not source.exhausted
+    assert np.array_equal(frames[0], frames[3])
+
+
+def test_synthetic_source_is_deterministic():
+    a = read_all(SyntheticSource(size=(64, 48), pacing="fast", length=5, seed=3))
+    b = read_all(SyntheticSource(size=(64, 48), pacing="fast", length=5, seed=3))
+    assert all(np.array_equal(x, y) for x, y in zip(a, b))
+
+
+def test_synthetic_boxes_follow_the_dogs():
+    source = SyntheticSource(size=(320, 240), dogs=3, pacing="fast", length=1)
+    ret, _ = source.read()
+    assert ret and len(source.boxes) == 3
+    for x1, y1, x2, y2, _collar in source.boxes:
+        assert x1 < x2 and y1 < y2
+
+
+def test_frames_are_owned_by_the_caller():
+    source = SyntheticSource(size=(64, 48), pacing="fast", length=2)
+    _, first = source.read()
+    first[...] = 0
+    _, second = source.read()
+    assert second.any()
+
+
+def test_image_directory_source(tmp_path):
+    for i in range(3):
+        cv2.imwrite(str(tmp_path / f"{i}.png"), np.full((8, 8, 3), i * 50, np.uint8))
+    (tmp_path / "notes.txt").write_text("not an image")
+    source = open_frame_source(str(tmp_path), pacing="fast")
+    assert isinstance(source, ImageDirectorySource)
+    frames = read_all(source)
+    assert [int(f[0, 0, 0]) for f in frames] == [0, 50, 100]
+    frames[0][...] = 255  # drawing on a frame must not touch the cache
+    source.loop, source.exhausted = True, False
+    _, again = source.read()
+    assert int(again[0, 0, 0]) == 0
+
+
+def test_realtime_pacing_uses_due_timestamps():
+    source = SyntheticSource(size=(32, 24), fps=100.0, length=3)
+    read_all(source)
+    assert source.stats()['frames'] == 3
+    assert source.timestamp == pytest.approx(source.started + 2 / 100.0)
+
+
+def test_unknown_source_is_rejected():
+    with pytest.raises(ValueError):
+        open_frame_source("no-such-file.mp4")
+    with pytest.raises(ValueError):
+        SyntheticSource(pacing="slow")
+
+
+class ViewCapture:
+    # Hands out views of one internal buffer, like the V4L2 BGR3 backend
+    def __init__(self):
+        self.buffer = np.zeros(48 * 64 * 3, np.uint8)
+        self.timestamp = None
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        self.buffer += 1
+        return True, self.buffer.reshape(48, 64, 3)
+
+    def release(self):
+        pass
+
+
+def test_camera_source_copies_backend_views():
+    source = CameraSource(ViewCapture())
+    _, first = source.read()
+    _, second = source.read()
+    assert first.flags.owndata and int(first[0, 0, 0]) == 1 and int(second[0, 0, 0]) == 2
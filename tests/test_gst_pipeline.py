@@ -0,0 +1,44 @@
+import pytest
+
+from gst_pipeline import display_size, gstreamer_pipeline, pipeline_elements
+from tee_capture import tee_pipeline
+
+
+def test_no_scale_or_convert_when_not_needed():
+    elements = pipeline_elements(source="test")
+    assert not any(e.startswith(("videoscale", "videoconvert")) for e in elements)
+    assert elements[-1].startswith("appsink drop=true")
+
+
+def test_scale_only_when_sizes_differ():
+    pipeline = gstreamer_pipeline(capture_width=1280, capture_height=720, display_width=640, display_height=360)
+    assert "videoscale ! video/x-raw, width=640, height=360" in pipeline
+    assert "videoconvert ! video/x-raw, format=BGR" in pipeline
+
+
+@pytest.mark.parametrize("flip", [1, 3, 5, 7])
+def test_rotation_swaps_the_display_size(flip):
+    assert display_size(640, 480, flip) == (480, 640)
+    # rotated 640x480 at the same display size: no scaling (and no distortion)
+    assert "videoscale" not in gstreamer_pipeline(flip_method=flip)
+    pipeline = gstreamer_pipeline(capture_width=1280, capture_height=720, display_width=640,
+                                  display_height=360, flip_method=flip)
+    assert "video/x-raw, width=360, height=640" in pipeline
+
+
+@pytest.mark.parametrize("flip", [0, 2, 4, 6])
+def test_other_flips_keep_the_display_size(flip):
+    assert display_size(640, 480, flip) == (640, 480)
+
+
+def test_tee_display_branch_follows_rotation():
+    pipeline = tee_pipeline(capture_width=1280, capture_height=720, display_width=640, display_height=360,
+                            flip_method=1)
+    assert "video/x-raw, width=360, height=640" in pipeline
+
+
+def test_invalid_options_are_rejected():
+    with pytest.raises(ValueError):
+        gstreamer_pipeline(flip_method=8)
+    with pytest.raises(ValueError):
+        gstreamer_pipeline(source="rtsp")
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from inference_client import CircuitBreaker, CircuitOpenError, DeadlineExceeded, InferenceClient
+from inference_dispatcher import InferenceDispatcher
+
+
+def run(dispatcher, frames):
+    ids = [dispatcher.submit(frame) for frame in frames]
+    dispatcher.shutdown(wait=True)
+    return ids
+
+
+def test_results_are_applied_in_frame_order():
+    delays = {1: 0.1, 2: 0.0}
+    applied = []
+    dispatcher = InferenceDispatcher(lambda frame: time.sleep(delays[frame]) or frame,
+                                     lambda frame_id, frame, result: applied.append(frame_id), max_in_flight=2)
+    assert run(dispatcher, [1, 2]) == [1, 2]
+    assert applied == [2]  # frame 1 answered last and is stale
+    assert dispatcher.stats()['dropped_stale'] == 1
+
+
+def test_submit_refuses_beyond_max_in_flight():
+    release = threading.Event()
+    dispatcher = InferenceDispatcher(lambda frame: release.wait(2.0), lambda *_: None, max_in_flight=1)
+    assert dispatcher.submit(1) == 1
+    assert dispatcher.submit(2) is None
+    release.set()
+    dispatcher.shutdown(wait=True)
+
+
+def test_open_circuit_calls_are_not_latency_samples():
+    latencies = []
+
+    def infer(frame):
+        if frame == "open":
+            raise CircuitOpenError("circuit open")
+        if frame == "fail":
+            raise ConnectionError("timed out")
+        return []
+
+    dispatcher = InferenceDispatcher(infer, lambda *_: None, max_in_flight=1, on_latency=latencies.append,
+                                     unmeasured=(CircuitOpenError,))
+    for frame in ("ok", "open", "fail"):
+        dispatcher.submit(frame)
+        while dispatcher.in_flight:
+            time.sleep(0.001)
+    dispatcher.shutdown(wait=True)
+    assert len(latencies) == 2
+    assert dispatcher.stats()['failed'] == 2
+
+
+class FailingClient(InferenceClient):
+    def __init__(self, **kwargs):
+        super().__init__("http://127.0.0.1:9/", backoff_base=0.0, **kwargs)
+        self.posts = 0
+
+    def _post_once(self, img_bytes, timeout):
+        self.posts += 1
+        raise ConnectionError("refused")
+
+
+def test_circuit_opens_and_fails_fast():
+    client = FailingClient(max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60.0))
+    for _ in range(2):
+        with pytest.raises(DeadlineExceeded):
+            client.post_image(b"jpeg")
+    with pytest.raises(CircuitOpenError):
+        client.post_image(b"jpeg")
+    assert client.posts == 2
+
+
+def test_circuit_opened_mid_call_is_a_deadline_not_a_skip():
+    # The call did reach the server, so it must not look like an unsent one
+    client = FailingClient(max_retries=3, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60.0))
+    with pytest.raises(DeadlineExceeded):
+        client.post_image(b"jpeg")
+    assert client.posts == 1
+
+
+def test_half_open_probe_closes_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN and not breaker.allow()
+    time.sleep(0.02)
+    assert breaker.allow()  # the single probe
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == breaker.CLOSED
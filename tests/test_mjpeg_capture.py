@@ -0,0 +1,57 @@
+import cv2
+import numpy as np
+import pytest
+
+from mjpeg_capture import MAX_CORRUPT, MjpegCapture, jpeg_size
+
+
+def encode(width=64, height=48):
+    return cv2.imencode('.jpg', np.full((height, width, 3), 128, np.uint8))[1]
+
+
+class FakeCamera:
+    def __init__(self, buffers):
+        self.buffers = list(buffers)
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if not self.buffers:
+            return False, None
+        return True, self.buffers.pop(0)
+
+    def release(self):
+        pass
+
+
+def test_jpeg_size_reads_the_header():
+    assert jpeg_size(encode(64, 48).tobytes()) == (64, 48)
+    with pytest.raises(ValueError):
+        jpeg_size(b"\xff\xd8garbage-without-markers")
+
+
+def test_read_hands_the_camera_jpeg_to_inference():
+    jpeg = encode(64, 48)
+    cap = MjpegCapture(cap=FakeCamera([jpeg]), display_reduce=2)
+    ret, frame = cap.read()
+    assert ret and frame.shape == (24, 32, 3)
+    encoded = cap.read_inference()
+    assert encoded.jpeg == jpeg.tobytes() and encoded.size == (64, 48) and encoded.shape == (24, 32, 3)
+    assert cap.read_inference() is None  # only once per frame
+
+
+def test_corrupt_frames_are_skipped():
+    garbage = np.frombuffer(b"\xff\xd8\x00\x01garbage-garbage", np.uint8)
+    truncated = encode()[:40]
+    cap = MjpegCapture(cap=FakeCamera([garbage, truncated, encode()]))
+    ret, frame = cap.read()
+    assert ret and frame.shape == (48, 64, 3)
+    assert cap.corrupt == 2
+
+
+def test_read_gives_up_on_a_broken_stream():
+    garbage = np.frombuffer(b"\xff\xd8\x00\x01garbage-garbage", np.uint8)
+    cap = MjpegCapture(cap=FakeCamera([garbage] * (MAX_CORRUPT + 2)))
+    assert cap.read() == (False, None)
+    assert cap.read_inference() is None
@@ -0,0 +1,119 @@
+import time
+
+import pytest
+
+from telemetry_uploader import Spool, TelemetryUploader
+
+
+class FlakySink:
+    def __init__(self):
+        self.online = True
+        self.server = {}
+        self.calls = []
+
+    def update(self, values):
+        self.calls.append(dict(values))
+        if not self.online:
+            raise ConnectionError("offline")
+        self.server.update(values)
+
+
+def wait_for(condition, timeout=3.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def sink():
+    return FlakySink()
+
+
+@pytest.fixture
+def uploader(sink, tmp_path):
+    uploader = TelemetryUploader(sink, spool_path=str(tmp_path / "spool.db"), flush_interval=0.01,
+                                 retry_interval=0.05, max_retry_interval=0.2)
+    yield uploader
+    uploader.close(timeout=0.5)
+
+
+def test_unchanged_values_are_suppressed(uploader, sink):
+    uploader.set("player", False)
+    assert uploader.flush(2.0)
+    uploader.set("/player/", False)
+    assert uploader.flush(2.0)
+    assert sink.server == {'player': False}
+    assert len(sink.calls) == 1
+    assert uploader.stats()['suppressed'] == 1
+
+
+def test_latest_value_wins_per_path(uploader, sink):
+    for distance in range(10):
+        uploader.set("distance", distance)
+    assert uploader.flush(2.0)
+    assert sink.server == {'distance': 9}
+
+
+def test_offline_values_are_sent_after_reconnect(uploader, sink):
+    sink.online = False
+    uploader.set("distance", 120)
+    assert wait_for(lambda: uploader.stats()['spooled'] == 1)
+    assert not uploader.stats()['online']
+    sink.online = True
+    assert uploader.flush(2.0)
+    assert sink.server == {'distance': 120}
+
+
+def test_revert_while_offline_does_not_upload_stale_value(uploader, sink):
+    uploader.set("player", False)
+    assert uploader.flush(2.0)
+    sink.online = False
+    uploader.set("player", True)
+    assert wait_for(lambda: uploader.stats()['spooled'] == 1)
+    uploader.set("player", False)  # back to what the server has
+    assert wait_for(lambda: uploader.stats()['spooled'] == 0)
+    sink.online = True
+    uploader.set("distance", 50)
+    assert uploader.flush(2.0)
+    assert sink.server == {'player': False, 'distance': 50}
+
+
+def test_newer_offline_value_replaces_spooled_one(uploader, sink):
+    sink.online = False
+    uploader.set("player", True)
+    assert wait_for(lambda: uploader.stats()['spooled'] == 1)
+    uploader.set("player", False)
+    assert wait_for(lambda: uploader.spooled.get("player") is False)
+    sink.online = True
+    assert uploader.flush(2.0)
+    assert sink.server == {'player': False}
+
+
+def test_backoff_is_kept_while_set_is_called(uploader, sink):
+    sink.online = False
+    end = time.monotonic() + 0.6
+    while time.monotonic() < end:
+        uploader.set("distance", time.monotonic())
+        time.sleep(0.005)
+    # 0.05, 0.1, 0.2, 0.2 ... s apart: a handful of attempts, not one per set()
+    assert len(sink.calls) <= 7
+
+
+def test_spool_survives_restart(sink, tmp_path):
+    path = str(tmp_path / "spool.db")
+    sink.online = False
+    first = TelemetryUploader(sink, spool_path=path, flush_interval=0.01, retry_interval=0.05)
+    first.set("distance", 80)
+    assert wait_for(lambda: first.stats()['spooled'] == 1)
+    first.close(timeout=0.2)
+    assert Spool(path).load() == {'distance': 80}
+
+    sink.online = True
+    second = TelemetryUploader(sink, spool_path=path, flush_interval=0.01, retry_interval=0.05)
+    assert second.flush(2.0)
+    second.close()
+    assert sink.server == {'distance': 80}
+    assert Spool(path).load() == {}
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from audio_engine import Sound
+
+# Deterrent sounds synthesized with NumPy instead of one WAV file per frequency.
+# Every buffer is built to loop gaplessly (whole sine cycles, whole pulse/chirp
+# periods) and rendered Sounds are kept in an LRU cache keyed by their
+# parameters, so replaying a frequency costs nothing:
+#   engine.play(render("sine", 40000))
+#   engine.play(render("pulse", 25000, pulse_ms=30, period_ms=120))
+
+STANDARD_RATES = (48000, 96000, 192000)
+CACHE_SIZE = 64
+KINDS = ("sine", "sweep", "chirp", "pulse")
+
+
+def rate_for(frequency):
+    # Lowest standard rate that keeps the tone comfortably below Nyquist
+    for rate in STANDARD_RATES:
+        if frequency < 0.45 * rate:
+            return rate
+    return STANDARD_RATES[-1]
+
+
+def check_frequency(frequency, rate):
+    if frequency <= 0:
+        raise ValueError(f"frequency must be positive, got {frequency}")
+    if frequency >= rate / 2:
+        raise ValueError(f"{frequency:.0f} Hz is above the Nyquist limit for {rate} Hz sampling ({rate / 2:.0f} Hz)")
+
+
+def parse_frequency(text):
+    # "40khz", "40k", "12000", "12000hz", "12.5 kHz" -> Hz
+    match = re.fullmatch(r"\s*([\d.]+)\s*(k?)(?:hz)?\s*(?:\.wav)?\s*", str(text).lower())
+    if match is None:
+        raise ValueError(f"not a frequency: {text!r}")
+    value = float(match.group(1))
+    return value * 1000 if match.group(2) else value
+
+
+def fade(samples, rate, ms=2.0):
+    # Raised-cosine ramps at both ends, for one-shot playback without clicks
+    n = min(int(rate * ms / 1000), len(samples) // 2)
+    if n > 0:
+        ramp = 0.5 - 0.5 * np.cos(np.linspace(0, np.pi, n))
+        samples = samples.copy()
+        samples[:n] *= ramp
+        samples[-n:] *= ramp[::-1]
+    return samples
+
+
+def sine(frequency, duration=1.0, rate=48000, amplitude=0.8):
+    # Whole number of cycles so the buffer loops without a discontinuity; the
+    # frequency is nudged by at most half a cycle per buffer to make that fit
+    check_frequency(frequency, rate)
+    cycles = max(1, round(frequency * duration))
+    n = max(1, round(cycles * rate / frequency))
+    t = np.arange(n) / n
+    return (amplitude * np.sin(2 * np.pi * cycles * t)).astype(np.float32)
+
+
+def sweep(start, end, duration=1.0, rate=48000, amplitude=0.8, method="linear"):
+    # Continuous frequency sweep from start to end Hz
+    check_frequency(max(start, end), rate)
+    check_frequency(min(start, end), rate)
+    n = max(1, int(rate * duration))
+    t = np.arange(n) / rate
+    if method == "linear":
+        phase = 2 * np.pi * (start * t + (end - start) * t ** 2 / (2 * duration))
+    elif method == "exponential":
+        k = (end / start) ** (1 / duration)
+        phase = 2 * np.pi * start * (k ** t - 1) / np.log(k) if k != 1 else 2 * np.pi * start * t
+    else:
+        raise ValueError(f"unknown sweep method {method!r}")
+    return (amplitude * np.sin(phase)).astype(np.float32)
+
+
+def _repeat(burst, rate, period_ms, duration):
+    period = max(len(burst), int(rate * period_ms / 1000))
+    one = np.zeros(period, dtype=np.float32)
+    one[:len(burst)] = burst
+    return np.tile(one, max(1, round(duration * rate / period)))
+
+
+def chirp(start, end, chirp_ms=20.0, period_ms=100.0, duration=1.0, rate=48000, amplitude=0.8):
+    # Short up/down sweeps repeated every period_ms
+    burst = fade(sweep(start, end, chirp_ms / 1000, rate, amplitude), rate, ms=1.0)
+    return _repeat(burst, rate, period_ms, duration)
+
+
+def pulse_train(frequency, pulse_ms=50.0, period_ms=200.0, duration=1.0, rate=48000, amplitude=0.8):
+    # Tone bursts of pulse_ms every period_ms
+    check_frequency(frequency, rate)
+    t = np.arange(int(rate * pulse_ms / 1000)) / rate
+    burst = fade((amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32), rate, ms=1.0)
+    return _repeat(burst, rate, period_ms, duration)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def render(kind="sine", frequency=40000.0, end_frequency=None, duration=1.0, pulse_ms=50.0,
+           period_ms=200.0, rate=None, amplitude=0.8):
+    # Cached Sound for the given parameters. For sweep/chirp, end_frequency
+    # defaults to 25% above frequency (kept below Nyquist).
+    frequency = float(frequency)
+    if kind in ("sweep", "chirp") and end_frequency is None:
+        end_frequency = frequency * 1.25
+        rate = rate or rate_for(end_frequency)
+        end_frequency = min(end_frequency, 0.45 * rate)
+    rate = rate or rate_for(max(frequency, end_frequency or 0.0))
+
+    if kind == "sine":
+        samples = sine(frequency, duration, rate, amplitude)
+    elif kind == "sweep":
+        # up and back down so the loop point is continuous in frequency
+        up = sweep(frequency, end_frequency, duration / 2, rate, amplitude)
+        down = sweep(end_frequency, frequency, duration / 2, rate, amplitude)
+        samples = fade(np.concatenate((up, down)), rate)
+    elif kind == "chirp":
+        samples = chirp(frequency, end_frequency, pulse_ms, period_ms, duration, rate, amplitude)
+    elif kind == "pulse":
+        samples = pulse_train(frequency, pulse_ms, period_ms, duration, rate, amplitude)
+    else:
+        raise ValueError(f"unknown tone kind {kind!r}, expected one of {', '.join(KINDS)}")
+    return Sound.from_samples(f"{kind}-{frequency:.0f}hz", samples, rate)
+
+
+def tone(frequency, kind="sine", **kwargs):
+    # frequency may be a number or a name like "40khz"
+    if isinstance(frequency, str):
+        frequency = parse_frequency(frequency)
+    return render(kind, float(frequency), **kwargs)
+
+
+def cache_info():
+    return render.cache_info()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+import itertools
+import threading
+import time
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+
+def to_xyxy(boxes):
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    half = boxes[:, 2:4] / 2
+    return np.hstack((boxes[:, 0:2] - half, boxes[:, 0:2] + half))
+
+
+def iou_matrix(boxes_a, boxes_b):
+    # boxes in (cx, cy, w, h); returns a len(a) x len(b) IoU matrix
+    a = to_xyxy(boxes_a)[:, None, :]
+    b = to_xyxy(boxes_b)[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def associate(iou, iou_threshold):
+    # Hungarian assignment when scipy is available, otherwise greedy by IoU
+    if iou.size == 0:
+        return []
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(-iou)
+        pairs = zip(rows, cols)
+    else:
+        order = np.dstack(np.unravel_index(np.argsort(-iou, axis=None), iou.shape))[0]
+        used_rows, used_cols, pairs = set(), set(), []
+        for r, c in order:
+            if r in used_rows or c in used_cols:
+                continue
+            used_rows.add(r)
+            used_cols.add(c)
+            pairs.append((r, c))
+    return [(int(r), int(c)) for r, c in pairs if iou[r, c] >= iou_threshold]
+
+
+class KalmanBoxFilter:
+    # Constant-velocity Kalman filter over (cx, cy, w, h) with a variable time step.
+
+    def __init__(self, box, process_noise=50.0, measurement_noise=4.0):
+        self.x = np.zeros(8)
+        self.x[:4] = box
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1000.0, 1000.0, 100.0, 100.0])
+        self.H = np.hstack((np.eye(4), np.zeros((4, 4))))
+        self.R = np.eye(4) * measurement_noise
+        self.q = process_noise
+
+    def predict(self, dt):
+        if dt <= 0:
+            return
+        F = np.eye(8)
+        F[:4, 4:] = np.eye(4) * dt
+        G = np.vstack((np.eye(4) * (dt * dt / 2), np.eye(4) * dt))
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + G @ G.T * self.q
+
+    def update(self, box):
+        y = np.asarray(box, dtype=np.float64) - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(8) - K @ self.H) @ self.P
+
+    def extrapolate(self, dt):
+        box = self.x[:4] + self.x[4:] * max(dt, 0.0)
+        box[2:] = np.maximum(box[2:], 1.0)
+        return box
+
+
+class Track:
+    def __init__(self, track_id, det, now):
+        self.track_id = track_id
+        self.kf = KalmanBoxFilter([det['x'], det['y'], det['width'], det['height']])
+        self.class_name = det['class']
+        self.confidence = det['confidence']
+        self.created = now
+        self.last_update = now
+        self.hits = 1
+        self.misses = 0
+
+    def update(self, det, now):
+        self.kf.predict(now - self.last_update)
+        self.kf.update([det['x'], det['y'], det['width'], det['height']])
+        self.class_name = det['class']
+        self.confidence = det['confidence']
+        self.last_update = now
+        self.hits += 1
+        self.misses = 0
+
+
+class Tracker:
+    # Multi-object tracker over detector predictions (Roboflow dict format).
+    # update() is called with each inference result; tracks_at() returns the
+    # tracks extrapolated to the current time for drawing at the display rate.
+    # A track missing from the latest result is hidden but keeps its id; it is
+    # evicted after max_misses missed results or ttl seconds without a match.
+
+    def __init__(self, iou_threshold=0.2, ttl=3.0, max_misses=2, max_extrapolate=1.0):
+        self.iou_threshold = iou_threshold
+        self.ttl = ttl
+        self.max_misses = max_misses
+        self.max_extrapolate = max_extrapolate
+        self.tracks = []
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def update(self, detections, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            predicted = [t.kf.extrapolate(now - t.last_update) for t in self.tracks]
+            measured = [[d['x'], d['y'], d['width'], d['height']] for d in detections]
+            matches = []
+            if predicted and measured:
+                matches = associate(iou_matrix(predicted, measured), self.iou_threshold)
+
+            matched_tracks, matched_dets = set(), set()
+            for track_index, det_index in matches:
+                self.tracks[track_index].update(detections[det_index], now)
+                matched_tracks.add(track_index)
+                matched_dets.add(det_index)
+            for i, track in enumerate(self.tracks):
+                if i not in matched_tracks:
+                    track.misses += 1
+            for i, det in enumerate(detections):
+                if i not in matched_dets:
+                    self.tracks.append(Track(next(self.ids), det, now))
+
+            self.tracks = [t for t in self.tracks
+                           if t.misses <= self.max_misses and now - t.last_update <= self.ttl]
+
+    def reset(self):
+        # Forget all tracks (e.g. on pause); ids keep counting up
+        with self.lock:
+            self.tracks = []
+
+    def tracks_at(self, now=None, extrapolate=True):
+        now = time.time() if now is None else now
+        with self.lock:
+            result = []
+            for t in self.tracks:
+                if t.misses > 0 or now - t.last_update > self.ttl:
+                    continue
+                dt = min(now - t.last_update, self.max_extrapolate) if extrapolate else 0.0
+                cx, cy, w, h = t.kf.extrapolate(dt)
+                result.append({
+                    'x': float(cx),
+                    'y': float(cy),
+                    'width': float(w),
+                    'height': float(h),
+                    'confidence': t.confidence,
+                    'class': t.class_name,
+                    'track_id': t.track_id,
+                    'age': now - t.last_update,
+                })
+            return result
+
+    def __len__(self):
+        with self.lock:
+            return len(self.tracks)
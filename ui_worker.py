@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Keeps blocking work (sockets, process start-up, sensor and network calls)
+# off the Tk main loop. Jobs run on a background thread; their results are
+# put on a queue that the Tk thread drains with after(), so every callback
+# touching widgets runs on the Tk thread. The drain tick doubles as a
+# latency probe: how late it fires is how long the main loop was blocked.
+
+
+class UiWorker:
+    def __init__(self, master, poll_ms=20, stall_ms=100):
+        self.master = master
+        self.poll_ms = poll_ms
+        self.stall_ms = stall_ms
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.running = True
+        self.lags = deque(maxlen=1000)  # ms the drain tick fired late
+        self.stalls = 0
+        self.busy_since = None
+
+        self.thread = threading.Thread(target=self._work, name="ui-worker", daemon=True)
+        self.thread.start()
+        self.expected = time.perf_counter() + poll_ms / 1000
+        self.job = master.after(poll_ms, self._drain)
+
+    def submit(self, fn, *args, on_done=None, on_error=None, **kwargs):
+        # on_done(result) / on_error(exception) are called on the Tk thread
+        self.jobs.put((fn, args, kwargs, on_done, on_error))
+
+    def post(self, callback, *args):
+        # Safe from any thread: run callback(*args) on the Tk thread
+        self.results.put((callback, args))
+
+    def _work(self):
+        while self.running:
+            item = self.jobs.get()
+            if item is None:
+                break
+            fn, args, kwargs, on_done, on_error = item
+            self.busy_since = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if on_error is not None:
+                    self.post(on_error, e)
+                else:
+                    print(f"Background job {getattr(fn, '__name__', fn)} failed: {e}")
+            else:
+                if on_done is not None:
+                    self.post(on_done, result)
+            finally:
+                self.busy_since = None
+
+    def _drain(self):
+        now = time.perf_counter()
+        lag = (now - self.expected) * 1000
+        self.lags.append(max(lag, 0.0))
+        if lag > self.stall_ms:
+            self.stalls += 1
+            print(f"⚠️ UI thread was blocked for {lag:.0f} ms")
+
+        while True:
+            try:
+                callback, args = self.results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"UI callback {getattr(callback, '__name__', callback)} failed: {e}")
+
+        if self.running:
+            self.expected = time.perf_counter() + self.poll_ms / 1000
+            self.job = self.master.after(self.poll_ms, self._drain)
+
+    def stats(self):
+        lags = np.array(self.lags) if self.lags else np.zeros(1)
+        return {
+            'ticks': len(self.lags),
+            'lag_p50_ms': float(np.percentile(lags, 50)),
+            'lag_p95_ms': float(np.percentile(lags, 95)),
+            'lag_max_ms': float(lags.max()),
+            'stalls': self.stalls,
+            'pending_jobs': self.jobs.qsize(),
+        }
+
+    def close(self):
+        self.running = False
+        self.jobs.put(None)
+        if self.job is not None:
+            self.master.after_cancel(self.job)
+            self.job = None
+
+
+class WidgetCache:
+    # Sets Tk variables only when the value differs from what is shown, so
+    # periodic refreshes with unchanged data cost no redraw
+    def __init__(self):
+        self.shown = {}
+        self.updates = 0
+        self.skipped = 0
+
+    def set(self, var, value):
+        key = str(var)
+        if self.shown.get(key) == value:
+            self.skipped += 1
+            return False
+        var.set(value)
+        self.shown[key] = value
+        self.updates += 1
+        return True
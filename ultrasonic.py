@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import threading
+import time
+
+# HC-SR04 reader that times the ECHO pulse from GPIO edge events instead of
+# spinning on GPIO.input(). Timestamps come from perf_counter_ns.
+#   mode="callback": edges from an add_event_detect(BOTH) callback (default)
+#   mode="wait":     blocking GPIO.wait_for_edge for the rising then falling edge
+
+CM_PER_NS = 17150 / 1e9  # half the speed of sound, out and back
+
+
+class EchoReader:
+    def __init__(self, gpio, trig, echo, mode="callback", timeout=0.1, min_interval=0.06, verbose=True):
+        self.gpio = gpio
+        self.trig = trig
+        self.echo = echo
+        self.mode = mode
+        self.timeout = timeout
+        self.min_interval = min_interval  # HC-SR04 needs ~60 ms between pings
+        self.last_ping = 0.0
+        self.verbose = verbose
+
+        self.edges = []
+        self.edge_lock = threading.Lock()
+        self.done = threading.Event()
+        self.detecting = False
+
+    def _on_edge(self, channel):
+        now = time.perf_counter_ns()
+        with self.edge_lock:
+            self.edges.append(now)
+            if len(self.edges) >= 2:
+                self.done.set()
+
+    def _timeout(self, level):
+        if self.verbose:
+            print(f"Timeout: ECHO did not go {level}")
+
+    def _trigger(self):
+        wait = self.last_ping + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self.gpio.output(self.trig, False)
+        self.gpio.output(self.trig, True)
+        time.sleep(0.00001)
+        self.gpio.output(self.trig, False)
+        self.last_ping = time.monotonic()
+
+    def _pulse_callback(self):
+        if not self.detecting:
+            self.gpio.add_event_detect(self.echo, self.gpio.BOTH, callback=self._on_edge)
+            self.detecting = True
+        with self.edge_lock:
+            self.edges = []
+            self.done.clear()
+        self._trigger()
+        if not self.done.wait(self.timeout):
+            with self.edge_lock:
+                self._timeout("high" if not self.edges else "low")
+            return None
+        with self.edge_lock:
+            return self.edges[1] - self.edges[0]
+
+    def _pulse_wait(self):
+        timeout_ms = max(1, int(self.timeout * 1000))
+        self._trigger()
+        if self.gpio.wait_for_edge(self.echo, self.gpio.RISING, timeout=timeout_ms) is None:
+            self._timeout("high")
+            return None
+        pulse_start = time.perf_counter_ns()
+        if self.gpio.wait_for_edge(self.echo, self.gpio.FALLING, timeout=timeout_ms) is None:
+            self._timeout("low")
+            return None
+        return time.perf_counter_ns() - pulse_start
+
+    def measure(self):
+        # Returns (distance_cm, distance_m), or None if no echo arrived in time
+        pulse_ns = self._pulse_callback() if self.mode == "callback" else self._pulse_wait()
+        if pulse_ns is None:
+            return None
+        distance_cm = round(pulse_ns * CM_PER_NS, 2)
+        distance_m = round(distance_cm / 100, 3)
+        return distance_cm, distance_m
+
+    def close(self):
+        if self.detecting:
+            self.gpio.remove_event_detect(self.echo)
+            self.detecting = False
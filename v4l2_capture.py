@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+import argparse
+import ctypes
+import errno
+import fcntl
+import mmap
+import os
+import select
+import tempfile
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from capture import Capture
+
+# Capture straight from a V4L2 device: the driver fills a small ring of
+# mmap'd buffers (count chosen here, not by OpenCV) and each frame is handed
+# out as a NumPy view over its buffer, with the kernel's capture timestamp
+# and sequence number. A dequeued buffer goes back to the driver on the next
+# read(), so a view stays valid until then - copy it to keep it longer.
+# BGR3 frames are returned without any copy; YUYV/GREY/MJPG are converted,
+# into the caller's array when read(image) is given one.
+#
+#   python3 v4l2_capture.py --device /dev/video0          # real camera or vivid
+#   python3 v4l2_capture.py --fake clip.mp4 --format BGR3  # file-backed fake device
+#
+# vivid (sudo modprobe vivid) gives a virtual /dev/videoN that behaves like a
+# webcam. FakeV4L2Device answers the same ioctls in-process from a video file
+# or a synthetic pattern, with its buffers in a temp file mapped the same way.
+
+
+def fourcc(code):
+    return ord(code[0]) | ord(code[1]) << 8 | ord(code[2]) << 16 | ord(code[3]) << 24
+
+
+def fourcc_name(value):
+    return "".join(chr((value >> shift) & 0xFF) for shift in (0, 8, 16, 24))
+
+
+PIXEL_FORMATS = ("YUYV", "BGR3", "GREY", "MJPG")
+BYTES_PER_PIXEL = {"YUYV": 2, "BGR3": 3, "GREY": 1, "MJPG": 0}
+
+BUF_TYPE_VIDEO_CAPTURE = 1
+MEMORY_MMAP = 1
+FIELD_NONE = 1
+CAP_VIDEO_CAPTURE = 0x00000001
+CAP_STREAMING = 0x04000000
+CAP_DEVICE_CAPS = 0x80000000
+BUF_FLAG_MAPPED = 0x00000001
+BUF_FLAG_QUEUED = 0x00000002
+BUF_FLAG_DONE = 0x00000004
+BUF_FLAG_ERROR = 0x00000040
+BUF_FLAG_TIMESTAMP_MASK = 0x0000E000
+BUF_FLAG_TIMESTAMP_MONOTONIC = 0x00002000
+
+
+class v4l2_capability(ctypes.Structure):
+    _fields_ = [('driver', ctypes.c_char * 16), ('card', ctypes.c_char * 32), ('bus_info', ctypes.c_char * 32),
+                ('version', ctypes.c_uint32), ('capabilities', ctypes.c_uint32), ('device_caps', ctypes.c_uint32),
+                ('reserved', ctypes.c_uint32 * 3)]
+
+
+class v4l2_pix_format(ctypes.Structure):
+    _fields_ = [('width', ctypes.c_uint32), ('height', ctypes.c_uint32), ('pixelformat', ctypes.c_uint32),
+                ('field', ctypes.c_uint32), ('bytesperline', ctypes.c_uint32), ('sizeimage', ctypes.c_uint32),
+                ('colorspace', ctypes.c_uint32), ('priv', ctypes.c_uint32), ('flags', ctypes.c_uint32),
+                ('ycbcr_enc', ctypes.c_uint32), ('quantization', ctypes.c_uint32), ('xfer_func', ctypes.c_uint32)]
+
+
+class _format_union(ctypes.Union):
+    # 200 bytes, pointer-aligned because of struct v4l2_window
+    _fields_ = [('pix', v4l2_pix_format), ('raw_data', ctypes.c_uint8 * 200), ('_align', ctypes.c_void_p)]
+
+
+class v4l2_format(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_uint32), ('fmt', _format_union)]
+
+
+class v4l2_fract(ctypes.Structure):
+    _fields_ = [('numerator', ctypes.c_uint32), ('denominator', ctypes.c_uint32)]
+
+
+class v4l2_captureparm(ctypes.Structure):
+    _fields_ = [('capability', ctypes.c_uint32), ('capturemode', ctypes.c_uint32), ('timeperframe', v4l2_fract),
+                ('extendedmode', ctypes.c_uint32), ('readbuffers', ctypes.c_uint32), ('reserved', ctypes.c_uint32 * 4)]
+
+
+class _parm_union(ctypes.Union):
+    _fields_ = [('capture', v4l2_captureparm), ('raw_data', ctypes.c_uint8 * 200)]
+
+
+class v4l2_streamparm(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_uint32), ('parm', _parm_union)]
+
+
+class v4l2_requestbuffers(ctypes.Structure):
+    _fields_ = [('count', ctypes.c_uint32), ('type', ctypes.c_uint32), ('memory', ctypes.c_uint32),
+                ('capabilities', ctypes.c_uint32), ('flags', ctypes.c_uint8), ('reserved', ctypes.c_uint8 * 3)]
+
+
+class timeval(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_usec', ctypes.c_long)]
+
+
+class v4l2_timecode(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_uint32), ('flags', ctypes.c_uint32), ('frames', ctypes.c_uint8),
+                ('seconds', ctypes.c_uint8), ('minutes', ctypes.c_uint8), ('hours', ctypes.c_uint8),
+                ('userbits', ctypes.c_uint8 * 4)]
+
+
+class _buffer_m(ctypes.Union):
+    _fields_ = [('offset', ctypes.c_uint32), ('userptr', ctypes.c_ulong), ('planes', ctypes.c_void_p),
+                ('fd', ctypes.c_int32)]
+
+
+class v4l2_buffer(ctypes.Structure):
+    _fields_ = [('index', ctypes.c_uint32), ('type', ctypes.c_uint32), ('bytesused', ctypes.c_uint32),
+                ('flags', ctypes.c_uint32), ('field', ctypes.c_uint32), ('timestamp', timeval),
+                ('timecode', v4l2_timecode), ('sequence', ctypes.c_uint32), ('memory', ctypes.c_uint32),
+                ('m', _buffer_m), ('length', ctypes.c_uint32), ('reserved2', ctypes.c_uint32),
+                ('request_fd', ctypes.c_int32)]
+
+
+def _ioc(direction, number, size):
+    return direction << 30 | size << 16 | ord('V') << 8 | number
+
+
+_READ, _WRITE = 2, 1
+VIDIOC_QUERYCAP = _ioc(_READ, 0, ctypes.sizeof(v4l2_capability))
+VIDIOC_G_FMT = _ioc(_READ | _WRITE, 4, ctypes.sizeof(v4l2_format))
+VIDIOC_S_FMT = _ioc(_READ | _WRITE, 5, ctypes.sizeof(v4l2_format))
+VIDIOC_REQBUFS = _ioc(_READ | _WRITE, 8, ctypes.sizeof(v4l2_requestbuffers))
+VIDIOC_QUERYBUF = _ioc(_READ | _WRITE, 9, ctypes.sizeof(v4l2_buffer))
+VIDIOC_QBUF = _ioc(_READ | _WRITE, 15, ctypes.sizeof(v4l2_buffer))
+VIDIOC_DQBUF = _ioc(_READ | _WRITE, 17, ctypes.sizeof(v4l2_buffer))
+VIDIOC_STREAMON = _ioc(_WRITE, 18, ctypes.sizeof(ctypes.c_int))
+VIDIOC_STREAMOFF = _ioc(_WRITE, 19, ctypes.sizeof(ctypes.c_int))
+VIDIOC_S_PARM = _ioc(_READ | _WRITE, 22, ctypes.sizeof(v4l2_streamparm))
+
+
+class V4L2Error(RuntimeError):
+    pass
+
+
+class V4L2Device:
+    # A real /dev/videoN, opened non-blocking; wait() selects on it
+    def __init__(self, path="/dev/video0"):
+        self.path = path
+        self.fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+
+    def ioctl(self, request, arg):
+        while True:
+            try:
+                return fcntl.ioctl(self.fd, request, arg)
+            except InterruptedError:
+                continue
+
+    def mmap(self, length, offset):
+        return mmap.mmap(self.fd, length, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE, offset=offset)
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        return bool(readable)
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _bgr_to_yuyv(frame):
+    yuv = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV)
+    out = np.empty(frame.shape[:2] + (2,), np.uint8)
+    out[:, :, 0] = yuv[:, :, 0]
+    pairs = yuv[:, 0::2, 1:].astype(np.uint16) + yuv[:, 1::2, 1:]
+    out[:, 0::2, 1] = pairs[:, :, 0] // 2
+    out[:, 1::2, 1] = pairs[:, :, 1] // 2
+    return out
+
+
+class FakeV4L2Device:
+    # Answers the ioctls V4L2Capture makes from a video file (looped), or a
+    # moving test pattern when source is None. Frames fall due at the
+    # requested rate like a free-running sensor and fill the queued buffers
+    # in order; a slow reader first gets the stale buffered frames, then sees
+    # sequence numbers skip where no buffer was free - as with a real driver.
+    def __init__(self, source=None, default_size=(640, 480), fps=30):
+        self.source = cv2.VideoCapture(source) if source else None
+        if self.source is not None and not self.source.isOpened():
+            raise V4L2Error(f"could not open {source}")
+        self.fps = fps
+        self.pix = v4l2_pix_format(width=default_size[0], height=default_size[1], pixelformat=fourcc("YUYV"))
+        self._set_format(self.pix)
+        self.backing = tempfile.TemporaryFile()
+        self.memory = None
+        self.stride = 0
+        self.count = 0
+        self.queued = deque()
+        self.filled = deque()  # (index, bytesused, sequence, capture time) ready to dequeue
+        self.streaming = False
+        self.started = None
+        self.sequence = -1
+        self.handlers = {
+            VIDIOC_QUERYCAP: self._querycap,
+            VIDIOC_G_FMT: self._g_fmt,
+            VIDIOC_S_FMT: self._s_fmt,
+            VIDIOC_S_PARM: self._s_parm,
+            VIDIOC_REQBUFS: self._reqbufs,
+            VIDIOC_QUERYBUF: self._querybuf,
+            VIDIOC_QBUF: self._qbuf,
+            VIDIOC_DQBUF: self._dqbuf,
+            VIDIOC_STREAMON: self._streamon,
+            VIDIOC_STREAMOFF: self._streamoff,
+        }
+
+    def ioctl(self, request, arg):
+        handler = self.handlers.get(request)
+        if handler is None:
+            raise OSError(errno.ENOTTY, os.strerror(errno.ENOTTY))
+        handler(arg)
+        return 0
+
+    def mmap(self, length, offset):
+        return mmap.mmap(self.backing.fileno(), length, offset=offset)
+
+    def wait(self, timeout):
+        if self.filled:
+            return True
+        if not self.streaming or not self.queued:
+            time.sleep(timeout)
+            return False
+        delay = self._next_due() - time.monotonic()
+        if delay > timeout:
+            time.sleep(timeout)
+            return False
+        time.sleep(max(0.0, delay))
+        return True
+
+    def close(self):
+        if self.memory is not None:
+            self.memory.close()
+        self.backing.close()
+        if self.source is not None:
+            self.source.release()
+
+    def _error(self, code):
+        raise OSError(code, os.strerror(code))
+
+    def _next_due(self):
+        return self.started + (self.sequence + 1) / self.fps
+
+    def _set_format(self, pix):
+        name = fourcc_name(pix.pixelformat)
+        if name not in PIXEL_FORMATS:
+            pix.pixelformat, name = fourcc("YUYV"), "YUYV"
+        pix.width += pix.width % 2  # YUYV works on pixel pairs
+        pix.field = FIELD_NONE
+        pix.bytesperline = pix.width * BYTES_PER_PIXEL[name]
+        pix.sizeimage = pix.width * pix.height * (BYTES_PER_PIXEL[name] or 3)
+        ctypes.memmove(ctypes.addressof(self.pix), ctypes.addressof(pix), ctypes.sizeof(pix))
+
+    def _querycap(self, cap):
+        cap.driver = b"fake"
+        cap.card = b"File-backed fake camera"
+        cap.bus_info = b"platform:fake"
+        cap.device_caps = CAP_VIDEO_CAPTURE | CAP_STREAMING
+        cap.capabilities = cap.device_caps | CAP_DEVICE_CAPS
+
+    def _g_fmt(self, fmt):
+        fmt.fmt.pix = self.pix
+
+    def _s_fmt(self, fmt):
+        if self.count:
+            self._error(errno.EBUSY)
+        self._set_format(fmt.fmt.pix)
+        fmt.fmt.pix = self.pix
+
+    def _s_parm(self, parm):
+        frac = parm.parm.capture.timeperframe
+        if frac.numerator and frac.denominator:
+            self.fps = frac.denominator / frac.numerator
+
+    def _reqbufs(self, req):
+        if self.streaming:
+            self._error(errno.EBUSY)
+        if self.memory is not None:
+            self.memory.close()
+            self.memory = None
+        self.count = req.count
+        self.queued.clear()
+        self.filled.clear()
+        if self.count:
+            self.stride = -(-self.pix.sizeimage // mmap.PAGESIZE) * mmap.PAGESIZE
+            self.backing.truncate(self.count * self.stride)
+            self.memory = mmap.mmap(self.backing.fileno(), self.count * self.stride)
+
+    def _querybuf(self, buf):
+        if buf.index >= self.count:
+            self._error(errno.EINVAL)
+        buf.length = self.pix.sizeimage
+        buf.m.offset = buf.index * self.stride
+        buf.flags = BUF_FLAG_MAPPED | BUF_FLAG_TIMESTAMP_MONOTONIC | (BUF_FLAG_QUEUED if buf.index in self.queued else 0)
+
+    def _qbuf(self, buf):
+        if buf.index >= self.count or buf.index in self.queued or any(f[0] == buf.index for f in self.filled):
+            self._error(errno.EINVAL)
+        self.queued.append(buf.index)
+
+    def _advance(self):
+        # Capture every frame that fell due into the next queued buffer; with
+        # no buffer queued the frame is lost, as with a real driver
+        now = time.monotonic()
+        while self._next_due() <= now:
+            self.sequence += 1
+            if not self.queued:
+                if self.source is not None:
+                    self._next_source_frame()
+                continue
+            index = self.queued.popleft()
+            data = self._render()
+            offset = index * self.stride
+            self.memory[offset:offset + len(data)] = data
+            self.filled.append((index, len(data), self.sequence, self.started + self.sequence / self.fps))
+
+    def _dqbuf(self, buf):
+        if not self.streaming:
+            self._error(errno.EINVAL)
+        self._advance()
+        if not self.filled:
+            self._error(errno.EAGAIN)
+        index, used, sequence, captured = self.filled.popleft()
+        buf.index = index
+        buf.bytesused = used
+        buf.length = self.pix.sizeimage
+        buf.m.offset = index * self.stride
+        buf.field = FIELD_NONE
+        buf.sequence = sequence
+        buf.flags = BUF_FLAG_MAPPED | BUF_FLAG_DONE | BUF_FLAG_TIMESTAMP_MONOTONIC
+        buf.timestamp.tv_sec = int(captured)
+        buf.timestamp.tv_usec = int((captured % 1) * 1e6)
+
+    def _streamon(self, _arg):
+        if not self.count:
+            self._error(errno.EINVAL)
+        self.streaming = True
+        self.started = time.monotonic()
+        self.sequence = -1
+
+    def _streamoff(self, _arg):
+        self.streaming = False
+        self.queued.clear()
+        self.filled.clear()
+
+    def _next_source_frame(self):
+        ok, frame = self.source.read()
+        if not ok:
+            self.source.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.source.read()
+        if not ok:
+            self._error(errno.EIO)
+        return frame
+
+    def _render(self):
+        width, height = self.pix.width, self.pix.height
+        if self.source is not None:
+            frame = self._next_source_frame()
+            if frame.shape[:2] != (height, width):
+                frame = cv2.resize(frame, (width, height))
+        else:
+            frame = np.full((height, width, 3), 64, np.uint8)
+            x = int((self.sequence * 4) % max(1, width - 80))
+            cv2.rectangle(frame, (x, height // 3), (x + 80, height // 3 + 60), (40, 160, 220), -1)
+            cv2.putText(frame, str(self.sequence), (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+
+        name = fourcc_name(self.pix.pixelformat)
+        if name == "BGR3":
+            return frame.tobytes()
+        if name == "GREY":
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY).tobytes()
+        if name == "MJPG":
+            return cv2.imencode('.jpg', frame)[1].tobytes()
+        return _bgr_to_yuyv(frame).tobytes()
+
+
+class V4L2Frame:
+    def __init__(self, index, data, image, sequence, timestamp, monotonic):
+        self.index = index  # driver buffer
+        self.data = data  # bytesused bytes of the mapped buffer
+        self.image = image  # shaped view for raw formats, None for MJPG
+        self.sequence = sequence
+        self.timestamp = timestamp  # capture time, time.time() base
+        self.monotonic = monotonic  # capture time, CLOCK_MONOTONIC as the kernel reports it
+
+
+class V4L2Capture(Capture):
+    def __init__(self, device="/dev/video0", width=640, height=480, framerate=30, pixel_format="YUYV",
+                 buffers=4, timeout=2.0):
+        super().__init__()
+        if pixel_format not in PIXEL_FORMATS:
+            raise ValueError(f"pixel_format must be one of {', '.join(PIXEL_FORMATS)}, got {pixel_format!r}")
+        self.device = V4L2Device(device) if isinstance(device, str) else device
+        self.timeout = timeout
+        self.held = None
+        self.maps = []
+        self.views = []
+        self.streaming = False
+        self.last_sequence = None
+        self.dropped = 0
+        try:
+            self._open(width, height, framerate, pixel_format, buffers)
+        except Exception:
+            self.release()
+            raise
+
+    def _open(self, width, height, framerate, pixel_format, buffers):
+        cap = v4l2_capability()
+        self.device.ioctl(VIDIOC_QUERYCAP, cap)
+        caps = cap.device_caps if cap.capabilities & CAP_DEVICE_CAPS else cap.capabilities
+        if not caps & CAP_VIDEO_CAPTURE or not caps & CAP_STREAMING:
+            raise V4L2Error(f"{cap.card.decode(errors='replace')} cannot stream video capture")
+        self.card = cap.card.decode(errors='replace')
+
+        fmt = v4l2_format(type=BUF_TYPE_VIDEO_CAPTURE)
+        fmt.fmt.pix.width = width
+        fmt.fmt.pix.height = height
+        fmt.fmt.pix.pixelformat = fourcc(pixel_format)
+        fmt.fmt.pix.field = FIELD_NONE
+        self.device.ioctl(VIDIOC_S_FMT, fmt)
+        # the driver may adjust everything; use what it chose
+        pix = fmt.fmt.pix
+        self.width, self.height = pix.width, pix.height
+        self.pixel_format = fourcc_name(pix.pixelformat)
+        self.bytesperline = pix.bytesperline
+        if self.pixel_format not in PIXEL_FORMATS:
+            raise V4L2Error(f"driver chose unsupported pixel format {self.pixel_format}")
+
+        parm = v4l2_streamparm(type=BUF_TYPE_VIDEO_CAPTURE)
+        parm.parm.capture.timeperframe.numerator = 1
+        parm.parm.capture.timeperframe.denominator = framerate
+        try:
+            self.device.ioctl(VIDIOC_S_PARM, parm)
+        except OSError:
+            pass  # not every driver lets the rate be set
+        self.framerate = framerate
+
+        req = v4l2_requestbuffers(count=buffers, type=BUF_TYPE_VIDEO_CAPTURE, memory=MEMORY_MMAP)
+        self.device.ioctl(VIDIOC_REQBUFS, req)
+        if req.count < 2:
+            raise V4L2Error(f"driver granted only {req.count} buffer(s)")
+        for index in range(req.count):
+            buf = v4l2_buffer(index=index, type=BUF_TYPE_VIDEO_CAPTURE, memory=MEMORY_MMAP)
+            self.device.ioctl(VIDIOC_QUERYBUF, buf)
+            mapped = self.device.mmap(buf.length, buf.m.offset)
+            self.maps.append(mapped)
+            self.views.append(np.frombuffer(mapped, np.uint8, count=buf.length))
+            self._queue(index)
+        self.device.ioctl(VIDIOC_STREAMON, ctypes.c_int(BUF_TYPE_VIDEO_CAPTURE))
+        self.streaming = True
+        self.clock_offset = time.time() - time.monotonic()
+
+    def _queue(self, index):
+        self.device.ioctl(VIDIOC_QBUF, v4l2_buffer(index=index, type=BUF_TYPE_VIDEO_CAPTURE, memory=MEMORY_MMAP))
+
+    def isOpened(self):
+        return self.streaming
+
+    def grab(self):
+        # Next frame as a V4L2Frame of views into the driver's buffer; the
+        # previous one is handed back to the driver first
+        if not self.streaming:
+            return None
+        if self.held is not None:
+            self._queue(self.held)
+            self.held = None
+        buf = v4l2_buffer(type=BUF_TYPE_VIDEO_CAPTURE, memory=MEMORY_MMAP)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self.device.ioctl(VIDIOC_DQBUF, buf)
+                break
+            except OSError as e:
+                if e.errno != errno.EAGAIN:
+                    print(f"⚠️ V4L2 dequeue failed: {e}")
+                    return None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self.device.wait(remaining)
+        self.held = buf.index
+        if buf.flags & BUF_FLAG_ERROR:
+            return self.grab()  # corrupted frame, the driver says to skip it
+
+        monotonic = buf.timestamp.tv_sec + buf.timestamp.tv_usec / 1e6
+        if buf.flags & BUF_FLAG_TIMESTAMP_MASK == BUF_FLAG_TIMESTAMP_MONOTONIC:
+            timestamp = monotonic + self.clock_offset
+        else:
+            timestamp = time.time()  # unknown clock
+        if self.last_sequence is not None:
+            self.dropped += max(0, buf.sequence - self.last_sequence - 1)
+        self.last_sequence = buf.sequence
+        self._record(timestamp)
+
+        data = self.views[buf.index][:buf.bytesused]
+        image = None
+        bpp = BYTES_PER_PIXEL[self.pixel_format]
+        if bpp:
+            rows = self.views[buf.index][:self.bytesperline * self.height].reshape(self.height, self.bytesperline)
+            image = rows[:, :self.width * bpp].reshape((self.height, self.width, bpp) if bpp > 1
+                                                       else (self.height, self.width))
+        return V4L2Frame(buf.index, data, image, buf.sequence, timestamp, monotonic)
+
+    def read(self, image=None):
+        # cv2.VideoCapture-style BGR frame. For BGR3 without an image to fill
+        # this is the mapped buffer itself, valid until the next read()
+        frame = self.grab()
+        if frame is None:
+            return False, None
+        if self.pixel_format == "BGR3":
+            if image is None:
+                return True, frame.image
+            image[...] = frame.image
+            return True, image
+        if self.pixel_format == "YUYV":
+            return True, cv2.cvtColor(frame.image, cv2.COLOR_YUV2BGR_YUYV, dst=image)
+        if self.pixel_format == "GREY":
+            return True, cv2.cvtColor(frame.image, cv2.COLOR_GRAY2BGR, dst=image)
+        decoded = cv2.imdecode(frame.data, cv2.IMREAD_COLOR)
+        if decoded is None:
+            return False, None
+        if image is not None and image.shape == decoded.shape:
+            image[...] = decoded
+            return True, image
+        return True, decoded
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: self.width, cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+                cv2.CAP_PROP_FPS: self.framerate}.get(prop, 0.0)
+
+    def stats(self):
+        return dict(super().stats(), dropped=self.dropped, buffers=len(self.maps))
+
+    def release(self):
+        if self.streaming:
+            try:
+                self.device.ioctl(VIDIOC_STREAMOFF, ctypes.c_int(BUF_TYPE_VIDEO_CAPTURE))
+            except OSError:
+                pass
+            self.streaming = False
+        self.held = None
+        self.views = []
+        for mapped in self.maps:
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # a caller still holds a view; unmapped when it is collected
+        self.maps = []
+        try:
+            self.device.ioctl(VIDIOC_REQBUFS, v4l2_requestbuffers(count=0, type=BUF_TYPE_VIDEO_CAPTURE,
+                                                                  memory=MEMORY_MMAP))
+        except OSError:
+            pass
+        if self.device is not None:
+            self.device.close()
+            self.device = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Direct V4L2 mmap capture")
+    parser.add_argument("--device", default="/dev/video0")
+    parser.add_argument("--fake", nargs="?", const="", metavar="VIDEO",
+                        help="use the file-backed fake device (optionally fed from VIDEO)")
+    parser.add_argument("--size", default="640x480")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--format", default="YUYV", choices=PIXEL_FORMATS)
+    parser.add_argument("--buffers", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--show", action="store_true")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    device = FakeV4L2Device(args.fake or None, (width, height), args.fps) if args.fake is not None else args.device
+    cap = V4L2Capture(device, width, height, args.fps, args.format, args.buffers)
+    print(f"✅ {cap.card}: {cap.width}x{cap.height} {cap.pixel_format}, {len(cap.maps)} buffers")
+    try:
+        for _ in range(args.frames):
+            ret, frame = cap.read()
+            if not ret:
+                print("⚠️ Frame capture failed")
+                break
+            if args.show:
+                cv2.imshow("V4L2", frame)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+    finally:
+        stats = cap.stats()
+        cap.release()
+    age = stats['age']
+    print(f"{stats['frames']} frames, {stats['dropped']} dropped by the driver"
+          + (f", age at read p50 {age['p50_ms']:.2f} ms, p95 {age['p95_ms']:.2f} ms" if age else ""))
+
+
+if __name__ == "__main__":
+    main()